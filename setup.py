@@ -46,6 +46,11 @@ setup(
             "pykerberos>=1.3.0",
             "requests-kerberos>=0.14.0",
         ],
+        "accel": [
+            "numba>=0.58.0",
+            "orjson>=3.9.0",
+            "pyahocorasick>=2.0.0",
+        ],
         "monitoring": [
             "prometheus-client>=0.17.0",
             "grafana-api>=1.0.3",
@@ -1,8 +1,59 @@
-from typing import Dict, Any, List
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import os
+import numpy as np
 
-@dataclass
+_GIB_INV: float = 1.0 / (1024 ** 3)
+
+# Below this many per-file entries thread startup costs more than the reductions save
+_PARALLEL_MIN_FILES = 100_000
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit:
+    @njit(cache=True, fastmath=True)
+    def _sum_sizes_nb(sizes):
+        """Sum a float32 size array with an explicit loop LLVM can vectorize"""
+        total = 0.0  # float64 accumulator keeps the running sum exact enough
+        for i in range(sizes.shape[0]):
+            total += sizes[i]
+        return total
+    
+    @njit(cache=True, fastmath=True)
+    def _small_file_savings_nb(sizes, count, meta_cost_100x, storage_cost_3x):
+        """Return (size_gb, current_cost, optimized_cost) for small file consolidation"""
+        total = 0.0
+        for i in range(sizes.shape[0]):
+            total += sizes[i]
+        size_gb = total * _GIB_INV
+        storage = size_gb * storage_cost_3x
+        current_cost = count * meta_cost_100x + storage
+        optimized_cost = count * 0.1 * meta_cost_100x + storage
+        return size_gb, current_cost, optimized_cost
+    
+    # Warm the JIT (or load it from the on-disk cache) at import time
+    _sum_sizes_nb(np.zeros(1, dtype=np.float32))
+    _small_file_savings_nb(np.zeros(1, dtype=np.float32), 1, 0.01, 0.12)
+else:
+    def _sum_sizes_nb(sizes):
+        """Sum a float32 size array"""
+        return sizes.sum(dtype=np.float64)
+    
+    def _small_file_savings_nb(sizes, count, meta_cost_100x, storage_cost_3x):
+        """Return (size_gb, current_cost, optimized_cost) for small file consolidation"""
+        size_gb = float(sizes.sum(dtype=np.float64)) * _GIB_INV
+        storage = size_gb * storage_cost_3x
+        current_cost = count * meta_cost_100x + storage
+        optimized_cost = count * 0.1 * meta_cost_100x + storage
+        return size_gb, current_cost, optimized_cost
+
+@dataclass(slots=True, frozen=True)
 class StorageCosts:
     standard_storage_cost_per_gb: float = 0.04  # $/GB/month
     cold_storage_cost_per_gb: float = 0.01      # $/GB/month
@@ -10,8 +61,24 @@ class StorageCosts:
     replication_multiplier: float = 1.0
     metadata_cost_per_file: float = 0.0001      # $/file/month
     network_cost_per_gb: float = 0.01           # $/GB for data movement
+    
+    # Derived constants used on the savings hot paths; the prices are frozen so these (and
+    # the calculators specialized over them) can never go stale
+    standard_3x: float = field(init=False, repr=False, compare=False)
+    standard_4x: float = field(init=False, repr=False, compare=False)
+    cold_1p5x: float = field(init=False, repr=False, compare=False)
+    small_file_meta_100x: float = field(init=False, repr=False, compare=False)
+    gib_inv: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Precompute the replication-weighted cost constants"""
+        object.__setattr__(self, "standard_3x", self.standard_storage_cost_per_gb * 3)
+        object.__setattr__(self, "standard_4x", self.standard_storage_cost_per_gb * 4)
+        object.__setattr__(self, "cold_1p5x", self.cold_storage_cost_per_gb * 1.5)
+        object.__setattr__(self, "small_file_meta_100x", self.metadata_cost_per_file * 100)
+        object.__setattr__(self, "gib_inv", _GIB_INV)
 
-@dataclass
+@dataclass(slots=True)
 class OptimizationSavings:
     category: str
     current_cost: float
@@ -22,78 +89,139 @@ class OptimizationSavings:
     implementation_cost: float = 0.0
     annual_savings: float = 0.0
 
+@dataclass
+class ScanArrays:
+    """Struct-of-arrays view of the per-file lists in a scan result"""
+    cold_sizes: np.ndarray
+    small_sizes: np.ndarray
+    orphan_sizes: np.ndarray
+    repl_sizes: np.ndarray
+
 class CostCalculator:
     def __init__(self, storage_costs: StorageCosts):
         self.costs = storage_costs
         self.logger = logging.getLogger(__name__)
+        self._calc_current = self._build_current_costs(storage_costs)
+        self._dispatch = {
+            "cold_data": self._calculate_cold_data_savings,
+            "small_files": self._calculate_small_file_savings,
+            "replication": self._calculate_replication_savings,
+            "cleanup": self._calculate_cleanup_savings,
+            "compression": self._calculate_compression_savings
+        }
+    
+    @staticmethod
+    def _build_current_costs(costs: StorageCosts):
+        """Specialize the current cost calculation over fixed storage costs"""
+        # Bind the cost constants once so each call is straight-line arithmetic
+        storage_rate = costs.standard_3x  # Assuming 3x replication
+        metadata_rate = costs.metadata_cost_per_file
+        
+        # The constants are bound per instance, so the cache key only needs the scan scalars
+        @lru_cache(maxsize=128)
+        def costs_for(total_size_gb: float, total_files: int, small_file_count: int) -> Dict[str, float]:
+            storage_cost = total_size_gb * storage_rate
+            metadata_cost = total_files * metadata_rate
+            small_file_overhead = small_file_count * 0.001  # Additional cost per small file
+            network_cost = total_size_gb * 0.005  # Estimated network usage
+            
+            total_cost = storage_cost + metadata_cost + small_file_overhead + network_cost
+            
+            return {
+                "storage_cost": storage_cost,
+                "metadata_cost": metadata_cost,
+                "small_file_overhead": small_file_overhead,
+                "network_cost": network_cost,
+                "total_monthly_cost": total_cost,
+                "total_annual_cost": total_cost * 12,
+                "cost_per_gb": total_cost / total_size_gb if total_size_gb > 0 else 0
+            }
+        
+        def calc(scan_results: Dict[str, Any]) -> Dict[str, float]:
+            # Hand out a copy so callers can't mutate the cached entry
+            return dict(costs_for(
+                scan_results.get("total_size_gb", 0),
+                scan_results.get("total_files", 0),
+                len(scan_results.get("small_files", []))
+            ))
+        
+        calc.cache_info = costs_for.cache_info
+        calc.cache_clear = costs_for.cache_clear
+        return calc
+    
+    @staticmethod
+    def _safe_div(numerator: float, denominator: float) -> Optional[float]:
+        """Divide, returning None instead of infinity for a non-positive denominator"""
+        return numerator / denominator if denominator > 0 else None
+    
+    @staticmethod
+    def _field_array(files: List[Dict[str, Any]], key: str, default: int) -> np.ndarray:
+        """Extract one numeric field of a file list into a float32 array"""
+        return np.fromiter((f.get(key, default) for f in files), dtype=np.float32, count=len(files))
+    
+    @staticmethod
+    def _sum_sizes_gb(sizes: np.ndarray) -> float:
+        """Sum file sizes in GB with a single vectorized reduction"""
+        return float(_sum_sizes_nb(sizes)) * _GIB_INV
+    
+    def _to_soa(self, scan_results: Dict[str, Any]) -> ScanArrays:
+        """Convert the per-file lists of a scan result into columnar arrays"""
+        over_replicated = scan_results.get("efficiency_analysis", {}).get("inefficient_replication", [])
+        
+        return ScanArrays(
+            cold_sizes=self._field_array(scan_results.get("cold_data", []), "size", 0),
+            small_sizes=self._field_array(scan_results.get("small_files", []), "size", 0),
+            orphan_sizes=self._field_array(scan_results.get("orphaned_files", []), "size", 0),
+            repl_sizes=self._field_array(over_replicated, "size", 0)
+        )
     
     def calculate_current_costs(self, scan_results: Dict[str, Any]) -> Dict[str, float]:
         """Calculate current HDFS storage costs"""
-        total_size_gb = scan_results.get("total_size_gb", 0)
-        total_files = scan_results.get("total_files", 0)
-        
-        # Calculate storage costs (assuming 3x replication)
-        replication_factor = 3
-        storage_cost = total_size_gb * self.costs.standard_storage_cost_per_gb * replication_factor
-        
-        # Calculate metadata costs
-        metadata_cost = total_files * self.costs.metadata_cost_per_file
-        
-        # Calculate additional costs for small files (metadata overhead)
-        small_files = scan_results.get("small_files", [])
-        small_file_overhead = len(small_files) * 0.001  # Additional cost per small file
-        
-        # Calculate network costs (data movement)
-        network_cost = total_size_gb * 0.005  # Estimated network usage
-        
-        total_cost = storage_cost + metadata_cost + small_file_overhead + network_cost
-        
-        return {
-            "storage_cost": storage_cost,
-            "metadata_cost": metadata_cost,
-            "small_file_overhead": small_file_overhead,
-            "network_cost": network_cost,
-            "total_monthly_cost": total_cost,
-            "total_annual_cost": total_cost * 12,
-            "cost_per_gb": total_cost / total_size_gb if total_size_gb > 0 else 0
-        }
+        return self._calc_current(scan_results)
     
     def calculate_optimization_savings(self, scan_results: Dict[str, Any], 
                                      optimizations: List[Dict[str, Any]]) -> List[OptimizationSavings]:
         """Calculate potential savings from each optimization"""
-        savings_list = []
-        
-        for optimization in optimizations:
-            category = optimization.get("category", "unknown")
-            
-            if category == "cold_data":
-                savings = self._calculate_cold_data_savings(scan_results, optimization)
-            elif category == "small_files":
-                savings = self._calculate_small_file_savings(scan_results, optimization)
-            elif category == "replication":
-                savings = self._calculate_replication_savings(scan_results, optimization)
-            elif category == "cleanup":
-                savings = self._calculate_cleanup_savings(scan_results, optimization)
-            elif category == "compression":
-                savings = self._calculate_compression_savings(scan_results, optimization)
-            else:
-                continue
-            
-            savings_list.append(savings)
-        
-        return savings_list
+        savings_list = [None] * len(optimizations)
+        arrays = self._to_soa(scan_results)
+        dispatch = self._dispatch
+        
+        file_count = (len(arrays.cold_sizes) + len(arrays.small_sizes) +
+                      len(arrays.orphan_sizes) + len(arrays.repl_sizes))
+        if len(optimizations) > 1 and file_count >= _PARALLEL_MIN_FILES:
+            # Categories are independent and the reductions release the GIL
+            max_workers = min(len(optimizations), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [None] * len(optimizations)
+                for i, optimization in enumerate(optimizations):
+                    calculate = dispatch.get(optimization.get("category", "unknown"))
+                    if calculate is not None:
+                        futures[i] = executor.submit(calculate, scan_results, optimization, arrays)
+                for i, future in enumerate(futures):
+                    if future is not None:
+                        savings_list[i] = future.result()
+        else:
+            for i, optimization in enumerate(optimizations):
+                calculate = dispatch.get(optimization.get("category", "unknown"))
+                if calculate is not None:
+                    savings_list[i] = calculate(scan_results, optimization, arrays)
+        
+        # Unknown categories are skipped
+        return [savings for savings in savings_list if savings is not None]
     
     def _calculate_cold_data_savings(self, scan_results: Dict[str, Any], 
-                                   optimization: Dict[str, Any]) -> OptimizationSavings:
+                                   optimization: Dict[str, Any],
+                                   arrays: Optional[ScanArrays] = None) -> OptimizationSavings:
         """Calculate savings from cold data optimization"""
-        cold_data = scan_results.get("cold_data", [])
-        cold_data_size_gb = sum(file.get("size", 0) for file in cold_data) / (1024 ** 3)
+        if arrays is None:
+            arrays = self._to_soa(scan_results)
+        cold_data_size_gb = self._sum_sizes_gb(arrays.cold_sizes)
         
         # Current cost (standard storage with 3x replication)
-        current_cost = cold_data_size_gb * self.costs.standard_storage_cost_per_gb * 3
+        current_cost = cold_data_size_gb * self.costs.standard_3x
         
         # Optimized cost (cold storage with 1.5x replication)
-        optimized_cost = cold_data_size_gb * self.costs.cold_storage_cost_per_gb * 1.5
+        optimized_cost = cold_data_size_gb * self.costs.cold_1p5x
         
         # Implementation cost (data movement)
         implementation_cost = cold_data_size_gb * self.costs.network_cost_per_gb
@@ -113,24 +241,22 @@ class CostCalculator:
         )
     
     def _calculate_small_file_savings(self, scan_results: Dict[str, Any], 
-                                    optimization: Dict[str, Any]) -> OptimizationSavings:
+                                    optimization: Dict[str, Any],
+                                    arrays: Optional[ScanArrays] = None) -> OptimizationSavings:
         """Calculate savings from small file consolidation"""
-        small_files = scan_results.get("small_files", [])
-        small_file_count = len(small_files)
-        small_file_size_gb = sum(file.get("size", 0) for file in small_files) / (1024 ** 3)
-        
-        # Current metadata overhead (100x normal metadata cost)
-        current_metadata_cost = small_file_count * self.costs.metadata_cost_per_file * 100
-        
-        # Current storage cost
-        current_storage_cost = small_file_size_gb * self.costs.standard_storage_cost_per_gb * 3
-        current_cost = current_metadata_cost + current_storage_cost
-        
-        # Optimized cost (after consolidation - assume 90% reduction in file count)
-        optimized_file_count = small_file_count * 0.1
-        optimized_metadata_cost = optimized_file_count * self.costs.metadata_cost_per_file * 100
-        optimized_storage_cost = small_file_size_gb * self.costs.standard_storage_cost_per_gb * 3
-        optimized_cost = optimized_metadata_cost + optimized_storage_cost
+        if arrays is None:
+            arrays = self._to_soa(scan_results)
+        small_file_count = len(arrays.small_sizes)
+        
+        # Metadata overhead is 100x normal metadata cost; consolidation
+        # assumes a 90% reduction in file count with unchanged storage
+        small_file_size_gb, current_cost, optimized_cost = _small_file_savings_nb(
+            arrays.small_sizes, small_file_count,
+            self.costs.small_file_meta_100x, self.costs.standard_3x
+        )
+        small_file_size_gb = float(small_file_size_gb)
+        current_cost = float(current_cost)
+        optimized_cost = float(optimized_cost)
         
         # Implementation cost (processing overhead)
         implementation_cost = small_file_count * 0.0001  # $0.0001 per file to process
@@ -150,28 +276,16 @@ class CostCalculator:
         )
     
     def _calculate_replication_savings(self, scan_results: Dict[str, Any], 
-                                     optimization: Dict[str, Any]) -> OptimizationSavings:
+                                     optimization: Dict[str, Any],
+                                     arrays: Optional[ScanArrays] = None) -> OptimizationSavings:
         """Calculate savings from replication optimization"""
-        # Look for over-replicated files in efficiency analysis
-        efficiency_analysis = scan_results.get("efficiency_analysis", {})
-        over_replicated = efficiency_analysis.get("inefficient_replication", [])
-        
-        total_savings = 0
-        total_size_gb = 0
+        if arrays is None:
+            arrays = self._to_soa(scan_results)
+        # Over-replicated files come from the efficiency analysis
+        total_size_gb = self._sum_sizes_gb(arrays.repl_sizes)
         
-        for file_info in over_replicated:
-            size_gb = file_info.get("size", 0) / (1024 ** 3)
-            current_replication = file_info.get("current_replication", 3)
-            suggested_replication = file_info.get("suggested_replication", 3)
-            
-            # Calculate savings from reducing replication
-            excess_replicas = current_replication - suggested_replication
-            file_savings = size_gb * self.costs.standard_storage_cost_per_gb * excess_replicas
-            total_savings += file_savings
-            total_size_gb += size_gb
-        
-        current_cost = total_size_gb * self.costs.standard_storage_cost_per_gb * 4  # Assume avg 4x replication
-        optimized_cost = total_size_gb * self.costs.standard_storage_cost_per_gb * 3  # Reduce to 3x
+        current_cost = total_size_gb * self.costs.standard_4x  # Assume avg 4x replication
+        optimized_cost = total_size_gb * self.costs.standard_3x  # Reduce to 3x
         
         savings = current_cost - optimized_cost
         savings_percent = (savings / current_cost) * 100 if current_cost > 0 else 0
@@ -188,14 +302,16 @@ class CostCalculator:
         )
     
     def _calculate_cleanup_savings(self, scan_results: Dict[str, Any], 
-                                 optimization: Dict[str, Any]) -> OptimizationSavings:
+                                 optimization: Dict[str, Any],
+                                 arrays: Optional[ScanArrays] = None) -> OptimizationSavings:
         """Calculate savings from cleanup operations"""
-        orphaned_files = scan_results.get("orphaned_files", [])
-        orphaned_size_gb = sum(file.get("size", 0) for file in orphaned_files) / (1024 ** 3)
+        if arrays is None:
+            arrays = self._to_soa(scan_results)
+        orphaned_size_gb = self._sum_sizes_gb(arrays.orphan_sizes)
         
         # Current cost (storage + metadata for orphaned files)
-        current_storage_cost = orphaned_size_gb * self.costs.standard_storage_cost_per_gb * 3
-        current_metadata_cost = len(orphaned_files) * self.costs.metadata_cost_per_file
+        current_storage_cost = orphaned_size_gb * self.costs.standard_3x
+        current_metadata_cost = len(arrays.orphan_sizes) * self.costs.metadata_cost_per_file
         current_cost = current_storage_cost + current_metadata_cost
         
         # Optimized cost (after cleanup)
@@ -216,7 +332,8 @@ class CostCalculator:
         )
     
     def _calculate_compression_savings(self, scan_results: Dict[str, Any], 
-                                     optimization: Dict[str, Any]) -> OptimizationSavings:
+                                     optimization: Dict[str, Any],
+                                     arrays: Optional[ScanArrays] = None) -> OptimizationSavings:
         """Calculate savings from data compression"""
         total_size_gb = scan_results.get("total_size_gb", 0)
         
@@ -225,10 +342,10 @@ class CostCalculator:
         compressed_size_gb = total_size_gb * (1 - compression_ratio)
         
         # Current cost
-        current_cost = total_size_gb * self.costs.standard_storage_cost_per_gb * 3
+        current_cost = total_size_gb * self.costs.standard_3x
         
         # Optimized cost (after compression)
-        optimized_cost = compressed_size_gb * self.costs.standard_storage_cost_per_gb * 3
+        optimized_cost = compressed_size_gb * self.costs.standard_3x
         
         # Implementation cost (CPU cycles for compression)
         implementation_cost = total_size_gb * 0.002  # $0.002 per GB for compression
@@ -248,34 +365,48 @@ class CostCalculator:
         )
     
     def generate_cost_report(self, scan_results: Dict[str, Any], 
-                           optimizations: List[Dict[str, Any]]) -> Dict[str, Any]:
+                           optimizations: List[Dict[str, Any]],
+                           optimization_savings: Optional[List[OptimizationSavings]] = None) -> Dict[str, Any]:
         """Generate comprehensive cost optimization report"""
         current_costs = self.calculate_current_costs(scan_results)
-        optimization_savings = self.calculate_optimization_savings(scan_results, optimizations)
+
+        # Callers that already computed the savings pass them in to avoid a second pass
+        if optimization_savings is None:
+            optimization_savings = self.calculate_optimization_savings(scan_results, optimizations)
+        
+        # Accumulate totals in the same pass that builds the breakdown
+        total_savings = 0
+        total_implementation_cost = 0
+        total_annual_savings = 0
+        optimization_breakdown = []
+        for saving in optimization_savings:
+            monthly_savings = saving.savings
+            implementation_cost = saving.implementation_cost
+            annual_savings = saving.annual_savings
+            
+            total_savings += monthly_savings
+            total_implementation_cost += implementation_cost
+            total_annual_savings += annual_savings
+            
+            optimization_breakdown.append({
+                "category": saving.category,
+                "monthly_savings": monthly_savings,
+                "annual_savings": annual_savings,
+                "savings_percent": saving.savings_percent,
+                "affected_data_gb": saving.affected_data_gb,
+                "implementation_cost": implementation_cost,
+                "payback_months": self._safe_div(implementation_cost, monthly_savings)
+            })
         
-        total_savings = sum(saving.savings for saving in optimization_savings)
-        total_implementation_cost = sum(saving.implementation_cost for saving in optimization_savings)
-        total_annual_savings = sum(saving.annual_savings for saving in optimization_savings)
         total_current_cost = current_costs["total_monthly_cost"]
         
         # Calculate ROI
-        roi_months = total_implementation_cost / total_savings if total_savings > 0 else float('inf')
-        roi_percent = (total_annual_savings / total_implementation_cost) * 100 if total_implementation_cost > 0 else float('inf')
+        roi_months = self._safe_div(total_implementation_cost, total_savings)
+        roi_percent = self._safe_div(total_annual_savings * 100, total_implementation_cost)
         
         return {
             "current_costs": current_costs,
-            "optimization_breakdown": [
-                {
-                    "category": saving.category,
-                    "monthly_savings": saving.savings,
-                    "annual_savings": saving.annual_savings,
-                    "savings_percent": saving.savings_percent,
-                    "affected_data_gb": saving.affected_data_gb,
-                    "implementation_cost": saving.implementation_cost,
-                    "payback_months": saving.implementation_cost / saving.savings if saving.savings > 0 else float('inf')
-                }
-                for saving in optimization_savings
-            ],
+            "optimization_breakdown": optimization_breakdown,
             "summary": {
                 "total_monthly_savings": total_savings,
                 "total_annual_savings": total_annual_savings,
@@ -288,27 +419,35 @@ class CostCalculator:
         }
     
     def estimate_storage_growth(self, scan_results: Dict[str, Any], 
-                              growth_rate_percent: float = 20) -> Dict[str, Any]:
+                              growth_rate_percent: float = 20,
+                              horizon_years: int = 3) -> Dict[str, Any]:
         """Estimate future storage costs based on growth rate"""
         current_size_gb = scan_results.get("total_size_gb", 0)
         current_costs = self.calculate_current_costs(scan_results)
         
-        # Project costs for next 3 years
+        # Project sizes and costs for every year of the horizon at once
+        years = np.arange(1, horizon_years + 1)
+        growth = (1 + growth_rate_percent / 100) ** years
+        projected_sizes = current_size_gb * growth
+        projected_monthly = current_costs["total_monthly_cost"] * growth
+        projected_annual = projected_monthly * 12
+        
         projections = []
-        for year in range(1, 4):
-            projected_size = current_size_gb * ((1 + growth_rate_percent / 100) ** year)
-            projected_monthly_cost = (projected_size / current_size_gb) * current_costs["total_monthly_cost"]
-            
+        for year, projected_size, monthly_cost, annual_cost in zip(
+            years.tolist(), projected_sizes.tolist(), projected_monthly.tolist(), projected_annual.tolist()
+        ):
             projections.append({
                 "year": year,
                 "projected_size_gb": projected_size,
-                "projected_monthly_cost": projected_monthly_cost,
-                "projected_annual_cost": projected_monthly_cost * 12
+                "projected_monthly_cost": monthly_cost,
+                "projected_annual_cost": annual_cost
             })
         
         return {
             "current_size_gb": current_size_gb,
             "growth_rate_percent": growth_rate_percent,
+            "horizon_years": horizon_years,
             "projections": projections,
-            "three_year_total_cost": sum(p["projected_annual_cost"] for p in projections)
+            "three_year_total_cost": float(projected_annual[:3].sum()),
+            "total_projected_cost": float(projected_annual.sum())
         }
\ No newline at end of file
@@ -2,13 +2,17 @@
 Demo mode for HDFS Cost Advisor - runs without requiring actual HDFS cluster
 """
 
-import json
 import logging
 import asyncio
 import uuid
 from typing import Dict, Any, List
 from datetime import datetime
-import random
+import numpy as np
+from .hdfs.analyzer import HDFSMetadataAnalyzer, FILE_DTYPE
+from .utils.storage import format_json
+
+# Scan result fields shown by the CLI; the per-file analysis lists are left out
+SUMMARY_KEYS = ("scan_id", "status", "message", "total_files", "total_size_gb", "error", "demo_mode")
 
 class DemoHDFSClient:
     """Mock HDFS client for demo purposes"""
@@ -16,6 +20,7 @@ class DemoHDFSClient:
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.rng = np.random.default_rng()
         
     def get_cluster_metrics(self) -> Dict[str, Any]:
         """Generate mock cluster metrics"""
@@ -40,71 +45,68 @@ class DemoHDFSClient:
         """Always return true for demo"""
         return True
     
+    def _mock_category(self, count: int, path_prefix: str, path_suffix: str, size, replication,
+                       access_time, modification_time) -> np.ndarray:
+        """Build one category of mock files as a structured array"""
+        files = np.empty(count, dtype=FILE_DTYPE)
+        files["path"] = np.char.add(np.char.add(path_prefix, np.arange(count).astype("U")), path_suffix)
+        files["size"] = size
+        files["replication"] = replication
+        files["access_time"] = access_time
+        files["modification_time"] = modification_time
+        files["owner"] = "hadoop"
+        files["group"] = "hadoop"
+        return files
+    
     def scan_directory_batch(self, path: str, max_depth: int = 3):
-        """Generate mock file metadata"""
-        mock_files = []
+        """Generate mock file metadata as structured array batches"""
+        rng = self.rng
         
-        # Generate various types of files for testing
-        file_types = [
+        # Generate various types of files for testing, one vectorized block per category
+        mock_files = np.concatenate([
             # Old files (cold data candidates)
-            {
-                "path": f"{path}/logs/old_log_{i}.txt",
-                "size": random.randint(1024*1024, 100*1024*1024),  # 1MB - 100MB
-                "replication": 3,
-                "access_time": 1640995200000 - random.randint(0, 365*24*60*60*1000),  # Old
-                "modification_time": 1640995200000,
-                "owner": "hadoop",
-                "group": "hadoop"
-            } for i in range(10)
-        ] + [
+            self._mock_category(
+                10, f"{path}/logs/old_log_", ".txt",
+                size=rng.integers(1024*1024, 100*1024*1024, size=10, endpoint=True),  # 1MB - 100MB
+                replication=3,
+                access_time=1640995200000 - rng.integers(0, 365*24*60*60*1000, size=10, endpoint=True),  # Old
+                modification_time=1640995200000
+            ),
             # Small files
-            {
-                "path": f"{path}/small/file_{i}.txt",
-                "size": random.randint(1024, 1024*1024),  # 1KB - 1MB
-                "replication": 3,
-                "access_time": 1672531200000,  # Recent
-                "modification_time": 1672531200000,
-                "owner": "hadoop",
-                "group": "hadoop"
-            } for i in range(20)
-        ] + [
+            self._mock_category(
+                20, f"{path}/small/file_", ".txt",
+                size=rng.integers(1024, 1024*1024, size=20, endpoint=True),  # 1KB - 1MB
+                replication=3,
+                access_time=1672531200000,  # Recent
+                modification_time=1672531200000
+            ),
             # Normal files
-            {
-                "path": f"{path}/data/dataset_{i}.parquet",
-                "size": random.randint(64*1024*1024, 512*1024*1024),  # 64MB - 512MB
-                "replication": 3,
-                "access_time": 1672531200000,
-                "modification_time": 1672531200000,
-                "owner": "hadoop",
-                "group": "hadoop"
-            } for i in range(15)
-        ] + [
+            self._mock_category(
+                15, f"{path}/data/dataset_", ".parquet",
+                size=rng.integers(64*1024*1024, 512*1024*1024, size=15, endpoint=True),  # 64MB - 512MB
+                replication=3,
+                access_time=1672531200000,
+                modification_time=1672531200000
+            ),
             # Temporary files
-            {
-                "path": f"/tmp/temp_file_{i}.tmp",
-                "size": random.randint(1024*1024, 50*1024*1024),  # 1MB - 50MB
-                "replication": 3,
-                "access_time": 1640995200000,  # Old
-                "modification_time": 1640995200000,
-                "owner": "hadoop",
-                "group": "hadoop"
-            } for i in range(5)
-        ] + [
+            self._mock_category(
+                5, "/tmp/temp_file_", ".tmp",
+                size=rng.integers(1024*1024, 50*1024*1024, size=5, endpoint=True),  # 1MB - 50MB
+                replication=3,
+                access_time=1640995200000,  # Old
+                modification_time=1640995200000
+            ),
             # Over-replicated files
-            {
-                "path": f"{path}/replicated/important_{i}.data",
-                "size": random.randint(100*1024*1024, 1024*1024*1024),  # 100MB - 1GB
-                "replication": random.randint(5, 8),  # Over-replicated
-                "access_time": 1672531200000,
-                "modification_time": 1672531200000,
-                "owner": "hadoop",
-                "group": "hadoop"
-            } for i in range(8)
-        ]
-        
-        mock_files.extend(file_types)
+            self._mock_category(
+                8, f"{path}/replicated/important_", ".data",
+                size=rng.integers(100*1024*1024, 1024*1024*1024, size=8, endpoint=True),  # 100MB - 1GB
+                replication=rng.integers(5, 8, size=8, endpoint=True),  # Over-replicated
+                access_time=1672531200000,
+                modification_time=1672531200000
+            )
+        ])
         
-        # Return in batches
+        # Return in batches; slices are views, so no rows are copied
         batch_size = 25
         for i in range(0, len(mock_files), batch_size):
             yield mock_files[i:i + batch_size]
@@ -112,10 +114,12 @@ class DemoHDFSClient:
 class DemoLLMClient:
     """Mock LLM client for demo purposes"""
     
-    def __init__(self, provider, api_key):
+    def __init__(self, provider, api_key, delay: float = 2.0, max_concurrent: int = 8):
         self.provider = provider
         self.api_key = api_key
+        self.delay = delay
         self.logger = logging.getLogger(__name__)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
     
     async def analyze_hdfs_cost_optimization(self, scan_results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate mock LLM analysis"""
@@ -124,10 +128,11 @@ class DemoLLMClient:
         cold_data_count = len(scan_results.get('cold_data', []))
         small_files_count = len(scan_results.get('small_files', []))
         
-        # Simulate LLM processing time
-        await asyncio.sleep(2)
+        # Derive the cost figures once and reuse them below
+        current_monthly_cost = total_size_gb * 0.04 * 3  # $0.04/GB with 3x replication
+        monthly_savings = current_monthly_cost * 0.4  # 40% reduction
         
-        return {
+        analysis = {
             "analysis_summary": f"""Based on the analysis of {total_files} files ({total_size_gb:.1f}GB total), I've identified several significant cost optimization opportunities:
 
 1. **Cold Data Migration**: {cold_data_count} files haven't been accessed recently and could be moved to cold storage
@@ -205,10 +210,10 @@ The analysis shows potential for 35-50% cost reduction through strategic optimiz
             ],
             
             "cost_calculations": {
-                "current_monthly_cost": total_size_gb * 0.04 * 3,  # $0.04/GB with 3x replication
-                "optimized_monthly_cost": total_size_gb * 0.04 * 3 * 0.6,  # 40% reduction
-                "monthly_savings": total_size_gb * 0.04 * 3 * 0.4,
-                "annual_savings": total_size_gb * 0.04 * 3 * 0.4 * 12
+                "current_monthly_cost": current_monthly_cost,
+                "optimized_monthly_cost": current_monthly_cost - monthly_savings,
+                "monthly_savings": monthly_savings,
+                "annual_savings": monthly_savings * 12
             },
             
             "risk_assessment": {
@@ -226,6 +231,19 @@ The analysis shows potential for 35-50% cost reduction through strategic optimiz
             
             "confidence_score": 0.92
         }
+        
+        # Simulate LLM processing time; concurrent analyses overlap up to the limit
+        async with self._semaphore:
+            await asyncio.sleep(self.delay)
+        
+        return analysis
+    
+    async def analyze_many(self, scan_results_list: List[Dict[str, Any]]) -> List[Any]:
+        """Generate mock LLM analyses for several scans concurrently"""
+        return await asyncio.gather(
+            *(self.analyze_hdfs_cost_optimization(scan_results) for scan_results in scan_results_list),
+            return_exceptions=True
+        )
 
 class DemoMCPServer:
     """Demo MCP server that works without real HDFS cluster"""
@@ -245,32 +263,71 @@ class DemoMCPServer:
         
         self.logger.info("Demo MCP Server initialized")
 
-    async def scan_hdfs(self, paths: List[str], scan_depth: int = 3) -> Dict[str, Any]:
+    async def scan_hdfs(self, paths: List[str], scan_depth: int = 3,
+                        max_concurrent: int = 4) -> Dict[str, Any]:
         """Demo HDFS scan"""
         try:
             from .endpoints import scan
-            from .hdfs.analyzer import HDFSMetadataAnalyzer
             
             scan_id = str(uuid.uuid4())
             self.logger.info(f"Demo scan {scan_id} for paths: {paths}")
             
+            # Drop repeated paths (order-preserving) and paths that do not exist
+            paths = list(dict.fromkeys(paths))
+            exists = await asyncio.gather(
+                *(asyncio.to_thread(self.hdfs_client.check_path_exists, path) for path in paths)
+            )
+            for path, path_exists in zip(paths, exists):
+                if not path_exists:
+                    self.logger.warning(f"Demo scan skipping missing path {path}")
+            paths = [path for path, path_exists in zip(paths, exists) if path_exists]
+            
+            if not paths:
+                result = {
+                    "scan_id": scan_id,
+                    "status": "completed",
+                    "message": "Demo scan completed - no paths to scan",
+                    "total_files": 0,
+                    "total_size_gb": 0.0,
+                    "cold_data": [],
+                    "duplicate_candidates": [],
+                    "small_files": [],
+                    "orphaned_files": [],
+                    "over_replicated_files": [],
+                    "demo_mode": True
+                }
+                scan.store_scan_results(scan_id, result)
+                return result
+            
             # Get mock cluster metrics
             cluster_metrics = self.hdfs_client.get_cluster_metrics()
             
-            # Get mock file data
-            all_files = []
-            for path in paths:
-                for batch in self.hdfs_client.scan_directory_batch(path, scan_depth):
-                    all_files.extend(batch)
+            # Get mock file data, scanning paths concurrently with bounded fan-out
+            semaphore = asyncio.Semaphore(max_concurrent)
+            
+            def collect(path: str) -> np.ndarray:
+                batches = list(self.hdfs_client.scan_directory_batch(path, scan_depth))
+                return np.concatenate(batches) if batches else np.empty(0, dtype=FILE_DTYPE)
+            
+            async def scan_path(path: str) -> np.ndarray:
+                async with semaphore:
+                    return await asyncio.to_thread(collect, path)
+            
+            results = await asyncio.gather(*(scan_path(path) for path in paths), return_exceptions=True)
+            for path, path_result in zip(paths, results):
+                if isinstance(path_result, Exception):
+                    self.logger.warning(f"Demo scan of {path} failed: {path_result}")
+            path_files = [path_result for path_result in results if not isinstance(path_result, Exception)]
+            all_files = np.concatenate(path_files) if path_files else np.empty(0, dtype=FILE_DTYPE)
             
             # Analyze with real analyzer
-            analyzer = HDFSMetadataAnalyzer()
-            cold_data = analyzer.identify_cold_data(all_files)
-            duplicates = analyzer.detect_duplicate_candidates(all_files)
-            efficiency = analyzer.analyze_file_efficiency(all_files)
-            orphaned = analyzer.identify_orphaned_temp_files(all_files)
+            analysis = HDFSMetadataAnalyzer().analyze_all(all_files)
+            cold_data = analysis["cold_data"]
+            duplicates = analysis["duplicate_candidates"]
+            efficiency = analysis["efficiency"]
+            orphaned = analysis["orphaned_files"]
             
-            total_size = sum(file.get("size", 0) for file in all_files)
+            total_size = int(all_files["size"].sum())
             total_size_gb = total_size / (1024 ** 3)
             
             result = {
@@ -290,7 +347,7 @@ class DemoMCPServer:
             }
             
             # Store in scan module for later retrieval
-            scan.scan_results_storage[scan_id] = result
+            scan.store_scan_results(scan_id, result)
             
             return result
             
@@ -306,7 +363,7 @@ class DemoMCPServer:
         """Demo cost optimization"""
         try:
             from .endpoints import scan
-            from .endpoints.optimize import optimization_results_storage
+            from .endpoints.optimize import store_optimization_results
             from .endpoints.generate_script import store_optimization_plan
             
             scan_results = scan.get_scan_results(scan_id)
@@ -314,14 +371,19 @@ class DemoMCPServer:
             # Get LLM analysis
             llm_analysis = await self.llm_client.analyze_hdfs_cost_optimization(scan_results)
             
+            cost_calculations = llm_analysis["cost_calculations"]
+            monthly_savings = cost_calculations["monthly_savings"]
+            annual_savings = cost_calculations["annual_savings"]
+            affected_data_gb = scan_results["total_size_gb"] * 0.6
+            
             # Create optimization plan
             optimization_id = str(uuid.uuid4())
             optimization_plan = {
                 "plan_id": optimization_id,
                 "optimizations": llm_analysis["recommendations"],
-                "total_monthly_savings": llm_analysis["cost_calculations"]["monthly_savings"],
-                "total_annual_savings": llm_analysis["cost_calculations"]["annual_savings"],
-                "affected_data_gb": scan_results["total_size_gb"] * 0.6,
+                "total_monthly_savings": monthly_savings,
+                "total_annual_savings": annual_savings,
+                "affected_data_gb": affected_data_gb,
                 "demo_mode": True
             }
             
@@ -332,15 +394,15 @@ class DemoMCPServer:
                 "llm_analysis": llm_analysis,
                 "optimization_plan": optimization_plan,
                 "summary": {
-                    "total_monthly_savings": llm_analysis["cost_calculations"]["monthly_savings"],
-                    "total_annual_savings": llm_analysis["cost_calculations"]["annual_savings"],
-                    "affected_data_gb": scan_results["total_size_gb"] * 0.6
+                    "total_monthly_savings": monthly_savings,
+                    "total_annual_savings": annual_savings,
+                    "affected_data_gb": affected_data_gb
                 },
                 "demo_mode": True
             }
             
             # Store results
-            optimization_results_storage[optimization_id] = result
+            store_optimization_results(optimization_id, result)
             store_optimization_plan(optimization_id, optimization_plan)
             
             return result
@@ -367,7 +429,7 @@ class DemoMCPServer:
         """Demo summary generation"""
         try:
             from .endpoints import summary
-            result = summary.generate_summary(scan_id, self.cost_calculator)
+            result = await asyncio.to_thread(summary.generate_summary, scan_id, self.cost_calculator)
             result["demo_mode"] = True
             return result
             
@@ -397,6 +459,61 @@ class DemoMCPServer:
             }
 
 # Demo CLI
+async def _cli_scan(server: DemoMCPServer, args: List[str]) -> None:
+    """Handle the scan command"""
+    paths = args if args else ["/data", "/logs"]
+    print(f"Scanning paths: {paths}")
+    result = await server.scan_hdfs(paths)
+    print(format_json({k: result[k] for k in SUMMARY_KEYS if k in result}))
+    print(f"\nScan ID: {result.get('scan_id')}")
+
+async def _cli_optimize(server: DemoMCPServer, args: List[str]) -> None:
+    """Handle the optimize command"""
+    print(f"Optimizing scan: {args[0]}")
+    result = await server.optimize_costs(args[0])
+    if 'llm_analysis' in result:
+        print(f"Analysis: {result['llm_analysis']['analysis_summary']}")
+        print(f"Recommendations: {len(result['llm_analysis']['recommendations'])}")
+        print(f"Monthly savings: ${result['summary']['total_monthly_savings']:.2f}")
+        print(f"Optimization ID: {result.get('optimization_id')}")
+    else:
+        print(format_json(result))
+
+async def _cli_script(server: DemoMCPServer, args: List[str]) -> None:
+    """Handle the script command"""
+    print(f"Generating script for: {args[0]}")
+    result = await server.generate_script(args[0])
+    print(result[:500] + "..." if len(result) > 500 else result)
+
+async def _cli_summary(server: DemoMCPServer, args: List[str]) -> None:
+    """Handle the summary command"""
+    print(f"Getting summary for: {args[0]}")
+    result = await server.get_summary(args[0])
+    if 'optimization_opportunities' in result:
+        print(f"Total files: {result['scan_info']['total_files']}")
+        print(f"Total size: {result['scan_info']['total_size_gb']:.1f} GB")
+        print(f"Projected savings: ${result['projected_savings']['projected_monthly_savings']:.2f}/month")
+    else:
+        print(format_json(result))
+
+async def _cli_health(server: DemoMCPServer, args: List[str]) -> None:
+    """Handle the health command"""
+    result = await server.get_cluster_health()
+    print(f"Cluster status: {result['status']}")
+    if 'cluster_metrics' in result:
+        fs = result['cluster_metrics']['filesystem']
+        print(f"Capacity: {fs['capacity_used']/fs['capacity_total']*100:.1f}% used")
+        print(f"Files: {fs['files_total']:,}")
+
+# Command name -> (handler, minimum number of arguments)
+CLI_HANDLERS = {
+    "scan": (_cli_scan, 0),
+    "optimize": (_cli_optimize, 1),
+    "script": (_cli_script, 1),
+    "summary": (_cli_summary, 1),
+    "health": (_cli_health, 0)
+}
+
 async def demo_cli():
     """Demo command-line interface"""
     print("=== HDFS Cost Advisor - DEMO MODE ===")
@@ -415,51 +532,21 @@ async def demo_cli():
     
     while True:
         try:
-            command = input("demo> ").strip().split()
+            # Read input off the event loop so background tasks keep running
+            command = (await asyncio.to_thread(input, "demo> ")).strip().split()
             if not command:
                 continue
                 
             if command[0] == "quit":
                 break
-            elif command[0] == "scan":
-                paths = command[1:] if len(command) > 1 else ["/data", "/logs"]
-                print(f"Scanning paths: {paths}")
-                result = await server.scan_hdfs(paths)
-                print(json.dumps({k: v for k, v in result.items() if k not in ['cold_data', 'small_files', 'orphaned_files']}, indent=2))
-                print(f"\nScan ID: {result.get('scan_id')}")
-            elif command[0] == "optimize" and len(command) > 1:
-                print(f"Optimizing scan: {command[1]}")
-                result = await server.optimize_costs(command[1])
-                if 'llm_analysis' in result:
-                    print(f"Analysis: {result['llm_analysis']['analysis_summary']}")
-                    print(f"Recommendations: {len(result['llm_analysis']['recommendations'])}")
-                    print(f"Monthly savings: ${result['summary']['total_monthly_savings']:.2f}")
-                    print(f"Optimization ID: {result.get('optimization_id')}")
-                else:
-                    print(json.dumps(result, indent=2))
-            elif command[0] == "script" and len(command) > 1:
-                print(f"Generating script for: {command[1]}")
-                result = await server.generate_script(command[1])
-                print(result[:500] + "..." if len(result) > 500 else result)
-            elif command[0] == "summary" and len(command) > 1:
-                print(f"Getting summary for: {command[1]}")
-                result = await server.get_summary(command[1])
-                if 'optimization_opportunities' in result:
-                    print(f"Total files: {result['scan_info']['total_files']}")
-                    print(f"Total size: {result['scan_info']['total_size_gb']:.1f} GB")
-                    print(f"Projected savings: ${result['projected_savings']['projected_monthly_savings']:.2f}/month")
-                else:
-                    print(json.dumps(result, indent=2))
-            elif command[0] == "health":
-                result = await server.get_cluster_health()
-                print(f"Cluster status: {result['status']}")
-                if 'cluster_metrics' in result:
-                    fs = result['cluster_metrics']['filesystem']
-                    print(f"Capacity: {fs['capacity_used']/fs['capacity_total']*100:.1f}% used")
-                    print(f"Files: {fs['files_total']:,}")
-            else:
+            
+            handler, min_args = CLI_HANDLERS.get(command[0], (None, 0))
+            if handler is None or len(command) - 1 < min_args:
                 print("Invalid command. Available: scan, optimize, script, summary, health, quit")
-        except KeyboardInterrupt:
+                continue
+            
+            await handler(server, command[1:])
+        except (KeyboardInterrupt, EOFError):
             break
         except Exception as e:
             print(f"Error: {e}")
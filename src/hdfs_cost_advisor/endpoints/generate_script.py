@@ -1,19 +1,13 @@
-from typing import Dict, Any, List
-from jinja2 import Template
+from typing import Dict, Any, List, TextIO, Iterator
+from jinja2 import Environment
 import logging
+import threading
 from datetime import datetime
 import json
 import os
+from ..utils.storage import JsonTTLCache
 
-class HDFSScriptGenerator:
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.script_storage = {}  # In-memory storage for demo
-    
-    def generate_optimization_script(self, optimization_plan: Dict[str, Any]) -> str:
-        """Generate comprehensive HDFS optimization script"""
-        
-        script_template = Template("""#!/bin/bash
+_SCRIPT_HEADER_SRC = """#!/bin/bash
 # HDFS Cost Optimization Script
 # Generated: {{ timestamp }}
 # Optimization Plan ID: {{ plan_id }}
@@ -105,157 +99,158 @@ log INFO "Estimated monthly savings: ${{ total_monthly_savings }}"
 check_hdfs_access
 create_backup
 
-{% for optimization in optimizations %}
-{% if optimization.category == "cold_data" %}
-# ========================================
+"""
+
+# Per-file sections are emitted with f-strings; Jinja only renders each category's frame
+def _render_cold_file(file: Dict[str, Any]) -> str:
+    """Render the cold storage commands for one file"""
+    path = file["path"]
+    return (
+        f"# Processing: {path}\n"
+        f"log INFO \"Moving {path} to cold storage ({round(file['size_gb'], 2)}GB)\"\n\n"
+        f"# Set cold storage policy\n"
+        f"execute_command \"hdfs storagepolicies -setStoragePolicy -path '{path}' -policy COLD\"     \"Set cold storage policy for {path}\"\n\n"
+        f"# Reduce replication factor\n"
+        f"execute_command \"hdfs dfs -setrep 1 '{path}'\"     \"Reduce replication for {path}\"\n\n"
+        f"# Verify storage policy\n"
+        f"if [ \"$DRY_RUN\" = \"false\" ]; then\n"
+        f"    POLICY=$(hdfs storagepolicies -getStoragePolicy -path '{path}' | grep -o 'COLD\\|HOT\\|WARM')\n"
+        f"    log INFO \"Storage policy for {path}: $POLICY\"\n"
+        f"fi\n\n"
+    )
+
+def _render_small_files_directory(directory: Dict[str, Any]) -> str:
+    """Render the consolidation commands for one directory of small files"""
+    path = directory["path"]
+    small_files = directory.get("small_files", [])
+    removals = "".join(
+        f"execute_command \"hdfs dfs -rm '{file['path']}'\"     \"Remove small file {file['path']}\"\n"
+        for file in small_files
+    )
+    return (
+        f"# Processing directory: {path}\n"
+        f"log INFO \"Consolidating small files in {path}\"\n\n"
+        f"TEMP_FILE=\"/tmp/consolidated_$(basename '{path}')_$(date +%Y%m%d_%H%M%S)\"\n"
+        f"CONSOLIDATED_PATH=\"{path}/consolidated_$(date +%Y%m%d_%H%M%S)\"\n\n"
+        f"# Create consolidated file\n"
+        f"execute_command \"hdfs dfs -getmerge '{path}' '$TEMP_FILE'\"     \"Merge small files from {path}\"\n\n"
+        f"# Upload consolidated file\n"
+        f"execute_command \"hdfs dfs -put '$TEMP_FILE' '$CONSOLIDATED_PATH'\"     \"Upload consolidated file to $CONSOLIDATED_PATH\"\n\n"
+        f"# Remove original small files\n"
+        f"{removals}\n"
+        f"# Clean up temporary file\n"
+        f"execute_command \"rm -f '$TEMP_FILE'\"     \"Clean up temporary file\"\n\n"
+        f"log INFO \"Consolidated {len(small_files)} files in {path}\"\n"
+    )
+
+def _render_replication_file(file: Dict[str, Any]) -> str:
+    """Render the replication change commands for one file"""
+    path = file["path"]
+    suggested = file["suggested_replication"]
+    return (
+        f"# Optimizing replication for: {path}\n"
+        f"log INFO \"Reducing replication for {path} from {file['current_replication']} to {suggested}\"\n\n"
+        f"execute_command \"hdfs dfs -setrep {suggested} '{path}'\"     \"Set replication factor for {path}\"\n\n"
+        f"# Verify replication\n"
+        f"if [ \"$DRY_RUN\" = \"false\" ]; then\n"
+        f"    REPLICATION=$(hdfs dfs -stat %r '{path}')\n"
+        f"    log INFO \"New replication factor for {path}: $REPLICATION\"\n"
+        f"fi\n\n"
+    )
+
+def _render_cleanup_file(file: Dict[str, Any]) -> str:
+    """Render the removal commands for one orphaned or empty file"""
+    path = file["path"]
+    backup = ""
+    if file.get("cleanup_priority") == "critical":
+        backup = (
+            f"execute_command \"hdfs dfs -cp '{path}' '$BACKUP_DIR/$(basename '{path}')'\"     "
+            f"\"Backup critical file before deletion\"\n"
+        )
+    return (
+        f"# Removing orphaned file: {path}\n"
+        f"log INFO \"Removing orphaned file {path} ({round(file.get('age_days', 0), 1)} days old)\"\n\n"
+        f"# Create safety backup for critical files\n"
+        f"{backup}\n"
+        f"# Remove the file (skip trash for temp files)\n"
+        f"execute_command \"hdfs dfs -rm -skipTrash '{path}'\"     \"Remove orphaned file {path}\"\n\n"
+    )
+
+def _render_compression_file(file: Dict[str, Any]) -> str:
+    """Render the compression commands for one file"""
+    path = file["path"]
+    return (
+        f"# Compressing: {path}\n"
+        f"log INFO \"Compressing {path} ({round(file['size_gb'], 2)}GB)\"\n\n"
+        f"TEMP_COMPRESSED=\"/tmp/compressed_$(basename '{path}').gz\"\n"
+        f"COMPRESSED_PATH=\"{path}.gz\"\n\n"
+        f"# Download, compress, and re-upload\n"
+        f"execute_command \"hdfs dfs -get '{path}' - | gzip > '$TEMP_COMPRESSED'\"     \"Download and compress {path}\"\n\n"
+        f"execute_command \"hdfs dfs -put '$TEMP_COMPRESSED' '$COMPRESSED_PATH'\"     \"Upload compressed file\"\n\n"
+        f"execute_command \"hdfs dfs -rm '{path}'\"     \"Remove original uncompressed file\"\n\n"
+        f"execute_command \"rm -f '$TEMP_COMPRESSED'\"     \"Clean up temporary compressed file\"\n\n"
+        f"log INFO \"Compressed {path} successfully\"\n"
+    )
+
+# Category -> (plan key holding the items, per-item renderer)
+_ITEM_RENDERERS = {
+    "cold_data": ("files", _render_cold_file),
+    "small_files": ("directories", _render_small_files_directory),
+    "replication": ("files", _render_replication_file),
+    "cleanup": ("files", _render_cleanup_file),
+    "compression": ("files", _render_compression_file)
+}
+
+# One section frame per optimization category; per-item commands are streamed in at `{{ items_block }}`
+_CATEGORY_SCRIPT_SRCS = {
+    "cold_data": """# ========================================
 # Cold Data Optimization
 # ========================================
 log INFO "Starting cold data optimization..."
 log INFO "Files to process: {{ optimization.files|length }}"
 
-{% for file in optimization.files %}
-# Processing: {{ file.path }}
-log INFO "Moving {{ file.path }} to cold storage ({{ file.size_gb|round(2) }}GB)"
-
-# Set cold storage policy
-execute_command "hdfs storagepolicies -setStoragePolicy -path '{{ file.path }}' -policy COLD" \
-    "Set cold storage policy for {{ file.path }}"
+{{ items_block }}log INFO "Cold data optimization completed"
 
-# Reduce replication factor
-execute_command "hdfs dfs -setrep 1 '{{ file.path }}'" \
-    "Reduce replication for {{ file.path }}"
-
-# Verify storage policy
-if [ "$DRY_RUN" = "false" ]; then
-    POLICY=$(hdfs storagepolicies -getStoragePolicy -path '{{ file.path }}' | grep -o 'COLD\\|HOT\\|WARM')
-    log INFO "Storage policy for {{ file.path }}: $POLICY"
-fi
-
-{% endfor %}
-log INFO "Cold data optimization completed"
-{% endif %}
-
-{% if optimization.category == "small_files" %}
-# ========================================
+""",
+    "small_files": """# ========================================
 # Small Files Consolidation
 # ========================================
 log INFO "Starting small files consolidation..."
 log INFO "Directories to process: {{ optimization.directories|length }}"
 
-{% for directory in optimization.directories %}
-# Processing directory: {{ directory.path }}
-log INFO "Consolidating small files in {{ directory.path }}"
-
-TEMP_FILE="/tmp/consolidated_$(basename '{{ directory.path }}')_$(date +%Y%m%d_%H%M%S)"
-CONSOLIDATED_PATH="{{ directory.path }}/consolidated_$(date +%Y%m%d_%H%M%S)"
+{{ items_block }}log INFO "Small files consolidation completed"
 
-# Create consolidated file
-execute_command "hdfs dfs -getmerge '{{ directory.path }}' '$TEMP_FILE'" \
-    "Merge small files from {{ directory.path }}"
-
-# Upload consolidated file
-execute_command "hdfs dfs -put '$TEMP_FILE' '$CONSOLIDATED_PATH'" \
-    "Upload consolidated file to $CONSOLIDATED_PATH"
-
-# Remove original small files
-{% for file in directory.small_files %}
-execute_command "hdfs dfs -rm '{{ file.path }}'" \
-    "Remove small file {{ file.path }}"
-{% endfor %}
-
-# Clean up temporary file
-execute_command "rm -f '$TEMP_FILE'" \
-    "Clean up temporary file"
-
-log INFO "Consolidated {{ directory.small_files|length }} files in {{ directory.path }}"
-{% endfor %}
-log INFO "Small files consolidation completed"
-{% endif %}
-
-{% if optimization.category == "replication" %}
-# ========================================
+""",
+    "replication": """# ========================================
 # Replication Optimization
 # ========================================
 log INFO "Starting replication optimization..."
 log INFO "Files to process: {{ optimization.files|length }}"
 
-{% for file in optimization.files %}
-# Optimizing replication for: {{ file.path }}
-log INFO "Reducing replication for {{ file.path }} from {{ file.current_replication }} to {{ file.suggested_replication }}"
-
-execute_command "hdfs dfs -setrep {{ file.suggested_replication }} '{{ file.path }}'" \
-    "Set replication factor for {{ file.path }}"
-
-# Verify replication
-if [ "$DRY_RUN" = "false" ]; then
-    REPLICATION=$(hdfs dfs -stat %r '{{ file.path }}')
-    log INFO "New replication factor for {{ file.path }}: $REPLICATION"
-fi
-
-{% endfor %}
-log INFO "Replication optimization completed"
-{% endif %}
+{{ items_block }}log INFO "Replication optimization completed"
 
-{% if optimization.category == "cleanup" %}
-# ========================================
+""",
+    "cleanup": """# ========================================
 # Cleanup Orphaned Files
 # ========================================
 log INFO "Starting cleanup of orphaned files..."
 log INFO "Files to remove: {{ optimization.files|length }}"
 
-{% for file in optimization.files %}
-# Removing orphaned file: {{ file.path }}
-log INFO "Removing orphaned file {{ file.path }} ({{ file.age_days|round(1) }} days old)"
-
-# Create safety backup for critical files
-{% if file.cleanup_priority == "critical" %}
-execute_command "hdfs dfs -cp '{{ file.path }}' '$BACKUP_DIR/$(basename '{{ file.path }}')'" \
-    "Backup critical file before deletion"
-{% endif %}
-
-# Remove the file (skip trash for temp files)
-execute_command "hdfs dfs -rm -skipTrash '{{ file.path }}'" \
-    "Remove orphaned file {{ file.path }}"
+{{ items_block }}log INFO "Cleanup completed"
 
-{% endfor %}
-log INFO "Cleanup completed"
-{% endif %}
-
-{% if optimization.category == "compression" %}
-# ========================================
+""",
+    "compression": """# ========================================
 # Data Compression
 # ========================================
 log INFO "Starting data compression optimization..."
 log INFO "Files to compress: {{ optimization.files|length }}"
 
-{% for file in optimization.files %}
-# Compressing: {{ file.path }}
-log INFO "Compressing {{ file.path }} ({{ file.size_gb|round(2) }}GB)"
+{{ items_block }}log INFO "Data compression completed"
 
-TEMP_COMPRESSED="/tmp/compressed_$(basename '{{ file.path }}').gz"
-COMPRESSED_PATH="{{ file.path }}.gz"
-
-# Download, compress, and re-upload
-execute_command "hdfs dfs -get '{{ file.path }}' - | gzip > '$TEMP_COMPRESSED'" \
-    "Download and compress {{ file.path }}"
-
-execute_command "hdfs dfs -put '$TEMP_COMPRESSED' '$COMPRESSED_PATH'" \
-    "Upload compressed file"
-
-execute_command "hdfs dfs -rm '{{ file.path }}'" \
-    "Remove original uncompressed file"
-
-execute_command "rm -f '$TEMP_COMPRESSED'" \
-    "Clean up temporary compressed file"
-
-log INFO "Compressed {{ file.path }} successfully"
-{% endfor %}
-log INFO "Data compression completed"
-{% endif %}
-
-{% endfor %}
+"""
+}
 
-# ========================================
+_SCRIPT_FOOTER_SRC = """# ========================================
 # Post-Optimization Tasks
 # ========================================
 log INFO "Running post-optimization tasks..."
@@ -272,8 +267,8 @@ hdfs fsck / -files -blocks > "$BACKUP_DIR/fsck_after.txt"
 
 # Calculate actual savings
 log INFO "Calculating storage savings..."
-BEFORE_USED=$(grep "DFS Used:" "$BACKUP_DIR/cluster_report_before.txt" | awk '{print $3}')
-AFTER_USED=$(grep "DFS Used:" "$BACKUP_DIR/cluster_report_after.txt" | awk '{print $3}')
+BEFORE_USED=$(awk '/DFS Used:/ {print $3; exit}' "$BACKUP_DIR/cluster_report_before.txt")
+AFTER_USED=$(awk '/DFS Used:/ {print $3; exit}' "$BACKUP_DIR/cluster_report_after.txt")
 
 log INFO "Storage before optimization: $BEFORE_USED"
 log INFO "Storage after optimization: $AFTER_USED"
@@ -314,27 +309,21 @@ echo "Affected Data: {{ affected_data_gb }}GB"
 echo "Backup Location: $BACKUP_DIR"
 echo "Log File: $LOG_FILE"
 echo "========================================"
-""")
-        
-        return script_template.render(
-            timestamp=datetime.utcnow().isoformat(),
-            plan_id=optimization_plan.get("plan_id", "unknown"),
-            optimizations=optimization_plan.get("optimizations", []),
-            total_monthly_savings=optimization_plan.get("total_monthly_savings", 0),
-            total_annual_savings=optimization_plan.get("total_annual_savings", 0),
-            affected_data_gb=optimization_plan.get("affected_data_gb", 0)
-        )
-    
-    def generate_monitoring_script(self) -> str:
-        """Generate monitoring script for post-optimization tracking"""
-        
-        monitoring_template = Template("""#!/bin/bash
+"""
+
+_MONITORING_SCRIPT_SRC = """#!/bin/bash
 # HDFS Cost Monitoring Script
 # Run this script regularly to track optimization effectiveness
 
 LOG_FILE="/var/log/hdfs_monitoring_$(date +%Y%m%d).log"
 REPORT_FILE="/var/log/hdfs_cost_report_$(date +%Y%m%d).json"
 
+# Scratch files for the cluster-wide listing and fsck report, shared by the analysis steps
+WORK_DIR=$(mktemp -d /tmp/hdfs_monitoring.XXXXXX)
+trap 'rm -rf "$WORK_DIR"' EXIT
+LISTING_FILE="$WORK_DIR/listing.txt"
+FSCK_FILE="$WORK_DIR/fsck.txt"
+
 # Colors
 GREEN='\\033[0;32m'
 YELLOW='\\033[1;33m'
@@ -360,13 +349,22 @@ log() {
     esac
 }
 
+# Walk the namespace once; every analysis below reads these files instead of re-walking HDFS
+collect_cluster_listing() {
+    log INFO "Collecting namespace listing and fsck report..."
+    
+    hdfs dfs -ls -R / 2>/dev/null > "$LISTING_FILE" || true
+    hdfs fsck / -storagepolicies 2>/dev/null > "$FSCK_FILE" || true
+}
+
 # Function to get cluster metrics
 get_cluster_metrics() {
-    local report=$(hdfs dfsadmin -report)
-    
-    local total_capacity=$(echo "$report" | grep "Configured Capacity:" | awk '{print $3}')
-    local used_capacity=$(echo "$report" | grep "DFS Used:" | awk '{print $3}')
-    local remaining_capacity=$(echo "$report" | grep "DFS Remaining:" | awk '{print $3}')
+    # Read the cluster-wide totals (the first match of each) in a single awk pass
+    local total_capacity used_capacity remaining_capacity
+    read -r total_capacity used_capacity remaining_capacity < <(
+        hdfs dfsadmin -report | awk '/Configured Capacity:/ && !c { c = $3 } /DFS Used:/ && !u { u = $3 }
+            /DFS Remaining:/ && !r { r = $3 } END { print c, u, r }'
+    )
     
     echo "{"
     echo "  \"cluster_metrics\": {"
@@ -381,17 +379,20 @@ get_cluster_metrics() {
 analyze_file_distribution() {
     log INFO "Analyzing file distribution..."
     
-    local total_files=$(hdfs dfs -count -h / | awk '{print $2}')
     local total_size=$(hdfs dfs -du -s -h / | awk '{print $1}')
     
-    # Count small files (< 64MB)
-    local small_files=$(hdfs dfs -find / -type f -exec hdfs dfs -stat %b {} \\; | awk '$1 < 67108864' | wc -l)
+    # Count all files and small files (< 64MB) in one pass over the listing
+    local total_files small_files small_files_percentage
+    read -r total_files small_files small_files_percentage < <(
+        awk -v thresh=67108864 '$1 ~ /^-/ { total++; if ($5 < thresh) small++ }
+            END { printf "%d %d %.2f\\n", total, small, total ? small * 100 / total : 0 }' "$LISTING_FILE"
+    )
     
     echo "  \"file_distribution\": {"
     echo "    \"total_files\": $total_files,"
     echo "    \"total_size\": \"$total_size\","
     echo "    \"small_files_count\": $small_files,"
-    echo "    \"small_files_percentage\": $(echo "scale=2; $small_files * 100 / $total_files" | bc -l)"
+    echo "    \"small_files_percentage\": $small_files_percentage"
     echo "  },"
 }
 
@@ -399,14 +400,17 @@ analyze_file_distribution() {
 analyze_storage_policies() {
     log INFO "Analyzing storage policies..."
     
-    local hot_files=$(hdfs dfs -find / -type f -exec hdfs storagepolicies -getStoragePolicy -path {} \\; | grep -c "HOT" || echo 0)
-    local cold_files=$(hdfs dfs -find / -type f -exec hdfs storagepolicies -getStoragePolicy -path {} \\; | grep -c "COLD" || echo 0)
-    local warm_files=$(hdfs dfs -find / -type f -exec hdfs storagepolicies -getStoragePolicy -path {} \\; | grep -c "WARM" || echo 0)
+    # Block counts per policy from the fsck storage policy summary
+    local hot_blocks cold_blocks warm_blocks
+    read -r hot_blocks cold_blocks warm_blocks < <(
+        awk '/\\(HOT\\)/ { hot += $2 } /\\(COLD\\)/ { cold += $2 } /\\(WARM\\)/ { warm += $2 }
+            END { printf "%d %d %d\\n", hot, cold, warm }' "$FSCK_FILE"
+    )
     
     echo "  \"storage_policies\": {"
-    echo "    \"hot_files\": $hot_files,"
-    echo "    \"cold_files\": $cold_files,"
-    echo "    \"warm_files\": $warm_files"
+    echo "    \"hot_blocks\": $hot_blocks,"
+    echo "    \"cold_blocks\": $cold_blocks,"
+    echo "    \"warm_blocks\": $warm_blocks"
     echo "  },"
 }
 
@@ -414,14 +418,15 @@ analyze_storage_policies() {
 analyze_replication() {
     log INFO "Analyzing replication factors..."
     
-    local avg_replication=$(hdfs fsck / -files -blocks -replication | grep "Average block replication" | awk '{print $4}')
-    local over_replicated=$(hdfs fsck / -files -blocks -replication | grep "Over-replicated" | wc -l)
-    local under_replicated=$(hdfs fsck / -files -blocks -replication | grep "Under-replicated" | wc -l)
+    # Summary counts from the shared fsck report
+    local avg_replication=$(awk '/Average block replication/ {print $4; exit}' "$FSCK_FILE")
+    local over_replicated=$(awk '/Over-replicated blocks/ {print $3; exit}' "$FSCK_FILE")
+    local under_replicated=$(awk '/Under-replicated blocks/ {print $3; exit}' "$FSCK_FILE")
     
     echo "  \"replication_analysis\": {"
     echo "    \"average_replication\": \"$avg_replication\","
-    echo "    \"over_replicated_blocks\": $over_replicated,"
-    echo "    \"under_replicated_blocks\": $under_replicated"
+    echo "    \"over_replicated_blocks\": ${over_replicated:-0},"
+    echo "    \"under_replicated_blocks\": ${under_replicated:-0}"
     echo "  },"
 }
 
@@ -444,6 +449,8 @@ calculate_cost_estimates() {
 main() {
     log INFO "Starting HDFS cost monitoring..."
     
+    collect_cluster_listing
+    
     # Generate JSON report
     {
         get_cluster_metrics
@@ -470,14 +477,9 @@ main() {
 
 # Run main function
 main "$@"
-""")
-        
-        return monitoring_template.render()
-    
-    def generate_rollback_script(self, optimization_id: str) -> str:
-        """Generate rollback script for optimization"""
-        
-        rollback_template = Template("""#!/bin/bash
+"""
+
+_ROLLBACK_SCRIPT_SRC = """#!/bin/bash
 # HDFS Optimization Rollback Script
 # Generated: {{ timestamp }}
 # Optimization ID: {{ optimization_id }}
@@ -552,41 +554,130 @@ main() {
 }
 
 main "$@"
-""")
+"""
+
+# Templates are parsed once at import; trim/lstrip keep block tags from emitting blank lines
+_ENV = Environment(trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True,
+                   autoescape=False, auto_reload=False)
+SCRIPT_HEADER_TEMPLATE = _ENV.from_string(_SCRIPT_HEADER_SRC)
+# Each frame is split at the items marker into (head, tail) templates
+CATEGORY_TEMPLATES = {
+    category: tuple(map(_ENV.from_string, source.split("{{ items_block }}")))
+    for category, source in _CATEGORY_SCRIPT_SRCS.items()
+}
+SCRIPT_FOOTER_TEMPLATE = _ENV.from_string(_SCRIPT_FOOTER_SRC)
+# Number of per-item commands joined into one output chunk
+_ITEM_BATCH_SIZE = 256
+MONITORING_TEMPLATE = _ENV.from_string(_MONITORING_SCRIPT_SRC)
+# The monitoring script takes no parameters, so it is rendered once
+MONITORING_SCRIPT = MONITORING_TEMPLATE.render()
+ROLLBACK_TEMPLATE = _ENV.from_string(_ROLLBACK_SCRIPT_SRC)
+
+class HDFSScriptGenerator:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        # In-memory storage for demo, bounded and time-limited like the scan and optimization storage
+        self.script_storage = JsonTTLCache(maxsize=1024, ttl=3600)
+        self.script_storage_lock = threading.Lock()
+    
+    def generate_optimization_script(self, optimization_plan: Dict[str, Any]) -> str:
+        """Generate comprehensive HDFS optimization script"""
+        return "".join(self.iter_optimization_script(optimization_plan))
+    
+    def generate_optimization_script_stream(self, optimization_plan: Dict[str, Any], out: TextIO) -> None:
+        """Stream the HDFS optimization script to a file object chunk by chunk"""
+        out.writelines(self.iter_optimization_script(optimization_plan))
+    
+    def iter_optimization_script(self, optimization_plan: Dict[str, Any]) -> Iterator[str]:
+        """Yield the HDFS optimization script in chunks without building the full text"""
+        context = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "plan_id": optimization_plan.get("plan_id", "unknown"),
+            "optimizations": optimization_plan.get("optimizations", []),
+            "total_monthly_savings": optimization_plan.get("total_monthly_savings", 0),
+            "total_annual_savings": optimization_plan.get("total_annual_savings", 0),
+            "affected_data_gb": optimization_plan.get("affected_data_gb", 0)
+        }
+        
+        yield from SCRIPT_HEADER_TEMPLATE.generate(context)
+        
+        # Each optimization renders only its own category section
+        for optimization in context["optimizations"]:
+            category = optimization.get("category")
+            frame = CATEGORY_TEMPLATES.get(category)
+            if frame is not None:
+                head, tail = frame
+                items_key, render_item = _ITEM_RENDERERS[category]
+                items = optimization.get(items_key, [])
+                
+                yield from head.generate(optimization=optimization)
+                for start in range(0, len(items), _ITEM_BATCH_SIZE):
+                    yield "".join(map(render_item, items[start:start + _ITEM_BATCH_SIZE]))
+                yield from tail.generate(optimization=optimization)
         
-        return rollback_template.render(
+        yield from SCRIPT_FOOTER_TEMPLATE.generate(context)
+    
+    def generate_monitoring_script(self) -> str:
+        """Generate monitoring script for post-optimization tracking"""
+        return MONITORING_SCRIPT
+    
+    def generate_rollback_script(self, optimization_id: str) -> str:
+        """Generate rollback script for optimization"""
+        return ROLLBACK_TEMPLATE.render(
             timestamp=datetime.utcnow().isoformat(),
             optimization_id=optimization_id
         )
     
     def store_optimization_plan(self, plan_id: str, plan: Dict[str, Any]) -> None:
         """Store optimization plan for script generation"""
-        self.script_storage[plan_id] = {
-            "plan": plan,
-            "created_at": datetime.utcnow().isoformat(),
-            "status": "ready"
-        }
+        with self.script_storage_lock:
+            self.script_storage[plan_id] = {
+                "plan": plan,
+                "created_at": datetime.utcnow().isoformat(),
+                "status": "ready"
+            }
         self.logger.info(f"Stored optimization plan: {plan_id}")
     
     def get_optimization_plan(self, plan_id: str) -> Dict[str, Any]:
         """Retrieve stored optimization plan"""
-        if plan_id not in self.script_storage:
+        with self.script_storage_lock:
+            stored = self.script_storage.get(plan_id)
+        
+        if stored is None:
             raise ValueError(f"Optimization plan not found: {plan_id}")
         
-        return self.script_storage[plan_id]["plan"]
+        return stored["plan"]
 
 # Module-level functions for use by server
 script_generator = HDFSScriptGenerator()
 
+def _failed_script(optimization_id: str, error: Exception) -> str:
+    """Fallback script returned when generation fails"""
+    logging.error(f"Failed to generate script for {optimization_id}: {error}")
+    return f"#!/bin/bash\necho 'Script generation failed: {str(error)}'\nexit 1"
+
+def stream_optimization_script(optimization_id: str) -> Iterator[str]:
+    """Yield the optimization script in chunks for streaming transports"""
+    try:
+        optimization_plan = script_generator.get_optimization_plan(optimization_id)
+    except Exception as e:
+        yield _failed_script(optimization_id, e)
+        return
+    yield from script_generator.iter_optimization_script(optimization_plan)
+
 def create_optimization_script(optimization_id: str) -> str:
     """Main function to generate optimization script"""
     try:
-        optimization_plan = script_generator.get_optimization_plan(optimization_id)
-        script = script_generator.generate_optimization_script(optimization_plan)
-        return script
+        return "".join(stream_optimization_script(optimization_id))
     except Exception as e:
-        logging.error(f"Failed to generate script for {optimization_id}: {e}")
-        return f"#!/bin/bash\necho 'Script generation failed: {str(e)}'\nexit 1"
+        return _failed_script(optimization_id, e)
+
+def write_optimization_script(optimization_id: str, path: str) -> None:
+    """Stream the optimization script straight to a file without building it in memory"""
+    optimization_plan = script_generator.get_optimization_plan(optimization_id)
+    with open(path, "w") as out:
+        script_generator.generate_optimization_script_stream(optimization_plan, out)
+    logging.info(f"Wrote optimization script for {optimization_id} to {path}")
 
 def create_monitoring_script() -> str:
     """Generate monitoring script"""
@@ -1,8 +1,16 @@
 import logging
-from typing import Dict, Any, List
+import math
+import operator
+import sys
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime
 import uuid
+import asyncio
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
 from ..hdfs.client import HDFSClient
+from ..utils.storage import JsonTTLCache
 from ..llm.client import LLMClient
 from ..cost.calculator import CostCalculator
 from .scan import get_scan_results
@@ -10,11 +18,68 @@ from .generate_script import store_optimization_plan
 
 logger = logging.getLogger(__name__)
 
-# In-memory storage for optimization results
-optimization_results_storage = {}
+# Bytes -> GiB as a multiply; exact, since 1024 ** 3 is a power of two
+_GIB_INV = 1.0 / (1024 ** 3)
+
+# Estimated monthly savings rates, in dollars per GB
+_COLD_PER_GB = 0.03  # HOT -> COLD storage price difference
+_REPLICATION_PER_GB = 0.04  # Per GB of redundant replicas removed
+_GENERIC_PER_GB = 0.04
+_CLEANUP_PER_GB = 0.04 * 3  # Full storage savings at the default replication factor
+
+# Response keys for each OptimizationSavings row and the attributes they are read from
+_SAVING_KEYS = ("category", "current_cost", "optimized_cost", "monthly_savings", "annual_savings",
+                "savings_percent", "affected_data_gb", "implementation_cost")
+_SAVING_GET = operator.attrgetter("category", "current_cost", "optimized_cost", "savings", "annual_savings",
+                                  "savings_percent", "affected_data_gb", "implementation_cost")
+
+# Tag values repeated on every plan entry; one shared object each. Scan results come back
+# from JSON storage as fresh strings, so values read from them are interned on the way in
+_POLICY_HOT = sys.intern("HOT")
+_TYPE_ORPHANED = sys.intern("orphaned")
+_TYPE_EMPTY = sys.intern("empty")
+_PRIORITY_MEDIUM = sys.intern("medium")
+_PRIORITY_LOW = sys.intern("low")
+
+class OptimizationNotFoundError(ValueError):
+    """Raised when optimization results are missing or have expired"""
+
+@dataclass(slots=True)
+class _SavingsSummary:
+    """Running totals over a list of OptimizationSavings"""
+    total_monthly_savings: float = 0.0
+    total_annual_savings: float = 0.0
+    total_implementation_cost: float = 0.0
+    affected_data_gb: float = 0.0
+    categories: set = field(default_factory=set)
+    
+    def add(self, saving: Any) -> None:
+        self.total_monthly_savings += saving.savings
+        self.total_annual_savings += saving.annual_savings
+        self.total_implementation_cost += saving.implementation_cost
+        self.affected_data_gb += saving.affected_data_gb
+        self.categories.add(saving.category)
+
+# In-memory storage for optimization results, bounded like the scan storage
+optimization_results_storage = JsonTTLCache(maxsize=1024, ttl=3600)
+# Summary projection of each stored result, so listing never has to deserialize full
+# results. It has no eviction of its own: rows are dropped once the storage has evicted
+# or expired their results, so both always cover the same IDs
+optimization_index: Dict[str, Dict[str, Any]] = {}
+optimization_results_lock = threading.Lock()
+
+def _get_completed_scan(scan_id: str) -> Dict[str, Any]:
+    """Return the stored results of a scan that completed"""
+    scan_results = get_scan_results(scan_id)
+    
+    if scan_results.get("status") != "completed":
+        raise ValueError(f"Scan {scan_id} is not completed or failed")
+    return scan_results
 
 async def generate_recommendations(scan_id: str, hdfs_client: HDFSClient, 
-                                 llm_client: LLMClient, cost_calculator: CostCalculator) -> Dict[str, Any]:
+                                 llm_client: LLMClient, cost_calculator: CostCalculator,
+                                 scan_results: Optional[Dict[str, Any]] = None,
+                                 llm_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Generate cost optimization recommendations based on scan results"""
     
     optimization_id = str(uuid.uuid4())
@@ -22,33 +87,40 @@ async def generate_recommendations(scan_id: str, hdfs_client: HDFSClient,
     try:
         logger.info(f"Starting optimization analysis {optimization_id} for scan {scan_id}")
         
-        # Get scan results
-        scan_results = get_scan_results(scan_id)
-        
-        if scan_results.get("status") != "completed":
-            raise ValueError(f"Scan {scan_id} is not completed or failed")
+        # Get scan results, unless a batch already loaded them
+        if scan_results is None:
+            scan_results = _get_completed_scan(scan_id)
         
-        # Calculate current costs
-        current_costs = cost_calculator.calculate_current_costs(scan_results)
-        
-        # Generate LLM analysis
-        llm_analysis = await llm_client.analyze_hdfs_cost_optimization(scan_results)
+        if llm_analysis is None:
+            # Calculate current costs in a worker thread while the LLM analysis is in flight
+            current_costs, llm_analysis = await asyncio.gather(
+                asyncio.to_thread(cost_calculator.calculate_current_costs, scan_results),
+                llm_client.analyze_hdfs_cost_optimization(scan_results)
+            )
+        else:
+            current_costs = await asyncio.to_thread(cost_calculator.calculate_current_costs, scan_results)
         
-        # Create optimization plan from LLM recommendations
-        optimization_plan = _create_optimization_plan(
-            scan_results, llm_analysis, current_costs, cost_calculator
+        # Create optimization plan from LLM recommendations; file selection is CPU-bound
+        optimization_plan = await asyncio.to_thread(
+            _create_optimization_plan, scan_results, llm_analysis, current_costs, cost_calculator
         )
         
-        # Calculate detailed savings
-        optimization_savings = cost_calculator.calculate_optimization_savings(
-            scan_results, optimization_plan.get("optimizations", [])
+        # Calculate detailed savings once, off the event loop, and build the cost report from them
+        optimizations = optimization_plan.get("optimizations", [])
+        optimization_savings = await asyncio.to_thread(
+            cost_calculator.calculate_optimization_savings, scan_results, optimizations
         )
-        
-        # Generate cost report
-        cost_report = cost_calculator.generate_cost_report(
-            scan_results, optimization_plan.get("optimizations", [])
+        cost_report = await asyncio.to_thread(
+            cost_calculator.generate_cost_report, scan_results, optimizations, optimization_savings
         )
         
+        # One pass builds the serializable savings rows and accumulates the summary totals
+        savings_summary = _SavingsSummary()
+        savings_rows = []
+        for saving in optimization_savings:
+            savings_summary.add(saving)
+            savings_rows.append(dict(zip(_SAVING_KEYS, _SAVING_GET(saving))))
+        
         # Create comprehensive optimization results
         optimization_results = {
             "optimization_id": optimization_id,
@@ -66,36 +138,25 @@ async def generate_recommendations(scan_id: str, hdfs_client: HDFSClient,
             "optimization_plan": optimization_plan,
             
             # Savings analysis
-            "optimization_savings": [
-                {
-                    "category": saving.category,
-                    "current_cost": saving.current_cost,
-                    "optimized_cost": saving.optimized_cost,
-                    "monthly_savings": saving.savings,
-                    "annual_savings": saving.annual_savings,
-                    "savings_percent": saving.savings_percent,
-                    "affected_data_gb": saving.affected_data_gb,
-                    "implementation_cost": saving.implementation_cost
-                }
-                for saving in optimization_savings
-            ],
+            "optimization_savings": savings_rows,
             
             # Cost report
             "cost_report": cost_report,
             
             # Summary metrics
             "summary": {
-                "total_monthly_savings": sum(s.savings for s in optimization_savings),
-                "total_annual_savings": sum(s.annual_savings for s in optimization_savings),
-                "total_implementation_cost": sum(s.implementation_cost for s in optimization_savings),
-                "roi_months": _calculate_roi_months(optimization_savings),
-                "affected_data_gb": sum(s.affected_data_gb for s in optimization_savings),
-                "optimization_categories": list(set(s.category for s in optimization_savings))
+                "total_monthly_savings": savings_summary.total_monthly_savings,
+                "total_annual_savings": savings_summary.total_annual_savings,
+                "total_implementation_cost": savings_summary.total_implementation_cost,
+                "roi_months": _calculate_roi_months(savings_summary.total_monthly_savings,
+                                                    savings_summary.total_implementation_cost),
+                "affected_data_gb": savings_summary.affected_data_gb,
+                "optimization_categories": list(savings_summary.categories)
             }
         }
         
         # Store results
-        optimization_results_storage[optimization_id] = optimization_results
+        store_optimization_results(optimization_id, optimization_results)
         
         # Store optimization plan for script generation
         store_optimization_plan(optimization_id, optimization_plan)
@@ -113,9 +174,34 @@ async def generate_recommendations(scan_id: str, hdfs_client: HDFSClient,
             "created_at": datetime.utcnow().isoformat()
         }
         
-        optimization_results_storage[optimization_id] = error_result
+        store_optimization_results(optimization_id, error_result)
         raise
 
+async def generate_recommendations_batch(scan_ids: List[str], hdfs_client: HDFSClient,
+                                         llm_client: LLMClient, cost_calculator: CostCalculator) -> List[Any]:
+    """Generate recommendations for several scans, in order, with their LLM analyses sent as one batch; a scan that failed comes back as its exception"""
+    
+    # Scans that cannot be loaded are left to generate_recommendations to report
+    scans = {}
+    for scan_id in scan_ids:
+        try:
+            scans[scan_id] = _get_completed_scan(scan_id)
+        except Exception:
+            pass
+    
+    analyses = dict(zip(scans, await llm_client.analyze_many(list(scans.values()))))
+    
+    async def recommend(scan_id: str) -> Dict[str, Any]:
+        llm_analysis = analyses.get(scan_id)
+        if isinstance(llm_analysis, BaseException):
+            raise llm_analysis
+        return await generate_recommendations(
+            scan_id, hdfs_client, llm_client, cost_calculator,
+            scan_results=scans.get(scan_id), llm_analysis=llm_analysis
+        )
+    
+    return await asyncio.gather(*(recommend(scan_id) for scan_id in scan_ids), return_exceptions=True)
+
 def _create_optimization_plan(scan_results: Dict[str, Any], llm_analysis: Dict[str, Any],
                             current_costs: Dict[str, Any], cost_calculator: CostCalculator) -> Dict[str, Any]:
     """Create detailed optimization plan from LLM analysis and scan results"""
@@ -125,31 +211,27 @@ def _create_optimization_plan(scan_results: Dict[str, Any], llm_analysis: Dict[s
     # Extract optimizations from LLM analysis
     llm_recommendations = llm_analysis.get("recommendations", [])
     
-    # Create detailed optimization actions
+    # Create detailed optimization actions, one per file-selecting category
     optimizations = []
     
-    for recommendation in llm_recommendations:
-        category = recommendation.get("category", "unknown")
+    for category, recommendation in _strongest_recommendations(llm_recommendations):
+        handler = _OPTIMIZATION_HANDLERS.get(category)
         
-        if category == "cold_data":
-            optimization = _create_cold_data_optimization(scan_results, recommendation)
-        elif category == "small_files":
-            optimization = _create_small_files_optimization(scan_results, recommendation)
-        elif category == "replication":
-            optimization = _create_replication_optimization(scan_results, recommendation)
-        elif category == "cleanup":
-            optimization = _create_cleanup_optimization(scan_results, recommendation)
-        else:
+        if handler is None:
             # Generic optimization
             optimization = _create_generic_optimization(scan_results, recommendation)
+        else:
+            create_optimization, select_files, source_keys = handler
+            selected = select_files(*(scan_results.get(key, ()) for key in source_keys))
+            optimization = create_optimization(scan_results, recommendation, selected)
         
         if optimization:
             optimizations.append(optimization)
     
     # Calculate totals
-    total_monthly_savings = sum(opt.get("estimated_monthly_savings", 0) for opt in optimizations)
+    total_monthly_savings = math.fsum(opt.get("estimated_monthly_savings", 0) for opt in optimizations)
+    affected_data_gb = math.fsum(opt.get("affected_data_gb", 0) for opt in optimizations)
     total_annual_savings = total_monthly_savings * 12
-    affected_data_gb = sum(opt.get("affected_data_gb", 0) for opt in optimizations)
     
     return {
         "plan_id": plan_id,
@@ -161,21 +243,48 @@ def _create_optimization_plan(scan_results: Dict[str, Any], llm_analysis: Dict[s
         "estimated_implementation_time": _estimate_implementation_time(optimizations)
     }
 
-def _create_cold_data_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any]) -> Dict[str, Any]:
-    """Create cold data optimization actions"""
-    cold_data = scan_results.get("cold_data", [])
-    
-    # Select files for cold storage migration
+def _strongest_recommendations(llm_recommendations: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Keep the recommendation with the largest estimated savings for each handled category"""
+    # A repeated handled category would rescan the same scan results and double-count its
+    # savings, so it keeps the place of its first recommendation. Generic recommendations
+    # only copy their own fields and are all kept
+    selected = []
+    handled = {}
+    for recommendation in llm_recommendations:
+        category = sys.intern(str(recommendation.get("category", "unknown")))
+        if category not in _OPTIMIZATION_HANDLERS:
+            selected.append((category, recommendation))
+            continue
+        
+        index = handled.get(category)
+        if index is None:
+            handled[category] = len(selected)
+            selected.append((category, recommendation))
+        elif recommendation.get("estimated_savings_gb", 0) > selected[index][1].get("estimated_savings_gb", 0):
+            selected[index] = (category, recommendation)
+    return selected
+
+def _select_cold_data_files(cold_data: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Select cold files to migrate to cheaper storage"""
     files_to_migrate = []
     for file_info in cold_data:
-        if file_info.get("days_since_access", 0) > 90:  # Files not accessed in 90+ days
+        days_since_access = file_info.get("days_since_access", 0)
+        if days_since_access > 90:  # Files not accessed in 90+ days
+            size = file_info.get("size", 0)
             files_to_migrate.append({
                 "path": file_info.get("path"),
-                "size": file_info.get("size", 0),
-                "size_gb": file_info.get("size", 0) / (1024 ** 3),
-                "days_since_access": file_info.get("days_since_access", 0),
-                "current_storage_policy": "HOT"
+                "size": size,
+                "size_gb": size * _GIB_INV,
+                "days_since_access": days_since_access,
+                "current_storage_policy": _POLICY_HOT
             })
+    return files_to_migrate
+
+def _create_cold_data_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any],
+                                   files_to_migrate: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Create cold data optimization actions"""
+    if files_to_migrate is None:
+        files_to_migrate = _select_cold_data_files(scan_results.get("cold_data", ()))
     
     if not files_to_migrate:
         return None
@@ -185,41 +294,47 @@ def _create_cold_data_optimization(scan_results: Dict[str, Any], recommendation:
         "title": recommendation.get("title", "Cold Data Migration"),
         "description": recommendation.get("description", "Migrate cold data to cheaper storage"),
         "files": files_to_migrate,
-        "estimated_monthly_savings": recommendation.get("estimated_savings_gb", 0) * 0.03,  # $0.03 savings per GB
-        "affected_data_gb": sum(f["size_gb"] for f in files_to_migrate),
+        "estimated_monthly_savings": recommendation.get("estimated_savings_gb", 0) * _COLD_PER_GB,
+        "affected_data_gb": math.fsum(f["size_gb"] for f in files_to_migrate),
         "implementation_complexity": recommendation.get("implementation_complexity", "medium"),
         "timeline": recommendation.get("timeline", "1-2 weeks")
     }
 
-def _create_small_files_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any]) -> Dict[str, Any]:
-    """Create small files consolidation actions"""
-    small_files = scan_results.get("small_files", [])
-    
-    # Group small files by directory
-    directory_groups = {}
+def _select_small_file_directories(small_files: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Select directories holding enough small files to consolidate"""
+    # Group small files by directory, accumulating each directory's size in the same pass
+    directory_groups = defaultdict(lambda: {"files": [], "total_size_gb": 0.0})
     for file_info in small_files:
         path = file_info.get("path", "")
-        directory = "/".join(path.split("/")[:-1])
-        
-        if directory not in directory_groups:
-            directory_groups[directory] = []
+        size = file_info.get("size", 0)
+        size_gb = size * _GIB_INV
         
-        directory_groups[directory].append({
+        group = directory_groups[path.rpartition("/")[0]]
+        group["files"].append({
             "path": path,
-            "size": file_info.get("size", 0),
-            "size_gb": file_info.get("size", 0) / (1024 ** 3)
+            "size": size,
+            "size_gb": size_gb
         })
+        group["total_size_gb"] += size_gb
     
-    # Select directories with many small files
-    directories_to_consolidate = []
-    for directory, files in directory_groups.items():
-        if len(files) >= 10:  # Directories with 10+ small files
-            directories_to_consolidate.append({
-                "path": directory,
-                "small_files": files,
-                "file_count": len(files),
-                "total_size_gb": sum(f["size_gb"] for f in files)
-            })
+    # Select directories with many small files (10+)
+    return [
+        {
+            "path": directory,
+            "small_files": group["files"],
+            "file_count": len(group["files"]),
+            "total_size_gb": group["total_size_gb"]
+        }
+        for directory, group in directory_groups.items()
+        if len(group["files"]) >= 10
+    ]
+
+def _create_small_files_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any],
+                                     directories_to_consolidate: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Create small files consolidation actions"""
+    small_files = scan_results.get("small_files", ())
+    if directories_to_consolidate is None:
+        directories_to_consolidate = _select_small_file_directories(small_files)
     
     if not directories_to_consolidate:
         return None
@@ -230,24 +345,30 @@ def _create_small_files_optimization(scan_results: Dict[str, Any], recommendatio
         "description": recommendation.get("description", "Consolidate small files to reduce overhead"),
         "directories": directories_to_consolidate,
         "estimated_monthly_savings": len(small_files) * 0.001,  # $0.001 per small file
-        "affected_data_gb": sum(d["total_size_gb"] for d in directories_to_consolidate),
+        "affected_data_gb": math.fsum(d["total_size_gb"] for d in directories_to_consolidate),
         "implementation_complexity": recommendation.get("implementation_complexity", "high"),
         "timeline": recommendation.get("timeline", "1 month")
     }
 
-def _create_replication_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any]) -> Dict[str, Any]:
-    """Create replication optimization actions"""
-    over_replicated = scan_results.get("over_replicated_files", [])
-    
+def _select_replication_files(over_replicated_files: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Select over-replicated files to bring back to the default factor"""
     files_to_optimize = []
-    for file_info in over_replicated:
+    for file_info in over_replicated_files:
+        size = file_info.get("size", 0)
         files_to_optimize.append({
             "path": file_info.get("path"),
-            "size": file_info.get("size", 0),
-            "size_gb": file_info.get("size", 0) / (1024 ** 3),
+            "size": size,
+            "size_gb": size * _GIB_INV,
             "current_replication": file_info.get("current_replication", 3),
             "suggested_replication": file_info.get("suggested_replication", 3)
         })
+    return files_to_optimize
+
+def _create_replication_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any],
+                                     files_to_optimize: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Create replication optimization actions"""
+    if files_to_optimize is None:
+        files_to_optimize = _select_replication_files(scan_results.get("over_replicated_files", ()))
     
     if not files_to_optimize:
         return None
@@ -257,28 +378,27 @@ def _create_replication_optimization(scan_results: Dict[str, Any], recommendatio
         "title": recommendation.get("title", "Replication Optimization"),
         "description": recommendation.get("description", "Optimize replication factors"),
         "files": files_to_optimize,
-        "estimated_monthly_savings": recommendation.get("estimated_savings_gb", 0) * 0.04,  # $0.04 per GB saved
-        "affected_data_gb": sum(f["size_gb"] for f in files_to_optimize),
+        "estimated_monthly_savings": recommendation.get("estimated_savings_gb", 0) * _REPLICATION_PER_GB,
+        "affected_data_gb": math.fsum(f["size_gb"] for f in files_to_optimize),
         "implementation_complexity": recommendation.get("implementation_complexity", "low"),
         "timeline": recommendation.get("timeline", "immediate")
     }
 
-def _create_cleanup_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any]) -> Dict[str, Any]:
-    """Create cleanup optimization actions"""
-    orphaned_files = scan_results.get("orphaned_files", [])
-    empty_files = scan_results.get("empty_files", [])
-    
+def _select_cleanup_files(orphaned_files: Sequence[Dict[str, Any]],
+                          empty_files: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Select orphaned and empty files to delete"""
     files_to_delete = []
     
     # Add orphaned files
     for file_info in orphaned_files:
+        size = file_info.get("size", 0)
         files_to_delete.append({
             "path": file_info.get("path"),
-            "size": file_info.get("size", 0),
-            "size_gb": file_info.get("size", 0) / (1024 ** 3),
-            "type": "orphaned",
+            "size": size,
+            "size_gb": size * _GIB_INV,
+            "type": _TYPE_ORPHANED,
             "age_days": file_info.get("age_days", 0),
-            "cleanup_priority": file_info.get("cleanup_priority", "medium")
+            "cleanup_priority": sys.intern(str(file_info.get("cleanup_priority", _PRIORITY_MEDIUM)))
         })
     
     # Add empty files
@@ -287,20 +407,31 @@ def _create_cleanup_optimization(scan_results: Dict[str, Any], recommendation: D
             "path": file_info.get("path"),
             "size": file_info.get("size", 0),
             "size_gb": 0,
-            "type": "empty",
-            "cleanup_priority": "low"
+            "type": _TYPE_EMPTY,
+            "cleanup_priority": _PRIORITY_LOW
         })
     
+    return files_to_delete
+
+def _create_cleanup_optimization(scan_results: Dict[str, Any], recommendation: Dict[str, Any],
+                                 files_to_delete: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Create cleanup optimization actions"""
+    if files_to_delete is None:
+        files_to_delete = _select_cleanup_files(scan_results.get("orphaned_files", ()),
+                                                scan_results.get("empty_files", ()))
+    
     if not files_to_delete:
         return None
     
+    total_size_gb = math.fsum(f["size_gb"] for f in files_to_delete)
+    
     return {
         "category": "cleanup",
         "title": recommendation.get("title", "File Cleanup"),
         "description": recommendation.get("description", "Remove unnecessary files"),
         "files": files_to_delete,
-        "estimated_monthly_savings": sum(f["size_gb"] for f in files_to_delete) * 0.04 * 3,  # Full storage savings
-        "affected_data_gb": sum(f["size_gb"] for f in files_to_delete),
+        "estimated_monthly_savings": total_size_gb * _CLEANUP_PER_GB,
+        "affected_data_gb": total_size_gb,
         "implementation_complexity": recommendation.get("implementation_complexity", "low"),
         "timeline": recommendation.get("timeline", "immediate")
     }
@@ -311,18 +442,24 @@ def _create_generic_optimization(scan_results: Dict[str, Any], recommendation: D
         "category": recommendation.get("category", "generic"),
         "title": recommendation.get("title", "Generic Optimization"),
         "description": recommendation.get("description", ""),
-        "estimated_monthly_savings": recommendation.get("estimated_savings_gb", 0) * 0.04,
+        "estimated_monthly_savings": recommendation.get("estimated_savings_gb", 0) * _GENERIC_PER_GB,
         "affected_data_gb": recommendation.get("estimated_savings_gb", 0),
         "implementation_complexity": recommendation.get("implementation_complexity", "medium"),
         "timeline": recommendation.get("timeline", "1-2 weeks"),
         "steps": recommendation.get("steps", [])
     }
 
-def _calculate_roi_months(optimization_savings: List[Any]) -> float:
-    """Calculate ROI in months"""
-    total_savings = sum(s.savings for s in optimization_savings)
-    total_implementation_cost = sum(s.implementation_cost for s in optimization_savings)
-    
+# Category -> (optimization builder, file selector, scan result lists passed to the selector);
+# other categories get a generic optimization
+_OPTIMIZATION_HANDLERS = {
+    "cold_data": (_create_cold_data_optimization, _select_cold_data_files, ("cold_data",)),
+    "small_files": (_create_small_files_optimization, _select_small_file_directories, ("small_files",)),
+    "replication": (_create_replication_optimization, _select_replication_files, ("over_replicated_files",)),
+    "cleanup": (_create_cleanup_optimization, _select_cleanup_files, ("orphaned_files", "empty_files"))
+}
+
+def _calculate_roi_months(total_savings: float, total_implementation_cost: float) -> float:
+    """Calculate ROI in months from monthly savings and implementation cost totals"""
     if total_savings <= 0:
         return float('inf')
     
@@ -348,24 +485,44 @@ def _estimate_implementation_time(optimizations: List[Dict[str, Any]]) -> str:
     else:
         return "2-3 months"
 
+def store_optimization_results(optimization_id: str, results: Dict[str, Any]) -> None:
+    """Store optimization results for later retrieval"""
+    summary = results.get("summary", {})
+    index_entry = {
+        "optimization_id": optimization_id,
+        "scan_id": results.get("scan_id"),
+        "status": results.get("status"),
+        "created_at": results.get("created_at"),
+        "total_monthly_savings": summary.get("total_monthly_savings", 0),
+        "total_annual_savings": summary.get("total_annual_savings", 0),
+        "affected_data_gb": summary.get("affected_data_gb", 0)
+    }
+    
+    with optimization_results_lock:
+        optimization_results_storage[optimization_id] = results
+        optimization_index[optimization_id] = index_entry
+        # Storing may have evicted older results; keep the index from outgrowing the storage
+        if len(optimization_index) > len(optimization_results_storage):
+            _retain_stored_optimizations()
+
 def get_optimization_results(optimization_id: str) -> Dict[str, Any]:
     """Retrieve optimization results by ID"""
-    if optimization_id not in optimization_results_storage:
-        raise ValueError(f"Optimization results not found for ID: {optimization_id}")
+    with optimization_results_lock:
+        results = optimization_results_storage.get(optimization_id)
     
-    return optimization_results_storage[optimization_id]
+    if results is None:
+        raise OptimizationNotFoundError(f"Optimization results not found for ID: {optimization_id}")
+    
+    return results
+
+def _retain_stored_optimizations() -> None:
+    """Drop index rows whose results the storage no longer holds; call with the lock held"""
+    for optimization_id in [key for key in optimization_index if key not in optimization_results_storage]:
+        del optimization_index[optimization_id]
 
 def list_optimizations() -> List[Dict[str, Any]]:
     """List all optimization analyses"""
-    return [
-        {
-            "optimization_id": opt_id,
-            "scan_id": results.get("scan_id"),
-            "status": results.get("status"),
-            "created_at": results.get("created_at"),
-            "total_monthly_savings": results.get("summary", {}).get("total_monthly_savings", 0),
-            "total_annual_savings": results.get("summary", {}).get("total_annual_savings", 0),
-            "affected_data_gb": results.get("summary", {}).get("affected_data_gb", 0)
-        }
-        for opt_id, results in optimization_results_storage.items()
-    ]
\ No newline at end of file
+    with optimization_results_lock:
+        # Drop rows of results that have expired from the storage before listing
+        _retain_stored_optimizations()
+        return [dict(entry) for entry in optimization_index.values()]
\ No newline at end of file
@@ -1,43 +1,112 @@
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+import asyncio
 import uuid
+import threading
+from itertools import chain
+import numpy as np
 from ..hdfs.client import HDFSClient
-from ..hdfs.analyzer import HDFSMetadataAnalyzer
+from ..utils.storage import ScanResultsStore, ScanIndex, ScanCache
+from ..hdfs.analyzer import HDFSMetadataAnalyzer, to_file_records, concat_file_records
 
 logger = logging.getLogger(__name__)
 
+# Bytes -> GiB as a multiply; exact, since 1024 ** 3 is a power of two
+_GIB_INV = 1.0 / (1 << 30)
+
+class ScanNotFoundError(ValueError):
+    """Raised when scan results are missing or have expired"""
+
 # In-memory storage for scan results (replace with database in production)
-scan_results_storage = {}
+# Bounded by serialized size and time-limited so a long-lived server doesn't accumulate
+# every scan; results pushed out of memory are spilled to disk and read back on demand
+scan_results_storage = ScanResultsStore(max_bytes=2 << 30, ttl=3600)
+scan_results_lock = threading.Lock()
+
+# Listing metadata of the stored scans, kept beside the results under the same lock
+scan_index = ScanIndex()
+
+# Per-file result lists whose counts and total sizes are precomputed into "bucket_totals"
+SCAN_BUCKETS = (
+    "cold_data", "duplicate_candidates", "small_files", "empty_files",
+    "orphaned_files", "over_replicated_files"
+)
 
-def execute_scan(hdfs_client: HDFSClient, paths: List[str], depth: int) -> Dict[str, Any]:
-    """Execute comprehensive HDFS scan"""
+# Upper bound on paths walked at once, so a long path list doesn't flood the NameNode
+MAX_CONCURRENT_PATH_SCANS = 16
+
+def _cluster_key(hdfs_client: HDFSClient) -> str:
+    """Identity of the cluster and user a client lists files as, for scan cache keys"""
+    return f"{hdfs_client.webhdfs_base_url}|{hdfs_client.config.user}"
+
+def _scan_path(hdfs_client: HDFSClient, path: str, depth: int, analyzer: HDFSMetadataAnalyzer,
+               cache: Optional[ScanCache] = None, use_cache: bool = True) -> bool:
+    """Feed one path's files into the running analysis; return False if it does not exist"""
+    logger.info(f"Scanning path: {path}")
+    
+    # Reuse a cached walk of this path or an enclosing one on the same cluster; without
+    # use_cache the path is listed again and the fresh walk replaces the cached one
+    if cache is not None and use_cache:
+        cluster = _cluster_key(hdfs_client)
+        cached_records = cache.get(path, depth, cluster)
+        if cached_records is not None:
+            logger.info(f"Using {len(cached_records)} cached files for {path}")
+            analyzer.update(cached_records)
+            return True
+    
+    # Check if path exists
+    if not hdfs_client.check_path_exists(path):
+        logger.warning(f"Path does not exist: {path}")
+        return False
+    
+    # Scan directory in batches, analyzing each as it arrives; only the packed columns are
+    # kept, for the scan cache
+    path_records = []
+    file_count = 0
+    for batch in hdfs_client.scan_directory_batch(path, depth):
+        records = to_file_records(batch)
+        analyzer.update(records)
+        if cache is not None:
+            path_records.append(records)
+        file_count += len(records)
+        logger.info(f"Processed {file_count} files from {path}")
+    
+    if cache is not None:
+        cache.put(path, depth, concat_file_records(path_records), _cluster_key(hdfs_client), replace=not use_cache)
+    return True
+
+async def execute_scan_async(hdfs_client: HDFSClient, paths: List[str], depth: int,
+                             cache: Optional[ScanCache] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """Execute comprehensive HDFS scan, walking the requested paths concurrently"""
     scan_id = str(uuid.uuid4())
+    scan_started = datetime.utcnow().isoformat()
     
     try:
         logger.info(f"Starting scan {scan_id} for paths: {paths}")
         
-        # Get cluster metrics
-        cluster_metrics = hdfs_client.get_cluster_metrics()
-        
-        # Scan file metadata
-        all_files = []
-        for path in paths:
-            logger.info(f"Scanning path: {path}")
-            
-            # Check if path exists
-            if not hdfs_client.check_path_exists(path):
-                logger.warning(f"Path does not exist: {path}")
-                continue
-            
-            # Scan directory in batches
-            file_count = 0
-            for batch in hdfs_client.scan_directory_batch(path, depth):
-                all_files.extend(batch)
-                file_count += len(batch)
-                logger.info(f"Processed {file_count} files from {path}")
-        
-        if not all_files:
+        # Batches are analyzed as they arrive, so the full file list is never held in memory
+        analyzer = HDFSMetadataAnalyzer()
+        analyzer.start()
+        
+        # Each walk is a chain of blocking WebHDFS round trips; overlap them in worker threads
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PATH_SCANS)
+        
+        async def scan_path(path: str) -> bool:
+            async with semaphore:
+                return await asyncio.to_thread(_scan_path, hdfs_client, path, depth, analyzer, cache, use_cache)
+        
+        # Get cluster metrics alongside the path scans
+        cluster_metrics, *_ = await asyncio.gather(
+            asyncio.to_thread(hdfs_client.get_cluster_metrics),
+            *(scan_path(path) for path in dict.fromkeys(paths))
+        )
+        
+        report = await asyncio.to_thread(analyzer.finalize)
+        
+        scan_completed = datetime.utcnow().isoformat()
+        
+        if not report["total_files"]:
             logger.warning("No files found in specified paths")
             return {
                 "scan_id": scan_id,
@@ -50,76 +119,16 @@ def execute_scan(hdfs_client: HDFSClient, paths: List[str], depth: int) -> Dict[
                 "small_files": [],
                 "orphaned_files": [],
                 "cluster_metrics": cluster_metrics,
-                "scan_started": datetime.utcnow().isoformat(),
-                "scan_completed": datetime.utcnow().isoformat()
+                "scan_started": scan_started,
+                "scan_completed": scan_completed
             }
         
-        logger.info(f"Analyzing {len(all_files)} files")
-        
-        # Analyze metadata
-        analyzer = HDFSMetadataAnalyzer()
-        
-        # Run various analyses
-        cold_data = analyzer.identify_cold_data(all_files)
-        duplicates = analyzer.detect_duplicate_candidates(all_files)
-        efficiency = analyzer.analyze_file_efficiency(all_files)
-        orphaned = analyzer.identify_orphaned_temp_files(all_files)
-        directory_analysis = analyzer.analyze_directory_structure(all_files)
-        waste_analysis = analyzer.calculate_storage_waste(all_files)
-        optimization_priorities = analyzer.generate_optimization_priority(all_files)
-        
-        # Calculate totals
-        total_size = sum(file.get("size", 0) for file in all_files)
-        total_size_gb = total_size / (1024 ** 3)
-        
-        # Create comprehensive results
-        scan_results = {
-            "scan_id": scan_id,
-            "status": "completed",
-            "message": f"Successfully scanned {len(all_files)} files",
-            "scan_started": datetime.utcnow().isoformat(),
-            "scan_completed": datetime.utcnow().isoformat(),
-            "scanned_paths": paths,
-            "scan_depth": depth,
-            
-            # Basic metrics
-            "total_files": len(all_files),
-            "total_size_bytes": total_size,
-            "total_size_gb": total_size_gb,
-            
-            # Analysis results
-            "cold_data": cold_data,
-            "duplicate_candidates": duplicates,
-            "small_files": efficiency.get("small_files", []),
-            "empty_files": efficiency.get("empty_files", []),
-            "orphaned_files": orphaned,
-            "over_replicated_files": efficiency.get("inefficient_replication", []),
-            
-            # Efficiency analysis
-            "efficiency_analysis": {
-                "small_files_count": efficiency.get("small_files_count", 0),
-                "small_files_percentage": efficiency.get("small_files_percentage", 0),
-                "empty_files_count": efficiency.get("empty_files_count", 0),
-                "over_replicated_count": efficiency.get("over_replicated_count", 0),
-                "over_replicated_percentage": efficiency.get("over_replicated_percentage", 0),
-                "efficiency_summary": efficiency.get("efficiency_summary", {})
-            },
-            
-            # Directory analysis
-            "directory_analysis": directory_analysis,
-            
-            # Waste analysis
-            "waste_analysis": waste_analysis,
-            
-            # Optimization priorities
-            "optimization_priorities": optimization_priorities,
-            
-            # Cluster metrics
-            "cluster_metrics": cluster_metrics
-        }
+        scan_results = _build_scan_results(
+            scan_id, paths, depth, report, cluster_metrics, scan_started, scan_completed
+        )
         
         # Store results for later retrieval
-        scan_results_storage[scan_id] = scan_results
+        store_scan_results(scan_id, scan_results)
         
         logger.info(f"Scan {scan_id} completed successfully")
         return scan_results
@@ -131,7 +140,7 @@ def execute_scan(hdfs_client: HDFSClient, paths: List[str], depth: int) -> Dict[
             "status": "failed",
             "message": f"Scan failed: {str(e)}",
             "error": str(e),
-            "scan_started": datetime.utcnow().isoformat(),
+            "scan_started": scan_started,
             "scan_completed": datetime.utcnow().isoformat(),
             "scanned_paths": paths,
             "scan_depth": depth,
@@ -144,34 +153,125 @@ def execute_scan(hdfs_client: HDFSClient, paths: List[str], depth: int) -> Dict[
             "cluster_metrics": {}
         }
         
-        scan_results_storage[scan_id] = error_result
+        store_scan_results(scan_id, error_result)
         raise
 
+def compute_bucket_totals(scan_results: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Count and total size of each per-file result list, gathered in a single sweep"""
+    buckets = [scan_results.get(name, []) for name in SCAN_BUCKETS]
+    counts = np.fromiter(map(len, buckets), dtype=np.int64, count=len(buckets))
+    sizes = np.fromiter(
+        (f.get("size", 0) for f in chain.from_iterable(buckets)), dtype=np.int64, count=int(counts.sum())
+    )
+    
+    # Segment sums over the flat size column; prefix sums stay exact in int64
+    prefix = np.concatenate(([0], np.cumsum(sizes)))
+    ends = np.cumsum(counts)
+    size_bytes = prefix[ends] - prefix[ends - counts]
+    
+    return {
+        name: {"count": int(count), "size_bytes": int(total)}
+        for name, count, total in zip(SCAN_BUCKETS, counts, size_bytes)
+    }
+
+def _bucket_count(results: Dict[str, Any], name: str) -> int:
+    """Number of entries in a per-file result list, from the precomputed totals when present"""
+    totals = results.get("bucket_totals", {}).get(name)
+    return totals["count"] if totals is not None else len(results.get(name, []))
+
+def _build_scan_results(scan_id: str, paths: List[str], depth: int, report: Dict[str, Any],
+                        cluster_metrics: Dict[str, Any], scan_started: str,
+                        scan_completed: str) -> Dict[str, Any]:
+    """Assemble the scan results from a finalized incremental analysis"""
+    cold_data = report["cold_data"]
+    duplicates = report["duplicate_candidates"]
+    efficiency = report["efficiency"]
+    orphaned = report["orphaned_files"]
+    directory_analysis = report["directory_analysis"]
+    waste_analysis = report["waste_analysis"]
+    optimization_priorities = report["optimization_priorities"]
+    
+    total_files = report["total_files"]
+    total_size = report["total_size_bytes"]
+    total_size_gb = total_size * _GIB_INV
+    
+    # Create comprehensive results
+    scan_results = {
+        "scan_id": scan_id,
+        "status": "completed",
+        "message": f"Successfully scanned {total_files} files",
+        "scan_started": scan_started,
+        "scan_completed": scan_completed,
+        "scanned_paths": paths,
+        "scan_depth": depth,
+        
+        # Basic metrics
+        "total_files": total_files,
+        "total_size_bytes": total_size,
+        "total_size_gb": total_size_gb,
+        
+        # Analysis results
+        "cold_data": cold_data,
+        "duplicate_candidates": duplicates,
+        "small_files": efficiency.get("small_files", []),
+        "empty_files": efficiency.get("empty_files", []),
+        "orphaned_files": orphaned,
+        "over_replicated_files": efficiency.get("inefficient_replication", []),
+        
+        # Efficiency analysis
+        "efficiency_analysis": {
+            "small_files_count": efficiency.get("small_files_count", 0),
+            "small_files_percentage": efficiency.get("small_files_percentage", 0),
+            "empty_files_count": efficiency.get("empty_files_count", 0),
+            "over_replicated_count": efficiency.get("over_replicated_count", 0),
+            "over_replicated_percentage": efficiency.get("over_replicated_percentage", 0),
+            "efficiency_summary": efficiency.get("efficiency_summary", {})
+        },
+        
+        # Directory analysis
+        "directory_analysis": directory_analysis,
+        
+        # Waste analysis
+        "waste_analysis": waste_analysis,
+        
+        # Optimization priorities
+        "optimization_priorities": optimization_priorities,
+        
+        # Cluster metrics
+        "cluster_metrics": cluster_metrics
+    }
+    scan_results["bucket_totals"] = compute_bucket_totals(scan_results)
+    
+    return scan_results
+
+def store_scan_results(scan_id: str, results: Dict[str, Any]) -> None:
+    """Store scan results for later retrieval"""
+    with scan_results_lock:
+        scan_results_storage.put(scan_id, results)
+        scan_index.put(scan_id, results)
+
 def get_scan_results(scan_id: str) -> Dict[str, Any]:
     """Retrieve scan results by ID"""
-    if scan_id not in scan_results_storage:
-        raise ValueError(f"Scan results not found for ID: {scan_id}")
+    with scan_results_lock:
+        results = scan_results_storage.get(scan_id)
+    
+    if results is None:
+        raise ScanNotFoundError(f"Scan results not found for ID: {scan_id}")
     
-    return scan_results_storage[scan_id]
+    return results
 
-def list_scans() -> List[Dict[str, Any]]:
-    """List all available scans"""
-    return [
-        {
-            "scan_id": scan_id,
-            "status": results.get("status", "unknown"),
-            "scan_started": results.get("scan_started"),
-            "scan_completed": results.get("scan_completed"),
-            "total_files": results.get("total_files", 0),
-            "total_size_gb": results.get("total_size_gb", 0),
-            "scanned_paths": results.get("scanned_paths", [])
-        }
-        for scan_id, results in scan_results_storage.items()
-    ]
+def list_scans(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """List available scans, most recent first"""
+    with scan_results_lock:
+        # Drop rows of results that have expired from the store before listing
+        scan_index.retain(scan_results_storage.keys())
+        return scan_index.list(limit)
 
 def get_scan_summary(scan_id: str) -> Dict[str, Any]:
     """Get a summary of scan results"""
     results = get_scan_results(scan_id)
+    waste_analysis = results.get("waste_analysis", {})
+    filesystem = results.get("cluster_metrics", {}).get("filesystem", {})
     
     return {
         "scan_id": scan_id,
@@ -179,29 +279,32 @@ def get_scan_summary(scan_id: str) -> Dict[str, Any]:
         "total_files": results.get("total_files", 0),
         "total_size_gb": results.get("total_size_gb", 0),
         "optimization_opportunities": {
-            "cold_data_files": len(results.get("cold_data", [])),
-            "small_files": len(results.get("small_files", [])),
-            "empty_files": len(results.get("empty_files", [])),
-            "orphaned_files": len(results.get("orphaned_files", [])),
-            "over_replicated_files": len(results.get("over_replicated_files", [])),
-            "duplicate_candidates": len(results.get("duplicate_candidates", []))
+            "cold_data_files": _bucket_count(results, "cold_data"),
+            "small_files": _bucket_count(results, "small_files"),
+            "empty_files": _bucket_count(results, "empty_files"),
+            "orphaned_files": _bucket_count(results, "orphaned_files"),
+            "over_replicated_files": _bucket_count(results, "over_replicated_files"),
+            "duplicate_candidates": _bucket_count(results, "duplicate_candidates")
         },
         "potential_savings": {
-            "waste_percentage": results.get("waste_analysis", {}).get("waste_percentage", 0),
-            "waste_gb": results.get("waste_analysis", {}).get("total_waste_bytes", 0) / (1024 ** 3)
+            "waste_percentage": waste_analysis.get("waste_percentage", 0),
+            "waste_gb": waste_analysis.get("total_waste_bytes", 0) * _GIB_INV
         },
         "cluster_health": {
-            "capacity_used_gb": results.get("cluster_metrics", {}).get("filesystem", {}).get("capacity_used", 0) / (1024 ** 3),
-            "capacity_total_gb": results.get("cluster_metrics", {}).get("filesystem", {}).get("capacity_total", 0) / (1024 ** 3),
-            "under_replicated_blocks": results.get("cluster_metrics", {}).get("filesystem", {}).get("under_replicated_blocks", 0),
-            "corrupt_blocks": results.get("cluster_metrics", {}).get("filesystem", {}).get("corrupt_blocks", 0)
+            "capacity_used_gb": filesystem.get("capacity_used", 0) * _GIB_INV,
+            "capacity_total_gb": filesystem.get("capacity_total", 0) * _GIB_INV,
+            "under_replicated_blocks": filesystem.get("under_replicated_blocks", 0),
+            "corrupt_blocks": filesystem.get("corrupt_blocks", 0)
         }
     }
 
 def delete_scan_results(scan_id: str) -> bool:
     """Delete scan results"""
-    if scan_id in scan_results_storage:
-        del scan_results_storage[scan_id]
+    with scan_results_lock:
+        removed = scan_results_storage.pop(scan_id, None) is not None
+        scan_index.delete([scan_id])
+    
+    if removed:
         logger.info(f"Deleted scan results for {scan_id}")
         return True
     return False
\ No newline at end of file
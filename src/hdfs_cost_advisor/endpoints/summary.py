@@ -1,14 +1,40 @@
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
+from functools import lru_cache
+from dataclasses import dataclass
 from ..cost.calculator import CostCalculator
-from .scan import get_scan_results
+from .scan import get_scan_results, compute_bucket_totals
 from .optimize import get_optimization_results
 
 logger = logging.getLogger(__name__)
 
+# Bytes -> GiB as a multiply; exact, since 1024 ** 3 is a power of two
+_GIB_INV = 1.0 / (1 << 30)
+_KIB_INV = 1.0 / 1024
+
+# Field order of the cached risk and recommendation rows
+_RISK_FIELDS = ("type", "severity", "description", "recommendation")
+_RECOMMENDATION_FIELDS = ("priority", "action", "description", "estimated_monthly_savings", "timeline")
+
+_SEVERITY_SCORES = {"critical": 10, "high": 5, "medium": 2, "low": 1}
+
+@dataclass(frozen=True, slots=True)
+class _SummaryContext:
+    """Summary sections computed once and read by the sections derived from them"""
+    current_costs: Dict[str, Any]
+    opportunities: Dict[str, Any]
+    efficiency_metrics: Dict[str, Any]
+    cluster_health: Dict[str, Any]
+
+def _bucket_stats(scan_results: Dict[str, Any]) -> Dict[str, Tuple[int, float]]:
+    """File count and size in GB of every scan bucket, from the precomputed totals when present"""
+    totals = scan_results.get("bucket_totals") or compute_bucket_totals(scan_results)
+    return {name: (bucket["count"], bucket["size_bytes"] * _GIB_INV) for name, bucket in totals.items()}
+
 def generate_summary(scan_id: str, cost_calculator: CostCalculator) -> Dict[str, Any]:
     """Generate comprehensive summary of scan results and potential savings"""
+    generated_at = datetime.utcnow().isoformat()
     
     try:
         logger.info(f"Generating summary for scan {scan_id}")
@@ -19,13 +45,18 @@ def generate_summary(scan_id: str, cost_calculator: CostCalculator) -> Dict[str,
         if scan_results.get("status") != "completed":
             raise ValueError(f"Scan {scan_id} is not completed or failed")
         
-        # Calculate current costs
-        current_costs = cost_calculator.calculate_current_costs(scan_results)
+        # Shared by several sections below; compute each once
+        ctx = _SummaryContext(
+            current_costs=cost_calculator.calculate_current_costs(scan_results),
+            opportunities=_analyze_optimization_opportunities(scan_results),
+            efficiency_metrics=_calculate_efficiency_metrics(scan_results),
+            cluster_health=_analyze_cluster_health(scan_results)
+        )
         
         # Generate summary
         summary = {
             "scan_id": scan_id,
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": generated_at,
             "status": "completed",
             
             # Basic scan information
@@ -35,32 +66,32 @@ def generate_summary(scan_id: str, cost_calculator: CostCalculator) -> Dict[str,
                 "scan_depth": scan_results.get("scan_depth", 0),
                 "total_files": scan_results.get("total_files", 0),
                 "total_size_gb": scan_results.get("total_size_gb", 0),
-                "total_size_tb": scan_results.get("total_size_gb", 0) / 1024
+                "total_size_tb": scan_results.get("total_size_gb", 0) * _KIB_INV
             },
             
             # Current costs
-            "current_costs": current_costs,
+            "current_costs": ctx.current_costs,
             
             # Optimization opportunities
-            "optimization_opportunities": _analyze_optimization_opportunities(scan_results),
+            "optimization_opportunities": ctx.opportunities,
             
             # Efficiency metrics
-            "efficiency_metrics": _calculate_efficiency_metrics(scan_results),
+            "efficiency_metrics": ctx.efficiency_metrics,
             
             # Storage waste analysis
             "waste_analysis": scan_results.get("waste_analysis", {}),
             
             # Cluster health
-            "cluster_health": _analyze_cluster_health(scan_results),
+            "cluster_health": ctx.cluster_health,
             
             # Risk assessment
-            "risk_assessment": _assess_risks(scan_results),
+            "risk_assessment": _assess_risks(ctx),
             
             # Recommendations summary
-            "recommendations_summary": _generate_recommendations_summary(scan_results, cost_calculator),
+            "recommendations_summary": _generate_recommendations_summary(ctx),
             
             # Projected savings
-            "projected_savings": _calculate_projected_savings(scan_results, cost_calculator)
+            "projected_savings": _calculate_projected_savings(ctx)
         }
         
         logger.info(f"Summary generated successfully for scan {scan_id}")
@@ -72,54 +103,51 @@ def generate_summary(scan_id: str, cost_calculator: CostCalculator) -> Dict[str,
             "scan_id": scan_id,
             "status": "failed",
             "error": str(e),
-            "generated_at": datetime.utcnow().isoformat()
+            "generated_at": generated_at
         }
 
 def _analyze_optimization_opportunities(scan_results: Dict[str, Any]) -> Dict[str, Any]:
     """Analyze available optimization opportunities"""
     
-    cold_data = scan_results.get("cold_data", [])
-    small_files = scan_results.get("small_files", [])
-    empty_files = scan_results.get("empty_files", [])
-    orphaned_files = scan_results.get("orphaned_files", [])
-    over_replicated = scan_results.get("over_replicated_files", [])
-    duplicates = scan_results.get("duplicate_candidates", [])
-    
-    # Calculate potential savings for each category
-    cold_data_size_gb = sum(f.get("size", 0) for f in cold_data) / (1024 ** 3)
-    orphaned_size_gb = sum(f.get("size", 0) for f in orphaned_files) / (1024 ** 3)
-    over_replicated_size_gb = sum(f.get("size", 0) for f in over_replicated) / (1024 ** 3)
+    # Calculate potential savings for each category from one (count, size) pass over the buckets
+    stats = _bucket_stats(scan_results)
+    cold_data_count, cold_data_size_gb = stats["cold_data"]
+    small_files_count, small_files_size_gb = stats["small_files"]
+    empty_files_count = stats["empty_files"][0]
+    orphaned_count, orphaned_size_gb = stats["orphaned_files"]
+    over_replicated_count, over_replicated_size_gb = stats["over_replicated_files"]
+    duplicates_count, duplicates_size_gb = stats["duplicate_candidates"]
     
     return {
         "cold_data_migration": {
-            "file_count": len(cold_data),
+            "file_count": cold_data_count,
             "size_gb": cold_data_size_gb,
             "potential_monthly_savings": cold_data_size_gb * 0.03,  # $0.03 per GB savings
             "priority": "high" if cold_data_size_gb > 100 else "medium"
         },
         "small_file_consolidation": {
-            "file_count": len(small_files),
-            "size_gb": sum(f.get("size", 0) for f in small_files) / (1024 ** 3),
-            "potential_monthly_savings": len(small_files) * 0.001,  # $0.001 per small file
-            "priority": "high" if len(small_files) > 10000 else "medium"
+            "file_count": small_files_count,
+            "size_gb": small_files_size_gb,
+            "potential_monthly_savings": small_files_count * 0.001,  # $0.001 per small file
+            "priority": "high" if small_files_count > 10000 else "medium"
         },
         "file_cleanup": {
-            "orphaned_files": len(orphaned_files),
-            "empty_files": len(empty_files),
+            "orphaned_files": orphaned_count,
+            "empty_files": empty_files_count,
             "size_gb": orphaned_size_gb,
             "potential_monthly_savings": orphaned_size_gb * 0.04 * 3,  # Full storage cost
             "priority": "medium"
         },
         "replication_optimization": {
-            "file_count": len(over_replicated),
+            "file_count": over_replicated_count,
             "size_gb": over_replicated_size_gb,
             "potential_monthly_savings": over_replicated_size_gb * 0.04,  # $0.04 per GB
             "priority": "low"
         },
         "duplicate_removal": {
-            "file_count": len(duplicates),
-            "size_gb": sum(f.get("size", 0) for f in duplicates) / (1024 ** 3),
-            "potential_monthly_savings": sum(f.get("size", 0) for f in duplicates) / (1024 ** 3) * 0.02,
+            "file_count": duplicates_count,
+            "size_gb": duplicates_size_gb,
+            "potential_monthly_savings": duplicates_size_gb * 0.02,
             "priority": "low"
         }
     }
@@ -178,122 +206,132 @@ def _analyze_cluster_health(scan_results: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "health_status": health_status,
         "capacity_utilization_percent": utilization_percent,
-        "capacity_total_gb": capacity_total / (1024 ** 3),
-        "capacity_used_gb": capacity_used / (1024 ** 3),
-        "capacity_remaining_gb": capacity_remaining / (1024 ** 3),
+        "capacity_total_gb": capacity_total * _GIB_INV,
+        "capacity_used_gb": capacity_used * _GIB_INV,
+        "capacity_remaining_gb": capacity_remaining * _GIB_INV,
         "under_replicated_blocks": filesystem_metrics.get("under_replicated_blocks", 0),
         "corrupt_blocks": filesystem_metrics.get("corrupt_blocks", 0),
         "files_total": filesystem_metrics.get("files_total", 0),
         "blocks_total": filesystem_metrics.get("blocks_total", 0)
     }
 
-def _assess_risks(scan_results: Dict[str, Any]) -> Dict[str, Any]:
+def _assess_risks(ctx: _SummaryContext) -> Dict[str, Any]:
     """Assess risks associated with current storage state"""
+    cluster_health = ctx.cluster_health
     
-    cluster_health = _analyze_cluster_health(scan_results)
-    efficiency_metrics = _calculate_efficiency_metrics(scan_results)
+    risk_score, risk_level, risks = _assess_risks_core(
+        cluster_health["capacity_utilization_percent"],
+        ctx.efficiency_metrics["small_files_percentage"],
+        cluster_health["corrupt_blocks"],
+        cluster_health["under_replicated_blocks"]
+    )
+    risks = [dict(zip(_RISK_FIELDS, risk)) for risk in risks]
     
+    return {
+        "overall_risk_score": risk_score,
+        "risk_level": risk_level,
+        "risks": risks,
+        "recommendations": [risk["recommendation"] for risk in risks]
+    }
+
+# The risk rules are a pure function of four scalars, so repeated summaries of the same
+# scan reuse the result; rows are tuples so callers get fresh dicts from a shared entry
+@lru_cache(maxsize=1024)
+def _assess_risks_core(utilization_percent: float, small_files_percentage: float,
+                       corrupt_blocks: int, under_replicated_blocks: int) -> Tuple[int, str, Tuple[Tuple[str, ...], ...]]:
+    """Evaluate the risk rules into (score, level, risk rows)"""
     risks = []
     
     # High utilization risk
-    if cluster_health["capacity_utilization_percent"] > 85:
-        risks.append({
-            "type": "high_utilization",
-            "severity": "critical",
-            "description": "Cluster utilization is critically high",
-            "recommendation": "Immediate cleanup or capacity expansion required"
-        })
+    if utilization_percent > 85:
+        risks.append((
+            "high_utilization", "critical",
+            "Cluster utilization is critically high",
+            "Immediate cleanup or capacity expansion required"
+        ))
     
     # Small files risk
-    if efficiency_metrics["small_files_percentage"] > 50:
-        risks.append({
-            "type": "small_files",
-            "severity": "high",
-            "description": "High percentage of small files causing metadata overhead",
-            "recommendation": "Implement file consolidation strategy"
-        })
+    if small_files_percentage > 50:
+        risks.append((
+            "small_files", "high",
+            "High percentage of small files causing metadata overhead",
+            "Implement file consolidation strategy"
+        ))
     
     # Corrupt blocks risk
-    if cluster_health["corrupt_blocks"] > 0:
-        risks.append({
-            "type": "data_corruption",
-            "severity": "critical",
-            "description": f"{cluster_health['corrupt_blocks']} corrupt blocks detected",
-            "recommendation": "Immediate data recovery required"
-        })
+    if corrupt_blocks > 0:
+        risks.append((
+            "data_corruption", "critical",
+            f"{corrupt_blocks} corrupt blocks detected",
+            "Immediate data recovery required"
+        ))
     
     # Under-replicated blocks risk
-    if cluster_health["under_replicated_blocks"] > 0:
-        risks.append({
-            "type": "under_replication",
-            "severity": "medium",
-            "description": f"{cluster_health['under_replicated_blocks']} under-replicated blocks",
-            "recommendation": "Check cluster health and replication settings"
-        })
+    if under_replicated_blocks > 0:
+        risks.append((
+            "under_replication", "medium",
+            f"{under_replicated_blocks} under-replicated blocks",
+            "Check cluster health and replication settings"
+        ))
     
     # Calculate overall risk score
-    risk_score = sum({
-        "critical": 10,
-        "high": 5,
-        "medium": 2,
-        "low": 1
-    }.get(risk["severity"], 0) for risk in risks)
+    risk_score = sum(_SEVERITY_SCORES.get(risk[1], 0) for risk in risks)
+    risk_level = "critical" if risk_score >= 10 else "high" if risk_score >= 5 else "medium" if risk_score >= 2 else "low"
     
-    return {
-        "overall_risk_score": risk_score,
-        "risk_level": "critical" if risk_score >= 10 else "high" if risk_score >= 5 else "medium" if risk_score >= 2 else "low",
-        "risks": risks,
-        "recommendations": [risk["recommendation"] for risk in risks]
-    }
+    return risk_score, risk_level, tuple(risks)
 
-def _generate_recommendations_summary(scan_results: Dict[str, Any], cost_calculator: CostCalculator) -> Dict[str, Any]:
+def _generate_recommendations_summary(ctx: _SummaryContext) -> Dict[str, Any]:
     """Generate high-level recommendations summary"""
-    
-    opportunities = _analyze_optimization_opportunities(scan_results)
-    efficiency = _calculate_efficiency_metrics(scan_results)
-    
-    recommendations = []
-    
-    # Prioritize recommendations based on potential savings
-    if opportunities["cold_data_migration"]["potential_monthly_savings"] > 100:
-        recommendations.append({
-            "priority": 1,
-            "action": "Cold Data Migration",
-            "description": f"Migrate {opportunities['cold_data_migration']['file_count']} files to cold storage",
-            "estimated_monthly_savings": opportunities["cold_data_migration"]["potential_monthly_savings"],
-            "timeline": "1-2 weeks"
-        })
-    
-    if opportunities["small_file_consolidation"]["file_count"] > 5000:
-        recommendations.append({
-            "priority": 2,
-            "action": "Small File Consolidation",
-            "description": f"Consolidate {opportunities['small_file_consolidation']['file_count']} small files",
-            "estimated_monthly_savings": opportunities["small_file_consolidation"]["potential_monthly_savings"],
-            "timeline": "2-4 weeks"
-        })
-    
-    if opportunities["file_cleanup"]["potential_monthly_savings"] > 50:
-        recommendations.append({
-            "priority": 3,
-            "action": "File Cleanup",
-            "description": f"Remove {opportunities['file_cleanup']['orphaned_files']} orphaned and {opportunities['file_cleanup']['empty_files']} empty files",
-            "estimated_monthly_savings": opportunities["file_cleanup"]["potential_monthly_savings"],
-            "timeline": "Immediate"
-        })
+    cold_data = ctx.opportunities["cold_data_migration"]
+    small_files = ctx.opportunities["small_file_consolidation"]
+    cleanup = ctx.opportunities["file_cleanup"]
+    recommendations, total_monthly_savings = _recommendations_core(
+        cold_data["potential_monthly_savings"], cold_data["file_count"],
+        small_files["potential_monthly_savings"], small_files["file_count"],
+        cleanup["potential_monthly_savings"], cleanup["orphaned_files"], cleanup["empty_files"]
+    )
     
     return {
         "total_recommendations": len(recommendations),
-        "recommendations": recommendations,
-        "estimated_total_monthly_savings": sum(r["estimated_monthly_savings"] for r in recommendations),
-        "estimated_total_annual_savings": sum(r["estimated_monthly_savings"] for r in recommendations) * 12
+        "recommendations": [dict(zip(_RECOMMENDATION_FIELDS, rec)) for rec in recommendations],
+        "estimated_total_monthly_savings": total_monthly_savings,
+        "estimated_total_annual_savings": total_monthly_savings * 12
     }
 
-def _calculate_projected_savings(scan_results: Dict[str, Any], cost_calculator: CostCalculator) -> Dict[str, Any]:
-    """Calculate projected savings from optimizations"""
+@lru_cache(maxsize=1024)
+def _recommendations_core(cold_savings: float, cold_count: int, small_savings: float, small_count: int,
+                          cleanup_savings: float, orphaned_count: int,
+                          empty_count: int) -> Tuple[Tuple[Tuple[Any, ...], ...], float]:
+    """Evaluate the recommendation rules into (recommendation rows, total monthly savings)"""
+    recommendations = []
     
-    current_costs = cost_calculator.calculate_current_costs(scan_results)
-    opportunities = _analyze_optimization_opportunities(scan_results)
+    # Prioritize recommendations based on potential savings
+    if cold_savings > 100:
+        recommendations.append((
+            1, "Cold Data Migration",
+            f"Migrate {cold_count} files to cold storage",
+            cold_savings, "1-2 weeks"
+        ))
+    
+    if small_count > 5000:
+        recommendations.append((
+            2, "Small File Consolidation",
+            f"Consolidate {small_count} small files",
+            small_savings, "2-4 weeks"
+        ))
+    
+    if cleanup_savings > 50:
+        recommendations.append((
+            3, "File Cleanup",
+            f"Remove {orphaned_count} orphaned and {empty_count} empty files",
+            cleanup_savings, "Immediate"
+        ))
+    
+    return tuple(recommendations), sum(rec[3] for rec in recommendations)
+
+def _calculate_projected_savings(ctx: _SummaryContext) -> Dict[str, Any]:
+    """Calculate projected savings from optimizations"""
+    opportunities = ctx.opportunities
     
     # Calculate potential savings by category
     monthly_savings = {
@@ -308,7 +346,7 @@ def _calculate_projected_savings(scan_results: Dict[str, Any], cost_calculator:
     total_annual_savings = total_monthly_savings * 12
     
     # Calculate ROI
-    current_monthly_cost = current_costs["total_monthly_cost"]
+    current_monthly_cost = ctx.current_costs["total_monthly_cost"]
     savings_percentage = (total_monthly_savings / current_monthly_cost) * 100 if current_monthly_cost > 0 else 0
     
     return {
@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Row classification kernel for structured file metadata arrays; numba compiles it into
+# one parallel loop when installed, otherwise it is a handful of NumPy expressions run over
+# row shards on threads (NumPy releases the GIL inside them)
+
+# Files below this size count as small files
+SMALL_FILE_BYTES = 64 * 1024 * 1024
+
+# Class bits set per row by classify()
+COLD = 1
+EMPTY = 2
+SMALL = 4
+OVER_REPLICATED = 8
+PAST_ORPHAN_CUTOFF = 16
+
+# Smallest shard worth handing to another thread; smaller inputs are classified in one pass
+PARALLEL_MIN_ROWS = 100_000
+
+if njit:
+    @njit(parallel=True, cache=True, fastmath=True, nogil=True)
+    def classify(size, replication, access_time, modification_time, cold_threshold, orphan_cutoff):
+        """Class bits for every row, computed in a single pass"""
+        flags = np.empty(size.shape[0], dtype=np.uint8)
+        for i in prange(size.shape[0]):
+            flag = 0
+            if access_time[i] < cold_threshold:
+                flag |= COLD
+            if size[i] == 0:
+                flag |= EMPTY
+            elif size[i] < SMALL_FILE_BYTES:
+                flag |= SMALL
+            if replication[i] > 3:
+                flag |= OVER_REPLICATED
+            if modification_time[i] < orphan_cutoff:
+                flag |= PAST_ORPHAN_CUTOFF
+            flags[i] = flag
+        return flags
+    
+    # Warm the JIT (or load it from the on-disk cache) at import time, using strided
+    # field views like the ones the analyzer passes in
+    _warm = np.zeros(1, dtype=[("size", "i8"), ("replication", "i4"), ("time", "i8")])
+    classify(_warm["size"], _warm["replication"], _warm["time"], _warm["time"], 0.0, 0.0)
+    del _warm
+else:
+    def _classify_rows(flags, size, replication, access_time, modification_time, cold_threshold, orphan_cutoff):
+        """Write the class bits of one shard of rows into flags"""
+        flags[:] = np.where(access_time < cold_threshold, COLD, 0)
+        flags[size == 0] |= EMPTY
+        flags[(size != 0) & (size < SMALL_FILE_BYTES)] |= SMALL
+        flags[replication > 3] |= OVER_REPLICATED
+        flags[modification_time < orphan_cutoff] |= PAST_ORPHAN_CUTOFF
+    
+    def classify(size, replication, access_time, modification_time, cold_threshold, orphan_cutoff):
+        """Class bits for every row, computed in one pass per shard"""
+        flags = np.empty(size.shape[0], dtype=np.uint8)
+        workers = min(os.cpu_count() or 1, size.shape[0] // PARALLEL_MIN_ROWS)
+        if workers < 2:
+            _classify_rows(flags, size, replication, access_time, modification_time, cold_threshold, orphan_cutoff)
+            return flags
+        
+        # Shards write disjoint slices of flags, so the threads share nothing else
+        bounds = np.linspace(0, size.shape[0], workers + 1).astype(np.intp)
+        columns = (flags, size, replication, access_time, modification_time)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            shards = [
+                pool.submit(_classify_rows, *(column[start:stop] for column in columns), cold_threshold, orphan_cutoff)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            for shard in shards:
+                shard.result()
+        return flags
@@ -1,36 +1,278 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union, Sequence, Optional, Tuple, Callable, Iterator
+import heapq
 import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from collections import defaultdict
-from datetime import datetime, timedelta
+import numpy as np
+from cachetools import LRUCache
+from ._kernels import classify, COLD, EMPTY, SMALL, OVER_REPLICATED, PAST_ORPHAN_CUTOFF, SMALL_FILE_BYTES
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Structured row layout for columnar file metadata (one field per metadata key)
+FILE_DTYPE = np.dtype([
+    ("path", "U128"),
+    ("size", "i8"),
+    ("replication", "i4"),
+    ("access_time", "i8"),
+    ("modification_time", "i8"),
+    ("owner", "U32"),
+    ("group", "U32")
+])
+
+# Path fragments that mark temporary files; lowercased once here because every matcher
+# below compares them against lowercased paths
+TEMP_PATTERNS = tuple(pattern.lower() for pattern in (
+    "/tmp/", "/var/tmp/", "/_temporary/", "/temp/",
+    ".tmp", ".temp", ".bak", ".backup", "_tmp", "_temp"
+))
+
+# Each lowercased path is scanned once for all temp patterns: by an Aho-Corasick automaton
+# when pyahocorasick is installed, otherwise by one compiled alternation
+if ahocorasick:
+    _TEMP_AUTOMATON = ahocorasick.Automaton()
+    for _index, _pattern in enumerate(TEMP_PATTERNS):
+        _TEMP_AUTOMATON.add_word(_pattern, _index)
+    _TEMP_AUTOMATON.make_automaton()
+    
+    def _temp_pattern(lower_path: str) -> Optional[str]:
+        """First of TEMP_PATTERNS contained in a lowercased path, or None"""
+        indexes = [index for _, index in _TEMP_AUTOMATON.iter(lower_path)]
+        return TEMP_PATTERNS[min(indexes)] if indexes else None
+else:
+    _TEMP_REGEX = re.compile("|".join(map(re.escape, TEMP_PATTERNS)))
+    
+    def _temp_pattern(lower_path: str) -> Optional[str]:
+        """First of TEMP_PATTERNS contained in a lowercased path, or None"""
+        if _TEMP_REGEX.search(lower_path) is None:
+            return None
+        # The leftmost match is not necessarily the first pattern in list order
+        return next(pattern for pattern in TEMP_PATTERNS if pattern in lower_path)
+
+@dataclass(slots=True, frozen=True)
+class FileMeta:
+    """Compact per-file metadata record, usable wherever a metadata dict is expected"""
+    path: str
+    size: int
+    replication: int
+    access_time: int
+    modification_time: int
+    owner: str = ""
+    group: str = ""
+    
+    def keys(self) -> List[str]:
+        return _FILE_META_KEYS
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+_FILE_META_KEYS = [f.name for f in fields(FileMeta)]
+
+FileMetadata = Union[Sequence[Dict[str, Any]], Sequence[FileMeta], np.ndarray]
+
+def _is_structured(file_metadata: FileMetadata) -> bool:
+    """Check whether file metadata is a NumPy structured array"""
+    return isinstance(file_metadata, np.ndarray) and file_metadata.dtype.names is not None
+
+# Columns kept when packing scanned metadata dicts; string widths are sized to the data
+_RECORD_FIELDS = FILE_DTYPE.descr + [("block_size", "i8")]
+_RECORD_DEFAULTS = {"path": "", "owner": "", "group": "", "replication": 1}
+
+def _record_dtype(string_widths: Dict[str, int]) -> np.dtype:
+    """Record dtype with each string field wide enough for the given widths"""
+    return np.dtype([
+        (name, f"U{max(string_widths.get(name, 1), 1)}" if kind.startswith("<U") else kind)
+        for name, kind in _RECORD_FIELDS
+    ])
+
+def to_file_records(files: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Pack file metadata dicts into a columnar structured array without truncating strings"""
+    names = [name for name, _ in _RECORD_FIELDS]
+    rows = [tuple(f.get(name, _RECORD_DEFAULTS.get(name, 0)) for name in names) for f in files]
+    string_widths = {
+        name: max((len(row[i]) for row in rows), default=1)
+        for i, (name, kind) in enumerate(_RECORD_FIELDS) if kind.startswith("<U")
+    }
+    return np.array(rows, dtype=_record_dtype(string_widths))
+
+def concat_file_records(record_arrays: Sequence[np.ndarray]) -> np.ndarray:
+    """Concatenate record arrays, widening string fields to the widest input"""
+    string_widths = {}
+    for records in record_arrays:
+        for name in records.dtype.names:
+            if records.dtype[name].kind == "U":
+                string_widths[name] = max(string_widths.get(name, 1), records.dtype[name].itemsize // 4)
+    dtype = _record_dtype(string_widths)
+    if not record_arrays:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate([records.astype(dtype) for records in record_arrays])
+
+def _records_to_dicts(records: np.ndarray) -> List[Dict[str, Any]]:
+    """Materialize structured array rows as plain metadata dicts"""
+    names = records.dtype.names
+    return [dict(zip(names, row)) for row in records.tolist()]
+
+RowDicts = Callable[[np.ndarray], List[Dict[str, Any]]]
+
+def _size_groups(sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row, the number of files sharing its size and the first row with that size"""
+    _, first_index, inverse, counts = np.unique(sizes, return_index=True, return_inverse=True, return_counts=True)
+    return counts[inverse], first_index[inverse]
+
+def _file_sizes(file_metadata: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """The size column of metadata dicts as an array"""
+    return np.fromiter((file_info.get("size", 0) for file_info in file_metadata), dtype=np.int64,
+                       count=len(file_metadata))
+
+def _duplicate_rows(sizes: np.ndarray, size_groups: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                    limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows whose non-zero size occurs more than once, in ranking order, with their group sizes"""
+    group_sizes, group_first_rows = size_groups or _size_groups(sizes)
+    rows = np.flatnonzero((sizes > 0) & (group_sizes > 1))
+    
+    # Largest groups first, then groups in order of first appearance, then rows in order;
+    # the same order the grouped list sort produces
+    order = rows[np.lexsort((rows, group_first_rows[rows], -group_sizes[rows]))][:limit]
+    return order, group_sizes[order]
+
+def _row_dicts(records: np.ndarray, candidate_rows: Optional[np.ndarray] = None) -> RowDicts:
+    """Map row indices to metadata dicts; with sorted candidate rows, each is built only once"""
+    if candidate_rows is None:
+        return lambda rows: _records_to_dicts(records[rows])
+    candidate_dicts = _records_to_dicts(records[candidate_rows])
+    return lambda rows: [candidate_dicts[i] for i in np.searchsorted(candidate_rows, rows).tolist()]
+
+def _ranked(values: np.ndarray, limit: Optional[int] = None) -> np.ndarray:
+    """Positions of values from highest to lowest, ties in position order, cut to limit"""
+    if limit is None or limit >= len(values):
+        return np.argsort(-values, kind="stable")
+    if limit <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    # Select everything tied with or above the limit-th largest value in O(n); only that
+    # part is sorted
+    kth = -np.partition(-values, limit - 1)[limit - 1]
+    candidates = np.flatnonzero(values >= kth)
+    return candidates[np.argsort(-values[candidates], kind="stable")][:limit]
+
+def _classify_records(records: np.ndarray, current_time: float, cold_threshold_days: int = 180) -> np.ndarray:
+    """Per-row class bits (cold, empty, small, over-replicated, past the orphan cutoff)"""
+    return classify(
+        records["size"], records["replication"], records["access_time"], records["modification_time"],
+        current_time - (cold_threshold_days * _DAY_MS), current_time - (7 * _DAY_MS)
+    )
+
+# Per-directory running totals: file count, total size, small file count, large file count
+DirectoryTotals = Tuple[Dict[str, int], Dict[str, int], Dict[str, int], Dict[str, int]]
+
+def _new_directory_totals() -> DirectoryTotals:
+    return defaultdict(int), defaultdict(int), defaultdict(int), defaultdict(int)
+
+# Marks a size whose only file so far was already retained by update()
+_SIZE_RETAINED = object()
+
+# Unit sizes shared by every analysis
+_DAY_MS = 24 * 60 * 60 * 1000
+_MB = 1024 * 1024
+_GB = 1024 ** 3
+
+def _now_ms() -> int:
+    """Current time in epoch milliseconds, the unit of HDFS access and modification times"""
+    return time.time_ns() // 1_000_000
+
+# Same-size files at or below this size are left grouped by size alone; checksumming
+# them costs more than a false positive
+_CHECKSUM_MIN_BYTES = 4 * 1024
+
+# Returns a content checksum for an HDFS path, or None when it cannot be read
+ChecksumFn = Callable[[str], Optional[str]]
 
 class HDFSMetadataAnalyzer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # (path, modification time) -> checksum, so unchanged files are not re-checksummed
+        self._checksum_cache = LRUCache(maxsize=100_000)
     
-    def identify_cold_data(self, file_metadata: List[Dict[str, Any]], 
-                          cold_threshold_days: int = 180) -> List[Dict[str, Any]]:
-        """Identify cold data based on access patterns"""
-        cold_data = []
-        current_time = datetime.now().timestamp() * 1000  # Convert to milliseconds
-        cold_threshold = current_time - (cold_threshold_days * 24 * 60 * 60 * 1000)
+    def identify_cold_data(self, file_metadata: FileMetadata, cold_threshold_days: int = 180,
+                          current_time: Optional[float] = None, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Identify cold data based on access patterns; with top_k, only the coldest top_k files"""
+        if current_time is None:
+            current_time = _now_ms()
+        
+        if _is_structured(file_metadata):
+            flags = _classify_records(file_metadata, current_time, cold_threshold_days)
+            return self._cold_records(file_metadata, current_time, cold_threshold_days, flags, limit=top_k)
+        
+        cold_data = self._iter_cold_data(file_metadata, current_time, cold_threshold_days)
         
+        # Sort by coldness score (highest first); nlargest is stable, so its ties keep the
+        # order the full sort gives them
+        if top_k is not None:
+            return heapq.nlargest(top_k, cold_data, key=lambda x: x["cold_score"])
+        cold_data = list(cold_data)
+        cold_data.sort(key=lambda x: x["cold_score"], reverse=True)
+        return cold_data
+    
+    def _iter_cold_data(self, file_metadata: FileMetadata, current_time: float,
+                        cold_threshold_days: int) -> Iterator[Dict[str, Any]]:
+        """Yield cold data entries in input order"""
+        cold_threshold = current_time - (cold_threshold_days * _DAY_MS)
         for file_info in file_metadata:
             access_time = file_info.get("access_time", 0)
             if access_time < cold_threshold:
-                days_since_access = (current_time - access_time) / (24 * 60 * 60 * 1000)
-                cold_data.append({
+                days_since_access = (current_time - access_time) / _DAY_MS
+                yield {
                     **file_info,
                     "classification": "cold",
                     "days_since_access": days_since_access,
                     "cold_score": min(days_since_access / cold_threshold_days, 1.0)
-                })
+                }
+    
+    def _cold_records(self, records: np.ndarray, current_time: float, cold_threshold_days: int,
+                      flags: np.ndarray, row_dicts: Optional[RowDicts] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Cold data entries for structured records, scored and ranked with array operations"""
+        rows = np.flatnonzero(flags & COLD)
+        days = (current_time - records["access_time"][rows]) / _DAY_MS
+        scores = np.minimum(days / cold_threshold_days, 1.0)
         
-        # Sort by coldness score (highest first)
-        cold_data.sort(key=lambda x: x["cold_score"], reverse=True)
-        return cold_data
+        # A stable ranking on the score orders like the list sort, keeping ties in row order
+        order = _ranked(scores, limit)
+        return [
+            {**file_info, "classification": "cold", "days_since_access": days_since_access, "cold_score": cold_score}
+            for file_info, days_since_access, cold_score in zip(
+                (row_dicts or _row_dicts(records))(rows[order]), days[order].tolist(), scores[order].tolist()
+            )
+        ]
     
-    def detect_duplicate_candidates(self, file_metadata: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Detect potential duplicate files based on size and name patterns"""
+    def detect_duplicate_candidates(self, file_metadata: FileMetadata, checksum: Optional[ChecksumFn] = None,
+                                    top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Detect potential duplicate files based on size and, given a checksum function, content"""
+        # Without a checksum function candidates come from listing metadata alone, so the
+        # cost is one grouping pass over the sizes
+        if checksum is None:
+            if _is_structured(file_metadata):
+                return self._duplicate_records(file_metadata, limit=top_k)
+            return self._duplicate_files(file_metadata, _file_sizes(file_metadata), limit=top_k)
+        
+        if _is_structured(file_metadata):
+            # Only rows sharing a size with another row can be duplicates
+            sizes = file_metadata["size"]
+            group_sizes, _ = _size_groups(sizes)
+            file_metadata = _records_to_dicts(file_metadata[(sizes > 0) & (group_sizes > 1)])
+        
         size_groups = defaultdict(list)
         
         # Group files by size
@@ -39,30 +281,104 @@ class HDFSMetadataAnalyzer:
             if size > 0:
                 size_groups[size].append(file_info)
         
-        # Identify potential duplicates
-        duplicate_candidates = []
+        return self._collect_duplicates(self._split_by_checksum(size_groups, checksum), top_k)
+    
+    def _split_by_checksum(self, size_groups: Dict[int, List[Dict[str, Any]]],
+                           checksum: ChecksumFn) -> Dict[Any, List[Dict[str, Any]]]:
+        """Split same-size groups by content checksum; singletons are dropped unchecked"""
+        content_groups = {}
+        for size, files in size_groups.items():
+            if len(files) < 2:
+                continue
+            if size <= _CHECKSUM_MIN_BYTES:
+                content_groups[size] = files
+                continue
+            
+            # Files whose checksum cannot be read stay together as unverified candidates
+            for file_info in files:
+                content_groups.setdefault((size, self._file_checksum(file_info, checksum)), []).append(file_info)
+        return content_groups
+    
+    def _file_checksum(self, file_info: Dict[str, Any], checksum: ChecksumFn) -> Optional[str]:
+        """Checksum of a file, cached by path and modification time"""
+        key = (file_info.get("path", ""), file_info.get("modification_time", 0))
+        value = self._checksum_cache.get(key)
+        if value is None:
+            value = checksum(key[0])
+            if value is not None:
+                self._checksum_cache[key] = value
+        return value
+    
+    def _collect_duplicates(self, size_groups: Dict[int, List[Dict[str, Any]]],
+                            top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Build sorted duplicate candidates from files grouped by size"""
+        duplicate_candidates = self._iter_duplicates(size_groups)
+        
+        # Sort by duplicate score (highest first)
+        if top_k is not None:
+            return heapq.nlargest(top_k, duplicate_candidates, key=lambda x: x["duplicate_score"])
+        duplicate_candidates = list(duplicate_candidates)
+        duplicate_candidates.sort(key=lambda x: x["duplicate_score"], reverse=True)
+        return duplicate_candidates
+    
+    def _iter_duplicates(self, size_groups: Dict[Any, List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """Yield duplicate candidate entries group by group"""
         for size, files in size_groups.items():
             if len(files) > 1:
                 # Further analyze files with same size
                 for file_info in files:
-                    path = file_info.get("path", "")
-                    filename = path.split("/")[-1] if path else ""
+                    filename = (file_info.get("path") or "").rpartition("/")[2]
                     
-                    duplicate_candidates.append({
+                    yield {
                         **file_info,
                         "classification": "potential_duplicate",
                         "group_size": len(files),
                         "filename": filename,
                         "duplicate_score": len(files) / 10.0  # Normalize score
-                    })
+                    }
+    
+    def _duplicate_records(self, records: np.ndarray, row_dicts: Optional[RowDicts] = None,
+                           size_groups: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Duplicate candidates among structured records, grouped and ranked with array sorts"""
+        order, group_sizes = _duplicate_rows(records["size"], size_groups, limit)
         
-        # Sort by duplicate score (highest first)
-        duplicate_candidates.sort(key=lambda x: x["duplicate_score"], reverse=True)
-        return duplicate_candidates
+        return [
+            {
+                **file_info,
+                "classification": "potential_duplicate",
+                "group_size": group_size,
+                "filename": file_info["path"].rpartition("/")[2],
+                "duplicate_score": group_size / 10.0  # Normalize score
+            }
+            for file_info, group_size in zip((row_dicts or _row_dicts(records))(order), group_sizes.tolist())
+        ]
+    
+    def _duplicate_files(self, file_metadata: Sequence[Dict[str, Any]], sizes: np.ndarray,
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Duplicate candidates among metadata dicts, grouped by their sizes with array sorts"""
+        order, group_sizes = _duplicate_rows(sizes, limit=limit)
+        
+        entries = []
+        for row, group_size in zip(order.tolist(), group_sizes.tolist()):
+            file_info = file_metadata[row]
+            entries.append({
+                **file_info,
+                "classification": "potential_duplicate",
+                "group_size": group_size,
+                "filename": (file_info.get("path") or "").rpartition("/")[2],
+                "duplicate_score": group_size / 10.0  # Normalize score
+            })
+        return entries
     
-    def analyze_file_efficiency(self, file_metadata: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_file_efficiency(self, file_metadata: FileMetadata) -> Dict[str, Any]:
         """Analyze file layout efficiency and small file problems"""
         total_files = len(file_metadata)
+        
+        if _is_structured(file_metadata):
+            flags = _classify_records(file_metadata, _now_ms())
+            return self._efficiency_records(file_metadata, total_files, flags)
+        
         small_files = []
         inefficient_replication = []
         empty_files = []
@@ -80,12 +396,12 @@ class HDFSMetadataAnalyzer:
                 })
             
             # Identify small files (< 64MB)
-            elif size < 64 * 1024 * 1024:
+            elif size < SMALL_FILE_BYTES:
                 small_files.append({
                     **file_info,
                     "classification": "small_file",
-                    "efficiency_impact": "high" if size < 1024 * 1024 else "medium",
-                    "size_mb": size / (1024 * 1024)
+                    "efficiency_impact": "high" if size < _MB else "medium",
+                    "size_mb": size / _MB
                 })
             
             # Identify over-replicated files
@@ -98,9 +414,50 @@ class HDFSMetadataAnalyzer:
                     "excess_replicas": replication - 3
                 })
         
+        return self._summarize_efficiency(total_files, small_files, empty_files, inefficient_replication)
+    
+    def _efficiency_records(self, records: np.ndarray, total_files: int, flags: np.ndarray,
+                            row_dicts: Optional[RowDicts] = None) -> Dict[str, Any]:
+        """Efficiency report for structured records, built only for the classified rows"""
+        row_dicts = row_dicts or _row_dicts(records)
+        empty = np.flatnonzero(flags & EMPTY)
+        small = np.flatnonzero(flags & SMALL)
+        over_replicated = np.flatnonzero(flags & OVER_REPLICATED)
+        
+        small_sizes = records["size"][small]
+        small_files = [
+            {**file_info, "classification": "small_file", "efficiency_impact": impact, "size_mb": size_mb}
+            for file_info, impact, size_mb in zip(
+                row_dicts(small),
+                np.where(small_sizes < _MB, "high", "medium").tolist(),
+                (small_sizes / _MB).tolist()
+            )
+        ]
+        empty_files = [
+            {**file_info, "classification": "empty_file", "efficiency_impact": "medium"}
+            for file_info in row_dicts(empty)
+        ]
+        inefficient_replication = [
+            {
+                **file_info,
+                "classification": "over_replicated",
+                "current_replication": file_info["replication"],
+                "suggested_replication": 3,
+                "excess_replicas": file_info["replication"] - 3
+            }
+            for file_info in row_dicts(over_replicated)
+        ]
+        
+        return self._summarize_efficiency(total_files, small_files, empty_files, inefficient_replication)
+    
+    def _summarize_efficiency(self, total_files: int, small_files: List[Dict[str, Any]],
+                              empty_files: List[Dict[str, Any]],
+                              inefficient_replication: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the efficiency report from classified files"""
         # Calculate efficiency metrics
         small_files_percentage = (len(small_files) / total_files) * 100 if total_files > 0 else 0
         over_replicated_percentage = (len(inefficient_replication) / total_files) * 100 if total_files > 0 else 0
+        high_impact_count = sum(1 for f in small_files if f["efficiency_impact"] == "high")
         
         return {
             "total_files": total_files,
@@ -113,33 +470,175 @@ class HDFSMetadataAnalyzer:
             "over_replicated_count": len(inefficient_replication),
             "over_replicated_percentage": over_replicated_percentage,
             "efficiency_summary": {
-                "critical_issues": len(empty_files) + len([f for f in small_files if f["efficiency_impact"] == "high"]),
-                "moderate_issues": len([f for f in small_files if f["efficiency_impact"] == "medium"]),
+                "critical_issues": len(empty_files) + high_impact_count,
+                "moderate_issues": len(small_files) - high_impact_count,
                 "storage_waste_factor": (len(small_files) * 0.1) + (len(inefficient_replication) * 0.2)
             }
         }
     
-    def identify_orphaned_temp_files(self, file_metadata: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Identify orphaned temporary files"""
-        orphaned_files = []
-        temp_patterns = [
-            "/tmp/", "/var/tmp/", "/_temporary/", "/temp/",
-            ".tmp", ".temp", ".bak", ".backup", "_tmp", "_temp"
-        ]
+    def identify_orphaned_temp_files(self, file_metadata: FileMetadata, current_time: Optional[float] = None,
+                                     top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Identify orphaned temporary files; with top_k, only the oldest top_k"""
+        if current_time is None:
+            current_time = _now_ms()
+        
+        if _is_structured(file_metadata):
+            flags = _classify_records(file_metadata, current_time)
+            return self._orphaned_records(file_metadata, current_time, flags, limit=top_k)
         
-        current_time = datetime.now().timestamp() * 1000
+        orphaned_files = self._iter_orphaned(file_metadata, current_time)
         
+        # Sort by age (oldest first)
+        if top_k is not None:
+            return heapq.nlargest(top_k, orphaned_files, key=lambda x: x["age_days"])
+        orphaned_files = list(orphaned_files)
+        orphaned_files.sort(key=lambda x: x["age_days"], reverse=True)
+        return orphaned_files
+    
+    def _iter_orphaned(self, file_metadata: FileMetadata, current_time: float) -> Iterator[Dict[str, Any]]:
+        """Yield orphaned temporary file entries in input order"""
         for file_info in file_metadata:
             path = file_info.get("path", "")
             modification_time = file_info.get("modification_time", 0)
             
             # Check for temporary file patterns
-            is_temp = any(pattern in path.lower() for pattern in temp_patterns)
+            temp_pattern = _temp_pattern(path.lower())
             
-            if is_temp:
-                file_age_days = (current_time - modification_time) / (24 * 60 * 60 * 1000)
+            if temp_pattern is not None:
+                file_age_days = (current_time - modification_time) / _DAY_MS
                 
                 # Consider as orphaned if older than 7 days
+                if file_age_days > 7:
+                    cleanup_priority = "high" if file_age_days > 30 else "medium"
+                    if file_age_days > 90:
+                        cleanup_priority = "critical"
+                    
+                    yield {
+                        **file_info,
+                        "classification": "orphaned_temp",
+                        "age_days": file_age_days,
+                        "cleanup_priority": cleanup_priority,
+                        "temp_pattern": temp_pattern
+                    }
+    
+    def _orphaned_records(self, records: np.ndarray, current_time: float, flags: np.ndarray,
+                          row_dicts: Optional[RowDicts] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Orphaned temporary files among structured records, matched with vectorized string ops"""
+        # Only files older than the 7 day orphan cutoff need the pattern checks
+        modification_times = records["modification_time"]
+        candidates = np.flatnonzero(flags & PAST_ORPHAN_CUTOFF)
+        
+        # Index of the first temp pattern each lowercased path contains, or -1
+        paths = np.char.lower(records["path"][candidates])
+        pattern_index = np.full(len(candidates), -1)
+        for i in range(len(TEMP_PATTERNS) - 1, -1, -1):
+            pattern_index[np.char.find(paths, TEMP_PATTERNS[i]) >= 0] = i
+        
+        ages = (current_time - modification_times[candidates]) / _DAY_MS
+        rows = np.flatnonzero((pattern_index >= 0) & (ages > 7))
+        order = rows[_ranked(ages[rows], limit)]
+        ages = ages[order]
+        priorities = np.where(ages > 90, "critical", np.where(ages > 30, "high", "medium"))
+        
+        return [
+            {
+                **file_info,
+                "classification": "orphaned_temp",
+                "age_days": age_days,
+                "cleanup_priority": cleanup_priority,
+                "temp_pattern": TEMP_PATTERNS[pattern]
+            }
+            for file_info, age_days, cleanup_priority, pattern in zip(
+                (row_dicts or _row_dicts(records))(candidates[order]), ages.tolist(), priorities.tolist(),
+                pattern_index[order].tolist()
+            )
+        ]
+    
+    def analyze_all(self, file_metadata: FileMetadata, cold_threshold_days: int = 180,
+                    total_files: Optional[int] = None, current_time: Optional[float] = None) -> Dict[str, Any]:
+        """Run the cold data, duplicate, efficiency, orphaned file and waste analyses in one pass"""
+        if total_files is None:
+            total_files = len(file_metadata)
+        if current_time is None:
+            current_time = _now_ms()
+        cold_threshold = current_time - (cold_threshold_days * _DAY_MS)
+        
+        if _is_structured(file_metadata):
+            # One classification pass selects the rows for every analysis; the union of those
+            # rows is materialized once and shared
+            sizes = file_metadata["size"]
+            size_groups = _size_groups(sizes)
+            flags = _classify_records(file_metadata, current_time, cold_threshold_days)
+            candidate_rows = np.flatnonzero((flags != 0) | ((sizes > 0) & (size_groups[0] > 1)))
+            row_dicts = _row_dicts(file_metadata, candidate_rows)
+            return {
+                "cold_data": self._cold_records(file_metadata, current_time, cold_threshold_days, flags, row_dicts),
+                "duplicate_candidates": self._duplicate_records(file_metadata, row_dicts, size_groups),
+                "efficiency": self._efficiency_records(file_metadata, total_files, flags, row_dicts),
+                "orphaned_files": self._orphaned_records(file_metadata, current_time, flags, row_dicts),
+                "waste_analysis": self.calculate_storage_waste(file_metadata)
+            }
+        
+        cold_data = []
+        sizes = []
+        small_files = []
+        inefficient_replication = []
+        empty_files = []
+        orphaned_files = []
+        total_size = 0
+        replication_waste = 0
+        empty_file_waste = 0
+        small_file_total = 0
+        
+        for file_info in file_metadata:
+            size = file_info.get("size", 0)
+            replication = file_info.get("replication", 1)
+            access_time = file_info.get("access_time", 0)
+            
+            total_size += size
+            if size < SMALL_FILE_BYTES:
+                small_file_total += 1
+            
+            if access_time < cold_threshold:
+                days_since_access = (current_time - access_time) / _DAY_MS
+                cold_data.append({
+                    **file_info,
+                    "classification": "cold",
+                    "days_since_access": days_since_access,
+                    "cold_score": min(days_since_access / cold_threshold_days, 1.0)
+                })
+            
+            sizes.append(size)
+            
+            if size == 0:
+                empty_file_waste += file_info.get("block_size", 0)
+                empty_files.append({
+                    **file_info,
+                    "classification": "empty_file",
+                    "efficiency_impact": "medium"
+                })
+            elif size < SMALL_FILE_BYTES:
+                small_files.append({
+                    **file_info,
+                    "classification": "small_file",
+                    "efficiency_impact": "high" if size < _MB else "medium",
+                    "size_mb": size / _MB
+                })
+            
+            if replication > 3:
+                replication_waste += size * (replication - 3)
+                inefficient_replication.append({
+                    **file_info,
+                    "classification": "over_replicated",
+                    "current_replication": replication,
+                    "suggested_replication": 3,
+                    "excess_replicas": replication - 3
+                })
+            
+            temp_pattern = _temp_pattern(file_info.get("path", "").lower())
+            if temp_pattern is not None:
+                modification_time = file_info.get("modification_time", 0)
+                file_age_days = (current_time - modification_time) / _DAY_MS
                 if file_age_days > 7:
                     cleanup_priority = "high" if file_age_days > 30 else "medium"
                     if file_age_days > 90:
@@ -150,109 +649,240 @@ class HDFSMetadataAnalyzer:
                         "classification": "orphaned_temp",
                         "age_days": file_age_days,
                         "cleanup_priority": cleanup_priority,
-                        "temp_pattern": next((p for p in temp_patterns if p in path.lower()), "unknown")
+                        "temp_pattern": temp_pattern
                     })
         
-        # Sort by age (oldest first)
+        cold_data.sort(key=lambda x: x["cold_score"], reverse=True)
         orphaned_files.sort(key=lambda x: x["age_days"], reverse=True)
-        return orphaned_files
+        
+        return {
+            "cold_data": cold_data,
+            "duplicate_candidates": self._duplicate_files(file_metadata, np.array(sizes, dtype=np.int64)),
+            "efficiency": self._summarize_efficiency(total_files, small_files, empty_files, inefficient_replication),
+            "orphaned_files": orphaned_files,
+            "waste_analysis": self._summarize_waste(total_size, replication_waste, empty_file_waste, small_file_total)
+        }
     
-    def analyze_directory_structure(self, file_metadata: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze directory structure for optimization opportunities"""
-        directory_stats = defaultdict(lambda: {
-            "file_count": 0,
-            "total_size": 0,
-            "small_files": 0,
-            "large_files": 0,
-            "avg_file_size": 0
-        })
+    def start(self, cold_threshold_days: int = 180) -> None:
+        """Reset the running state for an incremental analysis fed through update()"""
+        self._cold_threshold_days = cold_threshold_days
+        self._current_time = _now_ms()
+        self._total_files = 0
+        self._directory_totals = _new_directory_totals()
+        self._waste = [0, 0, 0, 0]
+        # Rows some per-file analysis may report; everything else is dropped after its batch
+        self._retained = []
+        # Size -> the single earlier row with that size, until a second file makes both duplicates
+        self._size_first_row = {}
+        # Directory statistics and the per-file state are disjoint, so concurrent update()
+        # callers only contend on the part they are currently folding in
+        self._directory_lock = threading.Lock()
+        self._rows_lock = threading.Lock()
+    
+    def update(self, records: np.ndarray) -> None:
+        """Fold one batch of file records (from to_file_records) into the running analysis; thread-safe"""
+        if not _is_structured(records):
+            records = to_file_records(records)
+        if not len(records):
+            return
         
-        for file_info in file_metadata:
-            path = file_info.get("path", "")
-            size = file_info.get("size", 0)
+        with self._directory_lock:
+            self._accumulate_directory_stats(self._directory_totals, records)
+        
+        # Everything up to the shared-state updates depends only on this batch
+        waste_totals = self._waste_totals(records)
+        sizes = records["size"]
+        keep = _classify_records(records, self._current_time, self._cold_threshold_days) != 0
+        
+        # Duplicate candidates depend on sizes seen in other batches, so track each non-zero
+        # size until a second file with that size turns up
+        nonzero_rows = np.flatnonzero(sizes > 0)
+        unique_sizes, first_index, counts = np.unique(sizes[nonzero_rows], return_index=True, return_counts=True)
+        
+        with self._rows_lock:
+            self._total_files += len(records)
+            for i, total in enumerate(waste_totals):
+                self._waste[i] += total
             
-            # Extract directory path
-            directory = "/".join(path.split("/")[:-1]) if "/" in path else "/"
+            duplicate_sizes = []
+            for size, row, count in zip(unique_sizes.tolist(), nonzero_rows[first_index].tolist(), counts.tolist()):
+                if size not in self._size_first_row and count == 1:
+                    self._size_first_row[size] = _SIZE_RETAINED if keep[row] else records[row:row + 1].copy()
+                    continue
+                
+                pending = self._size_first_row.get(size)
+                if pending is not None and pending is not _SIZE_RETAINED:
+                    self._retained.append(pending)
+                self._size_first_row[size] = None
+                duplicate_sizes.append(size)
             
-            # Update directory statistics
-            directory_stats[directory]["file_count"] += 1
-            directory_stats[directory]["total_size"] += size
+            if duplicate_sizes:
+                keep |= np.isin(sizes, duplicate_sizes)
+            self._retained.append(records[keep])
+    
+    def finalize(self) -> Dict[str, Any]:
+        """Finish an incremental analysis and return every report the scan needs"""
+        retained = concat_file_records(self._retained)
+        
+        # The directory summary shares nothing with the per-file analyses; run them side by side
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            directory_analysis = executor.submit(self._summarize_directories, self._directory_totals)
+            analysis = self.analyze_all(
+                retained, self._cold_threshold_days,
+                total_files=self._total_files, current_time=self._current_time
+            )
+        # The running totals cover every scanned file, not just the retained rows
+        waste_analysis = self._summarize_waste(*self._waste)
+        
+        return {
+            "total_files": self._total_files,
+            "total_size_bytes": self._waste[0],
+            **analysis,
+            "directory_analysis": directory_analysis.result(),
+            "waste_analysis": waste_analysis,
+            "optimization_priorities": self._prioritize(
+                analysis["cold_data"], analysis["efficiency"], analysis["orphaned_files"], waste_analysis
+            )
+        }
+    
+    def analyze_directory_structure(self, file_metadata: FileMetadata) -> Dict[str, Any]:
+        """Analyze directory structure for optimization opportunities"""
+        directory_totals = _new_directory_totals()
+        self._accumulate_directory_stats(directory_totals, file_metadata)
+        return self._summarize_directories(directory_totals)
+    
+    def _accumulate_directory_stats(self, directory_totals: DirectoryTotals, file_metadata: FileMetadata) -> None:
+        """Add each file's size to its directory's running statistics"""
+        if _is_structured(file_metadata):
+            # Only the path and size columns are needed; skip building row dicts
+            rows = zip(file_metadata["path"].tolist(), file_metadata["size"].tolist())
+        else:
+            rows = ((file_info.get("path", ""), file_info.get("size", 0)) for file_info in file_metadata)
+        
+        # Flat counters per statistic; cheaper to bump than fields of a nested dict
+        dir_files, dir_size, dir_small, dir_large = directory_totals
+        for path, size in rows:
+            # Extract directory path in one scan; paths without a separator go under the root
+            directory, separator, _ = path.rpartition("/")
+            if not separator:
+                directory = "/"
             
-            if size < 64 * 1024 * 1024:  # Less than 64MB
-                directory_stats[directory]["small_files"] += 1
-            else:
-                directory_stats[directory]["large_files"] += 1
+            dir_files[directory] += 1
+            dir_size[directory] += size
+            (dir_small if size < SMALL_FILE_BYTES else dir_large)[directory] += 1
+    
+    def _summarize_directories(self, directory_totals: DirectoryTotals) -> Dict[str, Any]:
+        """Compute per-directory averages and flag directories dominated by small files"""
+        dir_files, dir_size, dir_small, dir_large = directory_totals
         
-        # Calculate averages and identify problematic directories
+        # Calculate averages and identify problematic directories; every tracked directory
+        # holds at least one file
+        directory_stats = {}
         problematic_directories = []
-        for directory, stats in directory_stats.items():
-            if stats["file_count"] > 0:
-                stats["avg_file_size"] = stats["total_size"] / stats["file_count"]
-                stats["small_file_ratio"] = stats["small_files"] / stats["file_count"]
-                
-                # Identify directories with high small file ratios
-                if stats["small_file_ratio"] > 0.7 and stats["file_count"] > 10:
-                    problematic_directories.append({
-                        "directory": directory,
-                        "issue": "high_small_file_ratio",
-                        "small_file_ratio": stats["small_file_ratio"],
-                        "file_count": stats["file_count"],
-                        "total_size_mb": stats["total_size"] / (1024 * 1024),
-                        "optimization_potential": "file_consolidation"
-                    })
+        for directory, file_count in dir_files.items():
+            total_size = dir_size[directory]
+            small_files = dir_small.get(directory, 0)
+            small_file_ratio = small_files / file_count
+            directory_stats[directory] = {
+                "file_count": file_count,
+                "total_size": total_size,
+                "small_files": small_files,
+                "large_files": dir_large.get(directory, 0),
+                "avg_file_size": total_size / file_count,
+                "small_file_ratio": small_file_ratio
+            }
+            
+            # Identify directories with high small file ratios
+            if small_file_ratio > 0.7 and file_count > 10:
+                problematic_directories.append({
+                    "directory": directory,
+                    "issue": "high_small_file_ratio",
+                    "small_file_ratio": small_file_ratio,
+                    "file_count": file_count,
+                    "total_size_mb": total_size / _MB,
+                    "optimization_potential": "file_consolidation"
+                })
         
         return {
-            "directory_stats": dict(directory_stats),
+            "directory_stats": directory_stats,
             "problematic_directories": problematic_directories,
             "total_directories": len(directory_stats),
             "consolidation_candidates": len(problematic_directories)
         }
     
-    def calculate_storage_waste(self, file_metadata: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def calculate_storage_waste(self, file_metadata: FileMetadata) -> Dict[str, Any]:
         """Calculate various forms of storage waste"""
-        total_size = sum(file_info.get("size", 0) for file_info in file_metadata)
+        return self._summarize_waste(*self._waste_totals(file_metadata))
+    
+    def _waste_totals(self, file_metadata: FileMetadata) -> Tuple[int, int, int, int]:
+        """Return (total size, replication waste, empty file waste, small file count)"""
+        if _is_structured(file_metadata):
+            sizes = file_metadata["size"]
+            replication = file_metadata["replication"]
+            over_replicated = replication > 3
+            empty_file_waste = 0
+            if "block_size" in file_metadata.dtype.names:
+                empty_file_waste = int(file_metadata["block_size"][sizes == 0].sum())
+            return (
+                int(sizes.sum()),
+                int((sizes[over_replicated] * (replication[over_replicated] - 3)).sum()),
+                empty_file_waste,
+                int(np.count_nonzero(sizes < SMALL_FILE_BYTES))
+            )
         
-        # Calculate waste from over-replication
+        # All four totals in one pass over the metadata
+        total_size = 0
         replication_waste = 0
+        empty_file_waste = 0
+        small_files = 0
         for file_info in file_metadata:
             size = file_info.get("size", 0)
+            total_size += size
+            
+            # Waste from over-replication
             replication = file_info.get("replication", 1)
             if replication > 3:
                 replication_waste += size * (replication - 3)
+            
+            # Waste from empty files
+            if size == 0:
+                empty_file_waste += file_info.get("block_size", 0)
+            
+            if size < SMALL_FILE_BYTES:
+                small_files += 1
         
-        # Calculate waste from empty files
-        empty_file_waste = sum(
-            file_info.get("block_size", 0) for file_info in file_metadata
-            if file_info.get("size", 0) == 0
-        )
-        
+        return total_size, replication_waste, empty_file_waste, small_files
+    
+    def _summarize_waste(self, total_size: int, replication_waste: int,
+                         empty_file_waste: int, small_files: int) -> Dict[str, Any]:
+        """Build the storage waste report from its running totals"""
         # Calculate waste from small files (metadata overhead)
-        small_file_overhead = len([
-            f for f in file_metadata if f.get("size", 0) < 64 * 1024 * 1024
-        ]) * 150  # Assume 150 bytes metadata overhead per small file
+        small_file_overhead = small_files * 150  # Assume 150 bytes metadata overhead per small file
         
         return {
             "total_size_bytes": total_size,
-            "total_size_gb": total_size / (1024 ** 3),
+            "total_size_gb": total_size / _GB,
             "replication_waste_bytes": replication_waste,
-            "replication_waste_gb": replication_waste / (1024 ** 3),
+            "replication_waste_gb": replication_waste / _GB,
             "empty_file_waste_bytes": empty_file_waste,
             "small_file_overhead_bytes": small_file_overhead,
             "total_waste_bytes": replication_waste + empty_file_waste + small_file_overhead,
             "waste_percentage": ((replication_waste + empty_file_waste + small_file_overhead) / total_size) * 100 if total_size > 0 else 0
         }
     
-    def generate_optimization_priority(self, file_metadata: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def generate_optimization_priority(self, file_metadata: FileMetadata) -> List[Dict[str, Any]]:
         """Generate prioritized list of optimization opportunities"""
+        # Every input the ranking needs comes out of one fused pass over the metadata
+        analysis = self.analyze_all(file_metadata)
+        return self._prioritize(
+            analysis["cold_data"], analysis["efficiency"], analysis["orphaned_files"], analysis["waste_analysis"]
+        )
+    
+    def _prioritize(self, cold_data: List[Dict[str, Any]], efficiency_analysis: Dict[str, Any],
+                    orphaned_files: List[Dict[str, Any]], waste_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Rank optimization opportunities from completed analyses"""
         optimizations = []
         
-        # Analyze different aspects
-        cold_data = self.identify_cold_data(file_metadata)
-        efficiency_analysis = self.analyze_file_efficiency(file_metadata)
-        orphaned_files = self.identify_orphaned_temp_files(file_metadata)
-        duplicates = self.detect_duplicate_candidates(file_metadata)
-        waste_analysis = self.calculate_storage_waste(file_metadata)
-        
         # Add optimization opportunities based on analysis
         if cold_data:
             optimizations.append({
@@ -260,7 +890,7 @@ class HDFSMetadataAnalyzer:
                 "priority": "high",
                 "impact": "high",
                 "affected_files": len(cold_data),
-                "potential_savings_gb": sum(f.get("size", 0) for f in cold_data) / (1024 ** 3) * 0.7,
+                "potential_savings_gb": sum(f.get("size", 0) for f in cold_data) / _GB * 0.7,
                 "description": "Migrate cold data to cheaper storage tiers"
             })
         
@@ -280,7 +910,7 @@ class HDFSMetadataAnalyzer:
                 "priority": "medium",
                 "impact": "medium",
                 "affected_files": len(orphaned_files),
-                "potential_savings_gb": sum(f.get("size", 0) for f in orphaned_files) / (1024 ** 3),
+                "potential_savings_gb": sum(f.get("size", 0) for f in orphaned_files) / _GB,
                 "description": "Remove orphaned temporary files"
             })
         
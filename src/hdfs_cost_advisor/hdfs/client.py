@@ -6,9 +6,51 @@ except ImportError:
 import requests
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Iterator
 from dataclasses import dataclass
 from datetime import datetime
+from cachetools import TTLCache
+from urllib3.util import Retry
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Keep-alive connections held per client; concurrent path scans share them
+HTTP_POOL_SIZE = 64
+
+# Attempts at reaching the NameNode before a request fails; only connection errors are
+# retried, so a request the server may have acted on is never sent twice
+HTTP_CONNECT_RETRIES = 3
+
+# Seconds to wait on a NameNode HTTP response
+HTTP_TIMEOUT = 30
+
+# Files per yielded scan batch
+SCAN_BATCH_SIZE = 1000
+
+# File size that fills a default HDFS block; files at or above it score 1.0 for efficiency
+_BLOCK_BYTES = 128 * 1024 * 1024
+
+# Seconds a JMX response is reused; NameNode metrics refresh about once a second anyway
+JMX_CACHE_TTL = 5.0
+
+_CLUSTER_JMX_QUERIES = (
+    "Hadoop:service=NameNode,name=FSNamesystem",
+    "Hadoop:service=NameNode,name=RpcActivity"
+)
+
+def _loads(content: bytes) -> Any:
+    """Decode a JSON body, with orjson's C parser when installed"""
+    if orjson:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _json(response: requests.Response) -> Any:
+    """Decode a JSON response body"""
+    return _loads(response.content)
 
 @dataclass
 class HDFSConfig:
@@ -23,37 +65,73 @@ class HDFSClient:
         self.config = config
         self.logger = logging.getLogger(__name__)
         
+        # Shared by the hdfs client and the raw WebHDFS and JMX calls below, so every request
+        # reuses pooled keep-alive connections (and, with Kerberos, the same authentication)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=HTTP_CONNECT_RETRIES, read=False, backoff_factor=0.3)
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self.session = session
+        
         # Initialize HDFS client
         if config.auth_type == "kerberos" and KerberosClient:
-            self.client = KerberosClient(f"http://{config.host}:{config.namenode_web_port}")
+            self.client = KerberosClient(f"http://{config.host}:{config.namenode_web_port}", session=session)
         else:
             self.client = InsecureClient(
                 f"http://{config.host}:{config.namenode_web_port}",
-                user=config.user
+                user=config.user,
+                session=session
             )
         
-        # Initialize JMX client
+        self.webhdfs_base_url = f"http://{config.host}:{config.namenode_web_port}/webhdfs/v1"
+        self._user_params = {"user.name": config.user}
+        
+        # Initialize JMX client; bursts of metric reads within the TTL share one request
         self.jmx_base_url = f"http://{config.host}:{config.namenode_web_port}/jmx"
+        self._jmx_cache = TTLCache(maxsize=32, ttl=JMX_CACHE_TTL)
+        self._jmx_cache_lock = threading.Lock()
+    
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
     
     def get_jmx_metrics(self, query: Optional[str] = None) -> Dict[str, Any]:
-        """Retrieve JMX metrics from NameNode"""
+        """Retrieve JMX metrics from NameNode, reusing a response younger than JMX_CACHE_TTL"""
+        key = query or ""
+        # The raw body is cached and decoded per call, so callers never share (and can
+        # freely modify) the returned dicts
+        with self._jmx_cache_lock:
+            content = self._jmx_cache.get(key)
+        if content is not None:
+            return _loads(content)
+        
         try:
             url = self.jmx_base_url
             if query:
                 url += f"?qry={query}"
             
-            response = requests.get(url, timeout=30)
+            response = self.session.get(url, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
-            return response.json()
+            content = response.content
+            metrics = _loads(content)
         except Exception as e:
+            # Failures are not cached, so the next read retries
             self.logger.error(f"Failed to retrieve JMX metrics: {e}")
             raise
+        
+        with self._jmx_cache_lock:
+            self._jmx_cache[key] = content
+        return metrics
     
     def get_cluster_metrics(self) -> Dict[str, Any]:
         """Get comprehensive cluster metrics"""
         try:
-            fs_metrics = self.get_jmx_metrics("Hadoop:service=NameNode,name=FSNamesystem")
-            rpc_metrics = self.get_jmx_metrics("Hadoop:service=NameNode,name=RpcActivity")
+            # The two JMX queries are independent round trips; overlap them
+            with ThreadPoolExecutor(max_workers=len(_CLUSTER_JMX_QUERIES)) as executor:
+                fs_metrics, rpc_metrics = executor.map(self.get_jmx_metrics, _CLUSTER_JMX_QUERIES)
             
             # Extract key metrics
             fs_bean = fs_metrics.get("beans", [{}])[0] if fs_metrics.get("beans") else {}
@@ -88,48 +166,63 @@ class HDFSClient:
     def analyze_file_metadata(self, path: str) -> Dict[str, Any]:
         """Analyze file metadata for cost optimization"""
         try:
-            status = self.client.status(path)
-            
-            # Get detailed file information
-            file_info = {
-                "path": path,
-                "size": status.get("length", 0),
-                "replication": status.get("replication", 1),
-                "block_size": status.get("blockSize", 0),
-                "access_time": status.get("accessTime", 0),
-                "modification_time": status.get("modificationTime", 0),
-                "owner": status.get("owner", ""),
-                "group": status.get("group", ""),
-                "permission": status.get("permission", "")
-            }
-            
-            # Calculate metadata efficiency
-            if file_info["size"] > 0:
-                file_info["efficiency_score"] = min(file_info["size"] / (128 * 1024 * 1024), 1.0)
-            else:
-                file_info["efficiency_score"] = 0.0
-            
-            return file_info
+            return self._file_info(path, self.client.status(path))
         except Exception as e:
             self.logger.error(f"Failed to analyze metadata for {path}: {e}")
             return {}
     
+    def _file_info(self, path: str, status: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a file's metadata dict from its WebHDFS FileStatus"""
+        # Get detailed file information
+        file_info = {
+            "path": path,
+            "size": status.get("length", 0),
+            "replication": status.get("replication", 1),
+            "block_size": status.get("blockSize", 0),
+            "access_time": status.get("accessTime", 0),
+            "modification_time": status.get("modificationTime", 0),
+            "owner": status.get("owner", ""),
+            "group": status.get("group", ""),
+            "permission": status.get("permission", "")
+        }
+        
+        # Calculate metadata efficiency
+        size = file_info["size"]
+        file_info["efficiency_score"] = min(size / _BLOCK_BYTES, 1.0) if size > 0 else 0.0
+        
+        return file_info
+    
     def scan_directory_batch(self, path: str, max_depth: int = 3) -> Iterator[List[Dict[str, Any]]]:
         """Scan directory structure in batches for efficiency"""
         results = []
         try:
-            # Use client.walk to traverse directory structure
-            for root, dirs, files in self.client.walk(path, depth=max_depth):
-                for file in files:
-                    file_path = f"{root.rstrip('/')}/{file}"
-                    file_info = self.analyze_file_metadata(file_path)
-                    if file_info:
-                        results.append(file_info)
+            # Directory listings already carry every file's status, so each page of up to
+            # ~1000 entries is one round trip instead of one per file. Directories are walked
+            # depth first like client.walk; max_depth 1 lists only the path itself, 0 is unlimited
+            build_file_info = self._file_info
+            pending = [(path, max_depth)]
+            while pending:
+                directory, depth = pending.pop()
+                prefix = directory.rstrip("/")
+                subdirectories = []
+                
+                for statuses in self._list_status_batches(directory):
+                    for status in statuses:
+                        suffix = status.get("pathSuffix", "")
+                        if status.get("type") == "DIRECTORY":
+                            if depth != 1:
+                                subdirectories.append((f"{prefix}/{suffix}", depth - 1))
+                            continue
+                        
+                        # An empty suffix means the listed path is itself a file
+                        results.append(build_file_info(f"{prefix}/{suffix}" if suffix else directory, status))
                         
                         # Process in batches to manage memory
-                        if len(results) >= 1000:
+                        if len(results) >= SCAN_BATCH_SIZE:
                             yield results
                             results = []
+                
+                pending.extend(reversed(subdirectories))
             
             if results:
                 yield results
@@ -137,20 +230,34 @@ class HDFSClient:
             self.logger.error(f"Failed to scan directory {path}: {e}")
             raise
     
+    def _list_status_batches(self, directory: str) -> Iterator[List[Dict[str, Any]]]:
+        """Yield a directory's FileStatus entries one WebHDFS LISTSTATUS_BATCH page at a time"""
+        url = f"{self.webhdfs_base_url}{directory}"
+        params = {"op": "LISTSTATUS_BATCH", **self._user_params}
+        
+        while True:
+            response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            
+            listing = _json(response)["DirectoryListing"]
+            statuses = listing["partialListing"]["FileStatuses"]["FileStatus"]
+            yield statuses
+            
+            if not listing.get("remainingEntries") or not statuses:
+                return
+            params["startAfter"] = statuses[-1]["pathSuffix"]
+    
     def get_file_blocks(self, path: str) -> List[Dict[str, Any]]:
         """Get block information for a file"""
         try:
             # Use the WebHDFS API to get file status with block information
-            url = f"http://{self.config.host}:{self.config.namenode_web_port}/webhdfs/v1{path}"
-            params = {
-                "op": "GET_BLOCK_LOCATIONS",
-                "user.name": self.config.user
-            }
+            url = f"{self.webhdfs_base_url}{path}"
+            params = {"op": "GET_BLOCK_LOCATIONS", **self._user_params}
             
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
             if "LocatedBlocks" in data:
                 return data["LocatedBlocks"].get("locatedBlocks", [])
             return []
@@ -158,6 +265,15 @@ class HDFSClient:
             self.logger.error(f"Failed to get block information for {path}: {e}")
             return []
     
+    def get_file_checksum(self, path: str) -> Optional[str]:
+        """Get the content checksum of a file (WebHDFS GETFILECHECKSUM)"""
+        try:
+            checksum = self.client.checksum(path)
+            return f"{checksum.get('algorithm', '')}:{checksum.get('bytes', '')}"
+        except Exception as e:
+            self.logger.error(f"Failed to get checksum for {path}: {e}")
+            return None
+    
     def get_directory_size(self, path: str) -> Dict[str, Any]:
         """Get directory size and file count"""
         try:
@@ -191,16 +307,13 @@ class HDFSClient:
     def get_storage_policy(self, path: str) -> str:
         """Get storage policy for a path"""
         try:
-            url = f"http://{self.config.host}:{self.config.namenode_web_port}/webhdfs/v1{path}"
-            params = {
-                "op": "GETSTORAGEPOLICY",
-                "user.name": self.config.user
-            }
+            url = f"{self.webhdfs_base_url}{path}"
+            params = {"op": "GETSTORAGEPOLICY", **self._user_params}
             
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
             return data.get("BlockStoragePolicy", {}).get("name", "HOT")
         except Exception as e:
             self.logger.error(f"Failed to get storage policy for {path}: {e}")
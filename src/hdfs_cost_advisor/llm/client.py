@@ -1,10 +1,24 @@
 import aiohttp
 import asyncio
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from enum import Enum
 import logging
 
+# Keep-alive connections held by the shared session, in total and per provider host
+HTTP_CONNECTION_LIMIT = 1000
+HTTP_CONNECTIONS_PER_HOST = 200
+
+# Seconds a resolved provider address and an idle connection are kept
+DNS_CACHE_TTL = 600
+KEEPALIVE_TIMEOUT = 60
+
+# Seconds a whole LLM request may take, including the model's generation time
+REQUEST_TIMEOUT = 180
+
+# LLM requests in flight at once when analyzing several scans; kept under provider rate limits
+MAX_CONCURRENT_ANALYSES = 50
+
 class LLMProvider(Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
@@ -21,6 +35,52 @@ class LLMClient:
             LLMProvider.ANTHROPIC: "https://api.anthropic.com/v1",
             LLMProvider.GOOGLE: "https://generativelanguage.googleapis.com/v1"
         }
+        
+        # Created on first use inside the event loop and reused by every request, so repeated
+        # analyses share keep-alive TLS connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def __aenter__(self) -> "LLMClient":
+        """Open the shared session for the running event loop"""
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the shared session"""
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, opening one for the running event loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed:
+            if self._session_loop is loop:
+                return self._session
+            # The pooled connections belong to the loop that opened them and can only be
+            # closed from it. Once that loop has finished (e.g. one asyncio.run per request)
+            # they are unusable, so the session is dropped; while it runs, it is not replaced
+            if self._session_loop is not None and not self._session_loop.is_closed():
+                raise RuntimeError("LLMClient session is bound to another event loop; close() it there first")
+            self.logger.debug("Discarding the LLM session of a closed event loop")
+        
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            connector=aiohttp.TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                limit_per_host=HTTP_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+        )
+        self._session_loop = loop
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
     
     async def analyze_hdfs_cost_optimization(self, scan_results: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze HDFS scan results for cost optimization opportunities"""
@@ -28,19 +88,33 @@ class LLMClient:
         prompt = self._generate_cost_analysis_prompt(scan_results)
         
         try:
-            async with aiohttp.ClientSession() as session:
-                response = await self._make_llm_request(session, prompt)
-                
-                # Parse LLM response
-                analysis = self._parse_cost_analysis(response)
-                
-                return analysis
-                
+            response = await self._make_llm_request(prompt)
+            
+            # Parse LLM response
+            analysis = self._parse_cost_analysis(response)
+            
+            return analysis
+            
         except Exception as e:
             self.logger.error(f"LLM analysis failed: {e}")
             # Return fallback analysis
             return self._generate_fallback_analysis(scan_results)
     
+    async def analyze_many(self, scan_results_list: List[Dict[str, Any]],
+                           max_concurrency: int = MAX_CONCURRENT_ANALYSES) -> List[Any]:
+        """Analyze several scans with their LLM requests in flight together, in input order; an analysis that raised comes back as its exception"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze(scan_results: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_hdfs_cost_optimization(scan_results)
+        
+        # Each analysis already falls back on a bad response; anything that still escapes
+        # (cancellation, a failing fallback) is returned in place so the other scans complete
+        return await asyncio.gather(
+            *(analyze(scan_results) for scan_results in scan_results_list), return_exceptions=True
+        )
+    
     def _generate_cost_analysis_prompt(self, scan_results: Dict[str, Any]) -> str:
         """Generate comprehensive cost analysis prompt"""
         total_files = scan_results.get('total_files', 0)
@@ -111,18 +185,18 @@ Provide analysis in the following JSON format:
 Focus on practical, actionable recommendations with quantified cost savings.
 """
     
-    async def _make_llm_request(self, session: aiohttp.ClientSession, prompt: str) -> str:
+    async def _make_llm_request(self, prompt: str) -> str:
         """Make API request to LLM provider"""
         if self.provider == LLMProvider.OPENAI:
-            return await self._openai_request(session, prompt)
+            return await self._openai_request(prompt)
         elif self.provider == LLMProvider.ANTHROPIC:
-            return await self._anthropic_request(session, prompt)
+            return await self._anthropic_request(prompt)
         elif self.provider == LLMProvider.GOOGLE:
-            return await self._google_request(session, prompt)
+            return await self._google_request(prompt)
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
     
-    async def _openai_request(self, session: aiohttp.ClientSession, prompt: str) -> str:
+    async def _openai_request(self, prompt: str) -> str:
         """Make request to OpenAI API"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -136,7 +210,7 @@ Focus on practical, actionable recommendations with quantified cost savings.
             "temperature": 0.3
         }
         
-        async with session.post(
+        async with self._get_session().post(
             f"{self.base_urls[LLMProvider.OPENAI]}/chat/completions",
             headers=headers,
             json=data
@@ -147,7 +221,7 @@ Focus on practical, actionable recommendations with quantified cost savings.
             result = await response.json()
             return result["choices"][0]["message"]["content"]
     
-    async def _anthropic_request(self, session: aiohttp.ClientSession, prompt: str) -> str:
+    async def _anthropic_request(self, prompt: str) -> str:
         """Make request to Anthropic API"""
         headers = {
             "x-api-key": self.api_key,
@@ -161,7 +235,7 @@ Focus on practical, actionable recommendations with quantified cost savings.
             "max_tokens": 3000
         }
         
-        async with session.post(
+        async with self._get_session().post(
             f"{self.base_urls[LLMProvider.ANTHROPIC]}/messages",
             headers=headers,
             json=data
@@ -172,7 +246,7 @@ Focus on practical, actionable recommendations with quantified cost savings.
             result = await response.json()
             return result["content"][0]["text"]
     
-    async def _google_request(self, session: aiohttp.ClientSession, prompt: str) -> str:
+    async def _google_request(self, prompt: str) -> str:
         """Make request to Google Gemini API"""
         headers = {
             "Content-Type": "application/json"
@@ -186,7 +260,7 @@ Focus on practical, actionable recommendations with quantified cost savings.
             }
         }
         
-        async with session.post(
+        async with self._get_session().post(
             f"{self.base_urls[LLMProvider.GOOGLE]}/models/gemini-pro:generateContent?key={self.api_key}",
             headers=headers,
             json=data
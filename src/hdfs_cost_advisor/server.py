@@ -1,4 +1,3 @@
-import json
 import logging
 import asyncio
 import uuid
@@ -26,11 +25,22 @@ class MCPServer:
             from .cost.calculator import CostCalculator
             self.cost_calculator = CostCalculator(self.settings.cost.storage_costs)
             
+            # HDFS walks are cached on disk only when a cache directory is configured
+            from .utils.storage import ScanCache
+            self.scan_cache = None
+            if self.settings.scan_cache_dir:
+                self.scan_cache = ScanCache(self.settings.scan_cache_dir, self.settings.scan_cache_max_age_seconds)
+            
             self.logger.info("MCP Server initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize MCP server: {e}")
             raise
 
+    async def close(self) -> None:
+        """Release the pooled LLM and HDFS connections"""
+        await self.llm_client.close()
+        self.hdfs_client.close()
+
     def get_tools(self) -> List[Dict[str, Any]]:
         """Return list of available tools"""
         return [
@@ -49,6 +59,11 @@ class MCPServer:
                             "type": "integer",
                             "default": 3,
                             "description": "Maximum depth for directory traversal"
+                        },
+                        "use_cache": {
+                            "type": "boolean",
+                            "default": True,
+                            "description": "Reuse recent cached walks when a scan cache is configured; false lists HDFS again and refreshes the cache"
                         }
                     },
                     "required": ["paths"]
@@ -68,6 +83,21 @@ class MCPServer:
                     "required": ["scan_id"]
                 }
             },
+            {
+                "name": "optimize_costs_batch",
+                "description": "Analyze several completed scans concurrently and generate recommendations for each",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "scan_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "IDs of the completed scans to analyze"
+                        }
+                    },
+                    "required": ["scan_ids"]
+                }
+            },
             {
                 "name": "generate_script",
                 "description": "Generate executable bash/HDFS CLI scripts for cost optimization",
@@ -114,6 +144,8 @@ class MCPServer:
                 return await self.scan_hdfs(**arguments)
             elif name == "optimize_costs":
                 return await self.optimize_costs(**arguments)
+            elif name == "optimize_costs_batch":
+                return await self.optimize_costs_batch(**arguments)
             elif name == "generate_script":
                 return await self.generate_script(**arguments)
             elif name == "get_summary":
@@ -126,14 +158,14 @@ class MCPServer:
             self.logger.error(f"Tool {name} failed: {e}")
             return {"error": str(e), "status": "failed"}
 
-    async def scan_hdfs(self, paths: List[str], scan_depth: int = 3) -> Dict[str, Any]:
+    async def scan_hdfs(self, paths: List[str], scan_depth: int = 3, use_cache: bool = True) -> Dict[str, Any]:
         """Scan HDFS paths for cost optimization opportunities"""
         try:
             from .endpoints import scan
             scan_id = str(uuid.uuid4())
             self.logger.info(f"Starting HDFS scan {scan_id} for paths: {paths}")
             
-            result = scan.execute_scan(self.hdfs_client, paths, scan_depth)
+            result = await scan.execute_scan_async(self.hdfs_client, paths, scan_depth, self.scan_cache, use_cache)
             result["scan_id"] = scan_id
             
             self.logger.info(f"Scan {scan_id} completed successfully")
@@ -168,6 +200,35 @@ class MCPServer:
                 "scan_id": scan_id
             }
 
+    async def optimize_costs_batch(self, scan_ids: List[str]) -> Dict[str, Any]:
+        """Analyze several scans concurrently, overlapping their LLM round trips"""
+        from .endpoints import optimize
+        # Repeated IDs are analyzed once
+        scan_ids = list(dict.fromkeys(scan_ids))
+        self.logger.info(f"Starting cost optimization analysis for scans {scan_ids}")
+        
+        outcomes = await optimize.generate_recommendations_batch(
+            scan_ids, self.hdfs_client, self.llm_client, self.cost_calculator
+        )
+        
+        # A failed scan is reported like a failed optimize_costs call
+        results = []
+        for scan_id, outcome in zip(scan_ids, outcomes):
+            if isinstance(outcome, BaseException):
+                self.logger.error(f"Cost optimization failed for scan {scan_id}: {outcome}")
+                outcome = {
+                    "error": str(outcome),
+                    "status": "failed",
+                    "scan_id": scan_id
+                }
+            results.append(outcome)
+        completed = sum(1 for result in results if result.get("status") == "completed")
+        return {
+            "results": results,
+            "completed": completed,
+            "failed": len(results) - completed
+        }
+
     async def generate_script(self, optimization_id: str) -> str:
         """Generate executable bash/HDFS CLI scripts for cost optimization"""
         try:
@@ -189,7 +250,8 @@ class MCPServer:
             from .endpoints import summary
             self.logger.info(f"Generating summary for scan {scan_id}")
             
-            result = summary.generate_summary(scan_id, self.cost_calculator)
+            # Cost calculations are CPU-bound; keep them off the event loop
+            result = await asyncio.to_thread(summary.generate_summary, scan_id, self.cost_calculator)
             
             self.logger.info(f"Summary generated successfully for scan {scan_id}")
             return result
@@ -231,10 +293,12 @@ server = MCPServer()
 # Simple command-line interface for testing
 async def test_cli():
     """Simple CLI for testing the server"""
+    from .utils.storage import format_json
+    
     print("HDFS Cost Advisor MCP Server - Test CLI")
     print("Available commands:")
     print("1. scan [paths...] - Scan HDFS paths")
-    print("2. optimize [scan_id] - Optimize costs")
+    print("2. optimize [scan_ids...] - Optimize costs")
     print("3. script [opt_id] - Generate script")
     print("4. summary [scan_id] - Get summary")
     print("5. health - Get cluster health")
@@ -251,25 +315,31 @@ async def test_cli():
             elif command[0] == "scan":
                 paths = command[1:] if len(command) > 1 else ["/"]
                 result = await server.scan_hdfs(paths)
-                print(json.dumps(result, indent=2))
+                print(format_json(result))
+            elif command[0] == "optimize" and len(command) > 2:
+                result = await server.optimize_costs_batch(command[1:])
+                print(format_json(result))
             elif command[0] == "optimize" and len(command) > 1:
                 result = await server.optimize_costs(command[1])
-                print(json.dumps(result, indent=2))
+                print(format_json(result))
             elif command[0] == "script" and len(command) > 1:
                 result = await server.generate_script(command[1])
                 print(result)
             elif command[0] == "summary" and len(command) > 1:
                 result = await server.get_summary(command[1])
-                print(json.dumps(result, indent=2))
+                print(format_json(result))
             elif command[0] == "health":
                 result = await server.get_cluster_health()
-                print(json.dumps(result, indent=2))
+                print(format_json(result))
             else:
                 print("Invalid command. Type 'quit' to exit.")
         except KeyboardInterrupt:
             break
         except Exception as e:
             print(f"Error: {e}")
+    
+    # Connections stay pooled across commands; release them on exit
+    await server.close()
 
 if __name__ == "__main__":
     import asyncio
@@ -43,6 +43,10 @@ class Settings(BaseSettings):
     metadata_cost_per_file: float = 0.0001
     network_cost_per_gb: float = 0.01
     
+    # Scan cache configuration (optional); walks are only cached on disk when a directory is set
+    scan_cache_dir: Optional[str] = None
+    scan_cache_max_age_seconds: float = 3600
+    
     # Redis configuration (optional)
     redis_url: Optional[str] = None
     redis_enabled: bool = False
@@ -71,6 +75,8 @@ class Settings(BaseSettings):
             "llm_model_name": {"env": ["LLM_MODEL_NAME", "llm_model_name"]},
             "llm_max_tokens": {"env": ["LLM_MAX_TOKENS", "llm_max_tokens"]},
             "llm_temperature": {"env": ["LLM_TEMPERATURE", "llm_temperature"]},
+            "scan_cache_dir": {"env": ["SCAN_CACHE_DIR", "scan_cache_dir"]},
+            "scan_cache_max_age_seconds": {"env": ["SCAN_CACHE_MAX_AGE_SECONDS", "scan_cache_max_age_seconds"]},
             "redis_url": {"env": ["REDIS_URL", "redis_url"]},
             "redis_enabled": {"env": ["REDIS_ENABLED", "redis_enabled"]},
             "enable_auth": {"env": ["ENABLE_AUTH", "enable_auth"]},
@@ -101,6 +107,9 @@ class Settings(BaseSettings):
         if self.hdfs_namenode_web_port < 1 or self.hdfs_namenode_web_port > 65535:
             raise ValueError("HDFS namenode web port must be between 1 and 65535")
         
+        if self.scan_cache_max_age_seconds < 0:
+            raise ValueError("Scan cache max age must not be negative")
+        
         if self.enable_auth and not self.auth_secret_key:
             raise ValueError("Auth secret key is required when authentication is enabled")
     
@@ -174,6 +183,10 @@ class Settings(BaseSettings):
                 "metadata_cost_per_file": self.metadata_cost_per_file,
                 "network_cost_per_gb": self.network_cost_per_gb
             },
+            "scan_cache": {
+                "dir": self.scan_cache_dir,
+                "max_age_seconds": self.scan_cache_max_age_seconds
+            },
             "redis": {
                 "enabled": self.redis_enabled,
                 "url": self.redis_url
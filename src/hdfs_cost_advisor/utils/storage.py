@@ -0,0 +1,373 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import weakref
+import zipfile
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from cachetools import TTLCache
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+def _json_default(value: Any) -> Any:
+    """Encode values neither JSON encoder handles natively"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a stored result to compact JSON bytes"""
+    if orjson:
+        return orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS)
+    return json.dumps(value, separators=(",", ":"), default=_json_default).encode()
+
+def format_json(value: Any) -> str:
+    """Render a result as indented JSON text for display"""
+    if orjson:
+        return orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2).decode()
+    return json.dumps(value, indent=2, default=_json_default)
+
+def _loads(data: bytes) -> Any:
+    """Deserialize stored JSON bytes"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class JsonTTLCache(TTLCache):
+    """TTL cache that keeps values as serialized JSON bytes instead of live object graphs"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+    
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, _dumps(value))
+    
+    def __getitem__(self, key: Any) -> Any:
+        return _loads(super().__getitem__(key))
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        # One lookup; the inherited get() checks membership and then indexes again
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+# Scan-resistant replacement (2Q): new entries wait in a FIFO probation queue and only
+# entries read again after leaving it enter the LRU main queue, so one large scan cannot
+# flush the results that interactive summaries keep querying
+class ScanResultsStore:
+    """Byte-bounded 2Q store of serialized results that spills evicted entries to disk"""
+    
+    def __init__(self, max_bytes: int = 2 * 1024 ** 3, ttl: float = 3600,
+                 spill_dir: Optional[str] = None, probation_ratio: float = 0.25):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.probation_bytes = int(max_bytes * probation_ratio)
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="hdfs_scan_results_")
+        if spill_dir is None:
+            # Spilled entries only live as long as the store that indexes them
+            weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        
+        self._probation: "OrderedDict[Any, bytes]" = OrderedDict()
+        self._main: "OrderedDict[Any, bytes]" = OrderedDict()
+        self._probation_size = 0
+        self._main_size = 0
+        self._spilled: Dict[Any, str] = {}
+        self._stored_at: Dict[Any, float] = {}
+    
+    def put(self, key: Any, value: Any) -> None:
+        """Store a result, costed by its serialized size"""
+        self._purge_expired()
+        data = _dumps(value)
+        hot = key in self._main
+        self._discard(key)
+        
+        self._stored_at[key] = time.monotonic()
+        if hot:
+            self._main[key] = data
+            self._main_size += len(data)
+        else:
+            self._probation[key] = data
+            self._probation_size += len(data)
+        self._evict()
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return a stored result, re-hydrating it from disk if it was spilled"""
+        if self._expired(key):
+            self._discard(key)
+            return default
+        
+        data = self._main.get(key)
+        if data is not None:
+            self._main.move_to_end(key)
+            return _loads(data)
+        data = self._probation.get(key)
+        if data is not None:
+            return _loads(data)
+        spill_file = self._spilled.pop(key, None)
+        if spill_file is None:
+            return default
+        
+        data = self._read_spilled(spill_file)
+        if data is None:
+            self._stored_at.pop(key, None)
+            return default
+        
+        # Read again after eviction, so the result is hot
+        self._main[key] = data
+        self._main_size += len(data)
+        self._evict()
+        return _loads(data)
+    
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Remove a stored result and return it"""
+        expired = self._expired(key)
+        data = self._discard(key)
+        if data is None or expired:
+            return default
+        return _loads(data)
+    
+    def keys(self) -> List[Any]:
+        """Keys of all unexpired results, without reading any of them"""
+        self._purge_expired()
+        return list(self._stored_at)
+    
+    def items(self) -> List[Tuple[Any, Any]]:
+        """All unexpired results, reading spilled ones without promoting them"""
+        self._purge_expired()
+        items = [(key, _loads(data)) for key, data in self._probation.items()]
+        items.extend((key, _loads(data)) for key, data in self._main.items())
+        for key, spill_file in list(self._spilled.items()):
+            data = self._read_spilled(spill_file, remove=False)
+            if data is not None:
+                items.append((key, _loads(data)))
+        return items
+    
+    def _expired(self, key: Any) -> bool:
+        stored_at = self._stored_at.get(key)
+        return stored_at is not None and time.monotonic() - stored_at > self.ttl
+    
+    def _purge_expired(self) -> None:
+        for key in [key for key in self._stored_at if self._expired(key)]:
+            self._discard(key)
+    
+    def _discard(self, key: Any) -> Optional[bytes]:
+        self._stored_at.pop(key, None)
+        data = self._probation.pop(key, None)
+        if data is not None:
+            self._probation_size -= len(data)
+            return data
+        data = self._main.pop(key, None)
+        if data is not None:
+            self._main_size -= len(data)
+            return data
+        spill_file = self._spilled.pop(key, None)
+        return self._read_spilled(spill_file) if spill_file is not None else None
+    
+    def _evict(self) -> None:
+        # Probation overflow leaves first, then the least recently used main entries
+        while self._probation_size > self.probation_bytes:
+            self._spill_oldest(self._probation)
+        while self._probation_size + self._main_size > self.max_bytes:
+            self._spill_oldest(self._main if self._main else self._probation)
+    
+    def _spill_oldest(self, queue: "OrderedDict[Any, bytes]") -> None:
+        key, data = queue.popitem(last=False)
+        if queue is self._probation:
+            self._probation_size -= len(data)
+        else:
+            self._main_size -= len(data)
+        
+        spill_file = os.path.join(self.spill_dir, hashlib.sha1(str(key).encode()).hexdigest() + ".json")
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(spill_file, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning(f"Failed to spill stored result {key}, dropping it: {e}")
+            self._stored_at.pop(key, None)
+            return
+        self._spilled[key] = spill_file
+    
+    def _read_spilled(self, spill_file: str, remove: bool = True) -> Optional[bytes]:
+        try:
+            with open(spill_file, "rb") as f:
+                data = f.read()
+            if remove:
+                os.unlink(spill_file)
+        except OSError as e:
+            logger.warning(f"Failed to read spilled result {spill_file}: {e}")
+            return None
+        return data
+
+# Listing columns of each stored scan; the full results stay in the results store
+_SCAN_INDEX_COLUMNS = (
+    "scan_id", "status", "scan_started", "scan_completed", "total_files", "total_size_gb", "scanned_paths"
+)
+
+class ScanIndex:
+    """SQLite table of per-scan metadata, so listings never decode stored results"""
+    
+    def __init__(self, database: str = ":memory:"):
+        # Callers serialize access; the connection is shared by worker threads
+        self._conn = sqlite3.connect(database, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans (scan_id TEXT PRIMARY KEY, status TEXT, scan_started TEXT, "
+            "scan_completed TEXT, total_files INTEGER, total_size_gb REAL, scanned_paths TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scans_by_start ON scans (scan_started)")
+    
+    def put(self, scan_id: str, results: Dict[str, Any]) -> None:
+        """Record or replace the listing row of a scan"""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    scan_id,
+                    results.get("status", "unknown"),
+                    results.get("scan_started"),
+                    results.get("scan_completed"),
+                    results.get("total_files", 0),
+                    results.get("total_size_gb", 0),
+                    _dumps(results.get("scanned_paths", [])).decode()
+                )
+            )
+    
+    def delete(self, scan_ids: List[str]) -> None:
+        """Drop the listing rows of scans"""
+        with self._conn:
+            self._conn.executemany("DELETE FROM scans WHERE scan_id = ?", [(scan_id,) for scan_id in scan_ids])
+    
+    def retain(self, scan_ids: List[str]) -> None:
+        """Drop every listing row whose scan is not in scan_ids"""
+        live = set(scan_ids)
+        indexed = [row[0] for row in self._conn.execute("SELECT scan_id FROM scans")]
+        self.delete([scan_id for scan_id in indexed if scan_id not in live])
+    
+    def list(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Listing rows, most recently started first"""
+        rows = self._conn.execute(
+            f"SELECT {', '.join(_SCAN_INDEX_COLUMNS)} FROM scans ORDER BY scan_started DESC LIMIT ?",
+            (-1 if limit is None else limit,)
+        )
+        scans = []
+        for row in rows:
+            scan = dict(zip(_SCAN_INDEX_COLUMNS, row))
+            scan["scanned_paths"] = _loads(scan["scanned_paths"])
+            scans.append(scan)
+        return scans
+
+def _normalize_path(path: str) -> str:
+    """Strip trailing slashes so equivalent HDFS paths share a cache key"""
+    return path.rstrip("/") or "/"
+
+def _path_levels(path: str, root: str) -> int:
+    """Number of path segments below root (a file directly inside root is level 1)"""
+    relative = path[len(root):].strip("/")
+    return relative.count("/") + 1 if relative else 0
+
+def _path_ancestors(path: str) -> List[str]:
+    """The path itself followed by each of its parent directories up to /"""
+    ancestors = [path]
+    while path != "/":
+        path = path.rpartition("/")[0] or "/"
+        ancestors.append(path)
+    return ancestors
+
+def _depth_covers(depth: int, other: int) -> bool:
+    """Whether a walk to depth reaches everything a walk to other does (0 is unlimited)"""
+    return depth == 0 or (other != 0 and depth >= other)
+
+# A cached scan of a directory also serves later scans of it or of any subdirectory
+# within its depth, so overlapping scans skip the HDFS walk. Entries are .npz archives
+# holding the records array plus a small JSON header, one file per (cluster, path)
+class ScanCache:
+    """On-disk cache of scanned file metadata records keyed by cluster, path and depth"""
+    
+    def __init__(self, cache_dir: str, max_age_seconds: float = 3600):
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_seconds
+    
+    def _entry_file(self, cluster: str, path: str) -> str:
+        key = f"{cluster}\0{path}".encode()
+        return os.path.join(self.cache_dir, hashlib.sha1(key).hexdigest() + ".npz")
+    
+    def _load(self, cluster: str, path: str) -> Optional[Dict[str, Any]]:
+        # Entries hold the records as a binary structured array, so loading is a copy of
+        # the columns rather than a parse of every row
+        entry_file = self._entry_file(cluster, path)
+        try:
+            if time.time() - os.path.getmtime(entry_file) > self.max_age_seconds:
+                return None
+            with np.load(entry_file, allow_pickle=False) as data:
+                entry = _loads(data["meta"].tobytes())
+                if entry.get("cluster") != cluster or entry.get("path") != path:
+                    return None
+                entry["records"] = data["records"]
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        return entry
+    
+    def get(self, path: str, depth: int, cluster: str = "") -> Optional[np.ndarray]:
+        """Return cached file records of cluster covering (path, depth), or None on a miss"""
+        path = _normalize_path(path)
+        for ancestor in _path_ancestors(path):
+            entry = self._load(cluster, ancestor)
+            if entry is None:
+                continue
+            
+            # The cached walk must reach as deep below the ancestor as this scan would
+            cached_depth = entry["depth"]
+            needed_depth = _path_levels(path, ancestor) + depth if depth else 0
+            if not _depth_covers(cached_depth, needed_depth):
+                continue
+            
+            records = entry["records"]
+            if ancestor == path and depth == cached_depth:
+                return records
+            
+            prefix = path.rstrip("/") + "/"
+            paths = records["path"]
+            mask = np.char.startswith(paths, prefix)
+            if depth:
+                mask &= np.char.count(paths, "/") - prefix.count("/") + 1 <= depth
+            return records[mask]
+        return None
+    
+    def put(self, path: str, depth: int, records: np.ndarray, cluster: str = "", replace: bool = False) -> None:
+        """Store the file records from a scan of (path, depth) on cluster; replace overwrites a deeper entry"""
+        path = _normalize_path(path)
+        existing = None if replace else self._load(cluster, path)
+        if existing is not None and not _depth_covers(depth, existing["depth"]):
+            # Keep the deeper cached scan; it already covers this one
+            return
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file and rename so readers never see a partial entry
+            fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    meta = _dumps({"cluster": cluster, "path": path, "depth": depth})
+                    np.savez_compressed(f, meta=np.frombuffer(meta, dtype=np.uint8), records=records)
+                os.replace(tmp_file, self._entry_file(cluster, path))
+            except BaseException:
+                os.unlink(tmp_file)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to cache scan of {path}: {e}")
@@ -0,0 +1,173 @@
+import pytest
+import json
+import dataclasses
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from hdfs_cost_advisor.cost.calculator import CostCalculator, StorageCosts
+
+class TestCostCalculator:
+    
+    @pytest.fixture
+    def calculator(self):
+        """Create calculator with default storage costs"""
+        return CostCalculator(StorageCosts())
+    
+    @pytest.fixture
+    def optimizations(self):
+        """One optimization per supported category"""
+        return [
+            {"category": "cold_data"},
+            {"category": "small_files"},
+            {"category": "replication"},
+            {"category": "cleanup"},
+            {"category": "compression"}
+        ]
+    
+    def test_to_soa(self, calculator, sample_scan_results):
+        """Test conversion of per-file lists into columnar arrays"""
+        sample_scan_results["efficiency_analysis"]["inefficient_replication"] = [
+            {"size": 1024 ** 3, "current_replication": 5, "suggested_replication": 3},
+            {"size": 2 * 1024 ** 3}
+        ]
+        
+        arrays = calculator._to_soa(sample_scan_results)
+        
+        assert arrays.cold_sizes.tolist() == [1024 * 1024]
+        assert arrays.small_sizes.tolist() == [1024]
+        assert arrays.repl_sizes.tolist() == [1024 ** 3, 2 * 1024 ** 3]
+        assert calculator._sum_sizes_gb(arrays.repl_sizes) == pytest.approx(3.0)
+        assert calculator._sum_sizes_gb(calculator._to_soa({}).cold_sizes) == 0.0
+        assert calculator._to_soa({}).repl_sizes.dtype == np.float32
+    
+    def test_calculate_optimization_savings(self, calculator, sample_scan_results, optimizations):
+        """Test per-category savings calculation"""
+        savings = calculator.calculate_optimization_savings(sample_scan_results, optimizations)
+        
+        assert [s.category for s in savings] == [
+            "cold_data", "small_files", "replication", "cleanup", "compression"
+        ]
+        
+        cold = savings[0]
+        cold_gb = 1024 * 1024 / (1024 ** 3)
+        assert cold.affected_data_gb == pytest.approx(cold_gb)
+        assert cold.current_cost == pytest.approx(cold_gb * 0.04 * 3)
+        assert cold.optimized_cost == pytest.approx(cold_gb * 0.01 * 1.5)
+        assert cold.annual_savings == pytest.approx(cold.savings * 12)
+        
+        cleanup = savings[3]
+        assert cleanup.savings_percent == 100.0
+        assert cleanup.optimized_cost == 0
+    
+    def test_replication_savings(self, calculator, sample_scan_results):
+        """Test replication savings over the over-replicated file list"""
+        sample_scan_results["efficiency_analysis"]["inefficient_replication"] = [
+            {"size": 1024 ** 3, "current_replication": 5, "suggested_replication": 3},
+            {"size": 3 * 1024 ** 3, "current_replication": 4, "suggested_replication": 3}
+        ]
+        
+        savings = calculator._calculate_replication_savings(sample_scan_results, {"category": "replication"})
+        
+        assert savings.affected_data_gb == pytest.approx(4.0)
+        assert savings.current_cost == pytest.approx(4.0 * 0.04 * 4)
+        assert savings.savings == pytest.approx(4.0 * 0.04)
+        assert savings.implementation_cost == 0
+    
+    def test_unknown_category_is_skipped(self, calculator, sample_scan_results):
+        """Test that unsupported categories produce no savings entry"""
+        savings = calculator.calculate_optimization_savings(
+            sample_scan_results, [{"category": "unknown"}, {"category": "cold_data"}]
+        )
+        
+        assert [s.category for s in savings] == ["cold_data"]
+    
+    def test_parallel_savings_match_serial(self, calculator, sample_scan_results, optimizations, monkeypatch):
+        """Test that threaded category dispatch preserves order and results"""
+        serial = calculator.calculate_optimization_savings(sample_scan_results, optimizations)
+        
+        from hdfs_cost_advisor.cost import calculator as calculator_module
+        monkeypatch.setattr(calculator_module, "_PARALLEL_MIN_FILES", 0)
+        parallel = calculator.calculate_optimization_savings(sample_scan_results, optimizations)
+        
+        assert parallel == serial
+    
+    def test_generate_cost_report(self, calculator, sample_scan_results, optimizations):
+        """Test cost report totals match the per-category breakdown"""
+        report = calculator.generate_cost_report(sample_scan_results, optimizations)
+        
+        breakdown = report["optimization_breakdown"]
+        summary = report["summary"]
+        
+        assert len(breakdown) == len(optimizations)
+        assert summary["total_monthly_savings"] == pytest.approx(
+            sum(b["monthly_savings"] for b in breakdown)
+        )
+        assert summary["total_implementation_cost"] == pytest.approx(
+            sum(b["implementation_cost"] for b in breakdown)
+        )
+        assert summary["optimized_monthly_cost"] == pytest.approx(
+            report["current_costs"]["total_monthly_cost"] - summary["total_monthly_savings"]
+        )
+    
+    def test_cost_report_reuses_precomputed_savings(self, calculator, sample_scan_results, optimizations):
+        """Test that passing precomputed savings gives the same report"""
+        savings = calculator.calculate_optimization_savings(sample_scan_results, optimizations)
+        
+        assert calculator.generate_cost_report(sample_scan_results, optimizations, savings) == \
+            calculator.generate_cost_report(sample_scan_results, optimizations)
+    
+    def test_cost_report_without_savings(self, calculator, optimizations):
+        """Test that zero denominators report None rather than infinity"""
+        report = calculator.generate_cost_report({}, optimizations)
+        
+        assert all(b["payback_months"] is None for b in report["optimization_breakdown"])
+        assert report["summary"]["payback_months"] is None
+        assert report["summary"]["roi_percent"] is None
+        json.dumps(report, allow_nan=False)
+    
+    def test_current_costs_are_cached(self, calculator, sample_scan_results):
+        """Test that repeated current cost calculations hit the cache"""
+        first = calculator.calculate_current_costs(sample_scan_results)
+        first["total_monthly_cost"] = -1
+        second = calculator.calculate_current_costs(sample_scan_results)
+        
+        assert second["total_monthly_cost"] > 0
+        assert calculator._calc_current.cache_info().hits == 1
+        
+        other = CostCalculator(StorageCosts(standard_storage_cost_per_gb=1.0))
+        assert other.calculate_current_costs(sample_scan_results)["storage_cost"] > second["storage_cost"]
+    
+    def test_storage_costs_frozen(self):
+        """Test that prices can't change under the derived constants built from them"""
+        costs = StorageCosts()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            costs.standard_storage_cost_per_gb = 1.0
+        
+        repriced = dataclasses.replace(costs, standard_storage_cost_per_gb=1.0, cold_storage_cost_per_gb=0.5)
+        assert repriced.standard_3x == 3.0
+        assert repriced.cold_1p5x == 0.75
+        assert costs.standard_3x == pytest.approx(0.12)
+    
+    def test_estimate_storage_growth(self, calculator, sample_scan_results):
+        """Test vectorized storage growth projections"""
+        growth = calculator.estimate_storage_growth(sample_scan_results, growth_rate_percent=20)
+        
+        monthly = calculator.calculate_current_costs(sample_scan_results)["total_monthly_cost"]
+        assert len(growth["projections"]) == 3
+        assert growth["projections"][0]["year"] == 1
+        assert growth["projections"][2]["projected_monthly_cost"] == pytest.approx(monthly * 1.2 ** 3)
+        assert growth["three_year_total_cost"] == pytest.approx(
+            sum(p["projected_annual_cost"] for p in growth["projections"])
+        )
+        
+        longer = calculator.estimate_storage_growth(sample_scan_results, horizon_years=10)
+        assert len(longer["projections"]) == 10
+        assert longer["three_year_total_cost"] == pytest.approx(growth["three_year_total_cost"])
+        assert longer["total_projected_cost"] > longer["three_year_total_cost"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,121 @@
+import pytest
+import io
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from hdfs_cost_advisor.endpoints.generate_script import HDFSScriptGenerator
+
+class TestHDFSScriptGenerator:
+
+    @pytest.fixture
+    def generator(self):
+        """Script generator fixture"""
+        return HDFSScriptGenerator()
+
+    @pytest.fixture
+    def optimization_plan(self):
+        """Optimization plan covering every script category"""
+        return {
+            "plan_id": "test-plan-123",
+            "total_monthly_savings": 12.5,
+            "total_annual_savings": 150.0,
+            "affected_data_gb": 3.25,
+            "optimizations": [
+                {"category": "cold_data", "files": [{"path": "/data/old.txt", "size_gb": 1.23456}]},
+                {"category": "small_files", "directories": [
+                    {"path": "/data/small", "small_files": [{"path": "/data/small/a.txt"}]}
+                ]},
+                {"category": "replication", "files": [
+                    {"path": "/data/important.data", "current_replication": 5, "suggested_replication": 3}
+                ]},
+                {"category": "cleanup", "files": [
+                    {"path": "/tmp/temp.tmp", "age_days": 12.345, "cleanup_priority": "critical"}
+                ]},
+                {"category": "compression", "files": [{"path": "/data/raw.csv", "size_gb": 0.5}]}
+            ]
+        }
+
+    def test_generate_optimization_script(self, generator, optimization_plan):
+        """Test optimization script contents"""
+        script = generator.generate_optimization_script(optimization_plan)
+
+        assert script.startswith("#!/bin/bash")
+        assert "# Optimization Plan ID: test-plan-123" in script
+        assert "hdfs storagepolicies -setStoragePolicy -path '/data/old.txt' -policy COLD" in script
+        assert "(1.23GB)" in script
+        assert "hdfs dfs -rm '/data/small/a.txt'" in script
+        assert "hdfs dfs -setrep 3 '/data/important.data'" in script
+        assert "(12.3 days old)" in script
+        assert "hdfs dfs -get '/data/raw.csv' - | gzip" in script
+
+    def test_cleanup_empty_file_without_age(self, generator):
+        """Test that empty files from the cleanup plan render without an age"""
+        plan = {"optimizations": [
+            {"category": "cleanup", "files": [{"path": "/data/empty.txt", "type": "empty", "cleanup_priority": "low"}]}
+        ]}
+        script = generator.generate_optimization_script(plan)
+
+        assert "Removing orphaned file /data/empty.txt (0 days old)" in script
+        assert "hdfs dfs -cp '/data/empty.txt'" not in script
+
+    def test_stream_matches_render(self, generator, optimization_plan, monkeypatch):
+        """Test that streaming produces the same script as rendering"""
+        from hdfs_cost_advisor.endpoints import generate_script
+
+        class FixedDatetime:
+            @staticmethod
+            def utcnow():
+                from datetime import datetime
+                return datetime(2024, 1, 1)
+
+        monkeypatch.setattr(generate_script, "datetime", FixedDatetime)
+
+        out = io.StringIO()
+        generator.generate_optimization_script_stream(optimization_plan, out)
+
+        assert out.getvalue() == generator.generate_optimization_script(optimization_plan)
+
+    def test_write_script_to_file(self, optimization_plan, tmp_path):
+        """Test streaming a stored plan with many files straight to disk"""
+        from hdfs_cost_advisor.endpoints import generate_script
+
+        files = [{"path": f"/data/old_{i}.txt", "size_gb": 1} for i in range(600)]
+        optimization_plan["optimizations"][0]["files"] = files
+        generate_script.store_optimization_plan("test-plan-123", optimization_plan)
+
+        target = tmp_path / "optimize.sh"
+        generate_script.write_optimization_script("test-plan-123", str(target))
+        script = target.read_text()
+
+        assert script.count("-policy COLD") == 600
+        assert "/data/old_599.txt" in script
+        assert script.endswith("echo \"========================================\"\n")
+
+    def test_stream_stored_plan(self, optimization_plan):
+        """Test streaming a stored plan and the fallback for a missing one"""
+        from hdfs_cost_advisor.endpoints import generate_script
+
+        generate_script.store_optimization_plan("test-plan-stream", optimization_plan)
+        chunks = list(generate_script.stream_optimization_script("test-plan-stream"))
+
+        assert len(chunks) > 1
+        assert chunks[0].startswith("#!/bin/bash")
+        assert "hdfs dfs -setrep 3 '/data/important.data'" in "".join(chunks)
+
+        missing = list(generate_script.stream_optimization_script("missing-plan"))
+        assert len(missing) == 1
+        assert "Script generation failed" in missing[0]
+        assert generate_script.create_optimization_script("missing-plan") == missing[0]
+
+    def test_rollback_script(self, generator):
+        """Test rollback script contents"""
+        script = generator.generate_rollback_script("test-opt-456")
+
+        assert "# Optimization ID: test-opt-456" in script
+        assert 'log INFO "Starting rollback for optimization test-opt-456"' in script
+
+if __name__ == "__main__":
+    pytest.main([__file__])
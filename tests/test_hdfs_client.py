@@ -2,12 +2,13 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
+import json
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from hdfs_cost_advisor.hdfs.client import HDFSClient, HDFSConfig
-from hdfs_cost_advisor.hdfs.analyzer import HDFSMetadataAnalyzer
+from hdfs_cost_advisor.hdfs.analyzer import HDFSMetadataAnalyzer, FILE_DTYPE, FileMeta, to_file_records, concat_file_records
 
 class TestHDFSClient:
     
@@ -49,13 +50,39 @@ class TestHDFSClient:
             
             yield mock_instance
     
+    @pytest.fixture
+    def serve_listing(self):
+        """Build a session.get stand-in that serves LISTSTATUS_BATCH pages from a namespace dict"""
+        def serve(namespace, page_size=1000):
+            def get(url, params, timeout):
+                entries = namespace[url.split("/webhdfs/v1", 1)[1].rstrip("/")]
+                suffixes = [entry["pathSuffix"] for entry in entries]
+                start = suffixes.index(params["startAfter"]) + 1 if "startAfter" in params else 0
+                page = entries[start:start + page_size]
+                
+                response = Mock()
+                response.content = json.dumps({"DirectoryListing": {
+                    "partialListing": {"FileStatuses": {"FileStatus": page}},
+                    "remainingEntries": len(entries) - start - len(page)
+                }}).encode()
+                return response
+            return get
+        return serve
+    
+    @staticmethod
+    def file_status(name, size=1024 * 1024):
+        """FileStatus entry for a listed file"""
+        return {"pathSuffix": name, "type": "FILE", "length": size, "replication": 3,
+                "blockSize": 128 * 1024 * 1024, "accessTime": 1640995200000,
+                "modificationTime": 1640995200000, "owner": "hadoop", "group": "hadoop"}
+    
     @pytest.fixture
     def mock_requests(self):
-        """Mock requests for JMX calls"""
+        """Mock requests for JMX calls made through the client's session"""
         with patch('hdfs_cost_advisor.hdfs.client.requests') as mock_requests:
             mock_response = Mock()
             mock_response.status_code = 200
-            mock_response.json.return_value = {
+            mock_response.content = json.dumps({
                 "beans": [
                     {
                         "CapacityTotal": 1000000000,
@@ -69,8 +96,8 @@ class TestHDFSClient:
                         "RpcProcessingTimeAvgTime": 5
                     }
                 ]
-            }
-            mock_requests.get.return_value = mock_response
+            }).encode()
+            mock_requests.Session.return_value.get.return_value = mock_response
             yield mock_requests
     
     def test_hdfs_client_initialization(self, hdfs_config, mock_hdfs_client):
@@ -88,7 +115,27 @@ class TestHDFSClient:
         
         assert "beans" in metrics
         assert len(metrics["beans"]) > 0
-        mock_requests.get.assert_called_once()
+        client.session.get.assert_called_once()
+    
+    def test_jmx_metrics_cached(self, hdfs_config, mock_hdfs_client, mock_requests):
+        """Test that repeated JMX reads within the TTL share one request per query"""
+        client = HDFSClient(hdfs_config)
+        
+        metrics = client.get_jmx_metrics("q1")
+        assert client.get_jmx_metrics("q1") == metrics
+        
+        # Each read returns its own copy, so a caller's changes don't reach the cache
+        metrics["beans"].clear()
+        assert client.get_jmx_metrics("q1")["beans"]
+        
+        client.get_cluster_metrics()
+        client.get_cluster_metrics()
+        
+        assert client.session.get.call_count == 3
+        
+        client._jmx_cache.clear()
+        client.get_jmx_metrics("q1")
+        assert client.session.get.call_count == 4
     
     def test_get_cluster_metrics(self, hdfs_config, mock_hdfs_client, mock_requests):
         """Test cluster metrics retrieval"""
@@ -112,9 +159,14 @@ class TestHDFSClient:
         assert metadata["replication"] == 3
         assert metadata["efficiency_score"] > 0
     
-    def test_scan_directory_batch(self, hdfs_config, mock_hdfs_client):
+    def test_scan_directory_batch(self, hdfs_config, mock_hdfs_client, serve_listing):
         """Test directory scanning in batches"""
         client = HDFSClient(hdfs_config)
+        client.session.get = serve_listing({
+            "/test": [self.file_status("file1.txt"), self.file_status("file2.txt"),
+                      {"pathSuffix": "subdir", "type": "DIRECTORY"}],
+            "/test/subdir": [self.file_status("file3.txt")]
+        })
         
         batches = list(client.scan_directory_batch("/test", 2))
         
@@ -125,6 +177,24 @@ class TestHDFSClient:
             for file_info in batch:
                 assert "path" in file_info
                 assert "size" in file_info
+        assert [f["path"] for batch in batches for f in batch] == [
+            "/test/file1.txt", "/test/file2.txt", "/test/subdir/file3.txt"
+        ]
+        mock_hdfs_client.status.assert_not_called()
+    
+    def test_scan_directory_batch_pages_and_depth(self, hdfs_config, mock_hdfs_client, serve_listing):
+        """Test that listing pages are followed in order and max_depth limits the walk"""
+        files = [f"file{i}.txt" for i in range(2500)]
+        client = HDFSClient(hdfs_config)
+        client.session.get = serve_listing({
+            "/test": [self.file_status(name) for name in files] + [{"pathSuffix": "subdir", "type": "DIRECTORY"}]
+        }, page_size=700)
+        
+        batches = list(client.scan_directory_batch("/test/", 1))
+        
+        assert [len(batch) for batch in batches] == [1000, 1000, 500]
+        assert [f["path"] for batch in batches for f in batch] == [f"/test/{name}" for name in files]
+        assert batches[0][0]["size"] == 1024 * 1024
     
     def test_check_path_exists(self, hdfs_config, mock_hdfs_client):
         """Test path existence check"""
@@ -137,6 +207,16 @@ class TestHDFSClient:
         mock_hdfs_client.status.side_effect = Exception("Path not found")
         assert client.check_path_exists("/test/nonexistent/path") == False
     
+    def test_get_file_checksum(self, hdfs_config, mock_hdfs_client):
+        """Test file checksum lookup"""
+        client = HDFSClient(hdfs_config)
+        
+        mock_hdfs_client.checksum.return_value = {"algorithm": "MD5-of-0MD5-of-512CRC32C", "bytes": "abc", "length": 28}
+        assert client.get_file_checksum("/test/file.txt") == "MD5-of-0MD5-of-512CRC32C:abc"
+        
+        mock_hdfs_client.checksum.side_effect = Exception("Not a file")
+        assert client.get_file_checksum("/test") is None
+    
     def test_get_directory_size(self, hdfs_config, mock_hdfs_client):
         """Test directory size calculation"""
         client = HDFSClient(hdfs_config)
@@ -229,6 +309,10 @@ class TestHDFSMetadataAnalyzer:
             assert file_info["classification"] == "cold"
             assert "days_since_access" in file_info
             assert "cold_score" in file_info
+        
+        # Ages are measured from the given time when one is passed
+        assert analyzer.identify_cold_data(sample_file_metadata, 180, current_time=0) == []
+        assert analyzer.identify_orphaned_temp_files(sample_file_metadata, current_time=0) == []
     
     def test_detect_duplicate_candidates(self, analyzer, sample_file_metadata):
         """Test duplicate file detection"""
@@ -243,6 +327,44 @@ class TestHDFSMetadataAnalyzer:
             assert "group_size" in file_info
             assert "duplicate_score" in file_info
     
+    def test_duplicate_candidates_split_by_checksum(self, analyzer, sample_file_metadata):
+        """Test that same-size files with different content are not reported, and checksums are cached"""
+        calls = []
+        
+        def checksum(path):
+            calls.append(path)
+            return "same" if path.startswith("/test/") else path
+        
+        assert [f["path"] for f in analyzer.detect_duplicate_candidates(sample_file_metadata)] == [
+            "/test/old_file.txt", "/tmp/temp_file.txt"
+        ]
+        assert analyzer.detect_duplicate_candidates(sample_file_metadata, checksum) == []
+        
+        extra = [{**sample_file_metadata[0], "path": "/test/copy.txt"}]
+        duplicates = analyzer.detect_duplicate_candidates(to_file_records(sample_file_metadata + extra), checksum)
+        assert [f["path"] for f in duplicates] == ["/test/old_file.txt", "/test/copy.txt"]
+        assert duplicates[0]["group_size"] == 2
+        assert sorted(calls) == ["/test/copy.txt", "/test/old_file.txt", "/tmp/temp_file.txt"]
+    
+    def test_top_k_matches_full_ranking(self, analyzer, sample_file_metadata):
+        """Test that top_k returns the head of the full ranked lists"""
+        metadata = sample_file_metadata + [
+            {**file_info, "path": f"{file_info['path']}.{i}.tmp"} for i, file_info in enumerate(sample_file_metadata)
+        ]
+        
+        for data in (metadata, to_file_records(metadata)):
+            for rank in (
+                analyzer.identify_cold_data, analyzer.detect_duplicate_candidates, analyzer.identify_orphaned_temp_files
+            ):
+                ranked = [f["path"] for f in rank(data)]
+                assert [f["path"] for f in rank(data, top_k=2)] == ranked[:2]
+                assert [f["path"] for f in rank(data, top_k=100)] == ranked
+            assert analyzer.identify_cold_data(data, top_k=0) == []
+        
+        checksum = lambda path: "same"
+        ranked = [f["path"] for f in analyzer.detect_duplicate_candidates(metadata, checksum)]
+        assert [f["path"] for f in analyzer.detect_duplicate_candidates(metadata, checksum, top_k=1)] == ranked[:1]
+    
     def test_analyze_file_efficiency(self, analyzer, sample_file_metadata):
         """Test file efficiency analysis"""
         efficiency = analyzer.analyze_file_efficiency(sample_file_metadata)
@@ -319,6 +441,111 @@ class TestHDFSMetadataAnalyzer:
             assert "impact" in opt
             assert "potential_savings_gb" in opt
             assert "description" in opt
+    
+    def test_structured_array_matches_dicts(self, analyzer, sample_file_metadata):
+        """Test that structured array input gives the same results as dicts"""
+        import numpy as np
+        
+        fields = FILE_DTYPE.names
+        records = np.array([tuple(f[name] for name in fields) for f in sample_file_metadata], dtype=FILE_DTYPE)
+        
+        cold_paths = [f["path"] for f in analyzer.identify_cold_data(records)]
+        assert cold_paths == [f["path"] for f in analyzer.identify_cold_data(sample_file_metadata)]
+        
+        efficiency = analyzer.analyze_file_efficiency(records)
+        assert efficiency == analyzer.analyze_file_efficiency(sample_file_metadata)
+        
+        orphaned_paths = [f["path"] for f in analyzer.identify_orphaned_temp_files(records)]
+        assert orphaned_paths == ["/tmp/temp_file.txt"]
+        assert analyzer.calculate_storage_waste(records) == analyzer.calculate_storage_waste(sample_file_metadata)
+    
+    def test_sharded_classification_matches_single_pass(self, analyzer, sample_file_metadata, monkeypatch):
+        """Test that records classified over several shards match a single pass"""
+        from hdfs_cost_advisor.hdfs import _kernels
+        
+        records = to_file_records(sample_file_metadata * 3)
+        efficiency = analyzer.analyze_file_efficiency(records)
+        waste = analyzer.calculate_storage_waste(records)
+        
+        monkeypatch.setattr(_kernels, "PARALLEL_MIN_ROWS", 2)
+        monkeypatch.setattr(_kernels.os, "cpu_count", lambda: 4)
+        
+        assert analyzer.analyze_file_efficiency(records) == efficiency
+        assert analyzer.calculate_storage_waste(records) == waste
+    
+    def test_analyze_all_matches_individual_analyses(self, analyzer, sample_file_metadata):
+        """Test that the fused pass agrees with the separate analyses"""
+        analysis = analyzer.analyze_all(sample_file_metadata)
+        
+        def paths(files):
+            return [f["path"] for f in files]
+        
+        assert paths(analysis["cold_data"]) == paths(analyzer.identify_cold_data(sample_file_metadata))
+        assert analysis["duplicate_candidates"] == analyzer.detect_duplicate_candidates(sample_file_metadata)
+        assert analysis["efficiency"] == analyzer.analyze_file_efficiency(sample_file_metadata)
+        assert paths(analysis["orphaned_files"]) == paths(analyzer.identify_orphaned_temp_files(sample_file_metadata))
+        assert analysis["waste_analysis"] == analyzer.calculate_storage_waste(sample_file_metadata)
+    
+    def test_file_meta_records(self, analyzer, sample_file_metadata):
+        """Test that FileMeta records are analyzed like metadata dicts"""
+        records = [FileMeta(**f) for f in sample_file_metadata]
+        
+        assert records[0]["size"] == 1024 * 1024
+        assert records[0].get("block_size") is None
+        assert {**records[0]} == sample_file_metadata[0]
+        
+        analysis = analyzer.analyze_all(records)
+        assert analysis["efficiency"] == analyzer.analyze_file_efficiency(sample_file_metadata)
+        assert [f["path"] for f in analysis["orphaned_files"]] == ["/tmp/temp_file.txt"]
+
+    def test_file_records_round_trip(self, analyzer, sample_file_metadata):
+        """Test that packed scan records keep long paths and block sizes"""
+        long_path = "/test/" + "nested/" * 30 + "empty.txt"
+        extra = [{"path": long_path, "size": 0, "block_size": 128 * 1024 * 1024, "owner": "etl-service"}]
+        
+        records = concat_file_records([to_file_records(sample_file_metadata), to_file_records(extra)])
+        files = sample_file_metadata + extra
+        
+        assert len(records) == len(files)
+        assert records["path"][-1] == long_path
+        assert records["owner"][-1] == "etl-service"
+        assert analyzer.calculate_storage_waste(records) == analyzer.calculate_storage_waste(files)
+        
+        efficiency = analyzer.analyze_all(records)["efficiency"]
+        expected = analyzer.analyze_file_efficiency(files)
+        for key in ("small_files_count", "empty_files_count", "over_replicated_count", "efficiency_summary"):
+            assert efficiency[key] == expected[key]
+        assert len(concat_file_records([])) == 0
+    
+    def test_incremental_analysis_matches_full(self, analyzer, sample_file_metadata):
+        """Test that analyzing records batch by batch matches one pass over all of them"""
+        records = to_file_records(sample_file_metadata)
+        
+        analyzer.start()
+        for start in range(0, len(records), 2):
+            analyzer.update(records[start:start + 2])
+        report = analyzer.finalize()
+        
+        assert report["total_files"] == len(records)
+        assert report["total_size_bytes"] == int(records["size"].sum())
+        assert report["efficiency"] == analyzer.analyze_all(records)["efficiency"]
+        assert report["waste_analysis"] == analyzer.calculate_storage_waste(records)
+        assert report["directory_analysis"] == analyzer.analyze_directory_structure(records)
+        assert report["optimization_priorities"] == analyzer.generate_optimization_priority(records)
+    
+    def test_result_entries_are_plain_dicts(self, analyzer, sample_file_metadata):
+        """Test that result entries are standalone dicts any JSON encoder can serialize"""
+        cold = analyzer.identify_cold_data(sample_file_metadata, 180)
+        entry = next(f for f in cold if f["path"] == "/test/old_file.txt")
+        
+        assert type(entry) is dict
+        assert entry == {**sample_file_metadata[0], **{key: entry[key] for key in ("classification", "days_since_access", "cold_score")}}
+        entry["classification"] = "changed"
+        assert "classification" not in sample_file_metadata[0]
+        
+        for report in (analyzer.analyze_all(sample_file_metadata), analyzer.analyze_all(to_file_records(sample_file_metadata))):
+            assert json.loads(json.dumps(report["cold_data"])) == report["cold_data"]
+            assert all(type(f) is dict for f in report["efficiency"]["small_files"] + report["orphaned_files"])
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,179 @@
+import pytest
+import asyncio
+import json
+import aiohttp
+from unittest.mock import AsyncMock, Mock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from hdfs_cost_advisor.llm.client import LLMClient, LLMProvider
+from hdfs_cost_advisor.demo import DemoLLMClient
+from hdfs_cost_advisor.cost.calculator import CostCalculator, StorageCosts
+from hdfs_cost_advisor.endpoints import optimize
+from hdfs_cost_advisor.endpoints.scan import store_scan_results, delete_scan_results
+
+class TestAnalyzeMany:
+    
+    @pytest.fixture
+    def llm_client(self):
+        """LLM client whose analyses are stubbed per scan"""
+        return LLMClient(LLMProvider.ANTHROPIC, "test-api-key")
+    
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self, llm_client):
+        """Analyses come back in the order their scans were given"""
+        async def analyze(scan_results):
+            await asyncio.sleep(scan_results["delay"])
+            return {"scan_id": scan_results["scan_id"]}
+        
+        scans = [{"scan_id": "a", "delay": 0.02}, {"scan_id": "b", "delay": 0}, {"scan_id": "c", "delay": 0.01}]
+        with patch.object(llm_client, "analyze_hdfs_cost_optimization", side_effect=analyze):
+            results = await llm_client.analyze_many(scans, max_concurrency=2)
+        
+        assert [result["scan_id"] for result in results] == ["a", "b", "c"]
+    
+    @pytest.mark.asyncio
+    async def test_failure_does_not_abort_batch(self, llm_client):
+        """An analysis that raises, even by cancellation, is returned in place of its result"""
+        async def analyze(scan_results):
+            if scan_results["scan_id"] == "bad":
+                raise RuntimeError("fallback failed")
+            if scan_results["scan_id"] == "cancelled":
+                raise asyncio.CancelledError()
+            return {"scan_id": scan_results["scan_id"]}
+        
+        scans = [{"scan_id": "bad"}, {"scan_id": "good"}, {"scan_id": "cancelled"}]
+        with patch.object(llm_client, "analyze_hdfs_cost_optimization", side_effect=analyze):
+            results = await llm_client.analyze_many(scans)
+        
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] == {"scan_id": "good"}
+        assert isinstance(results[2], asyncio.CancelledError)
+
+class TestGenerateRecommendationsBatch:
+    
+    @pytest.fixture
+    def stored_scans(self, sample_scan_results):
+        """Two completed scans in the scan storage"""
+        scan_ids = ["batch-scan-1", "batch-scan-2"]
+        for scan_id in scan_ids:
+            store_scan_results(scan_id, dict(sample_scan_results, scan_id=scan_id))
+        yield scan_ids
+        for scan_id in scan_ids:
+            delete_scan_results(scan_id)
+    
+    @pytest.mark.asyncio
+    async def test_batch_uses_one_analyze_many_call(self, stored_scans):
+        """Loaded scans share one analyze_many call; missing scans and failed analyses fail alone"""
+        analysis = await DemoLLMClient("demo", "demo-key", delay=0).analyze_hdfs_cost_optimization({})
+        llm_client = Mock()
+        llm_client.analyze_many = AsyncMock(return_value=[analysis, RuntimeError("analysis failed")])
+        llm_client.analyze_hdfs_cost_optimization = AsyncMock()
+        
+        scan_ids = [*stored_scans, "missing-scan"]
+        outcomes = await optimize.generate_recommendations_batch(
+            scan_ids, None, llm_client, CostCalculator(StorageCosts())
+        )
+        
+        llm_client.analyze_many.assert_awaited_once()
+        analyzed = llm_client.analyze_many.await_args.args[0]
+        assert [scan["scan_id"] for scan in analyzed] == stored_scans
+        llm_client.analyze_hdfs_cost_optimization.assert_not_called()
+        
+        assert len(outcomes) == 3
+        assert outcomes[0]["status"] == "completed"
+        assert outcomes[0]["scan_id"] == "batch-scan-1"
+        assert outcomes[0]["llm_analysis"] == analysis
+        assert isinstance(outcomes[1], RuntimeError)
+        assert isinstance(outcomes[2], ValueError)
+
+class TestSession:
+    
+    @pytest.fixture
+    def llm_client(self):
+        """LLM client without an open session"""
+        return LLMClient(LLMProvider.ANTHROPIC, "test-api-key")
+    
+    @pytest.mark.asyncio
+    async def test_session_reused_until_closed(self, llm_client):
+        """Requests share one session; close() ends it and the next request opens a new one"""
+        session = llm_client._get_session()
+        assert llm_client._get_session() is session
+        
+        await llm_client.close()
+        assert session.closed
+        
+        reopened = llm_client._get_session()
+        assert reopened is not session
+        await llm_client.close()
+        assert reopened.closed
+    
+    @pytest.mark.asyncio
+    async def test_context_manager_closes_session(self, llm_client):
+        """Leaving the async context closes the session opened on entry"""
+        async with llm_client as client:
+            session = client._get_session()
+            assert not session.closed
+        
+        assert session.closed
+        assert llm_client._session is None
+    
+    def test_other_event_loop_rejected(self, llm_client):
+        """An open session is not replaced from another event loop, where it cannot be closed"""
+        async def open_session():
+            return llm_client._get_session()
+        
+        loop = asyncio.new_event_loop()
+        try:
+            session = loop.run_until_complete(open_session())
+            with pytest.raises(RuntimeError, match="another event loop"):
+                asyncio.run(open_session())
+            assert llm_client._session is session
+        finally:
+            loop.run_until_complete(llm_client.close())
+            loop.close()
+        
+        assert session.closed
+    
+    def test_new_session_after_loop_closed(self, llm_client):
+        """A client used with one asyncio.run per request opens a working session each time"""
+        reply = {"content": [{"text": json.dumps({
+            "analysis_summary": "ok", "recommendations": [], "cost_calculations": {}
+        })}]}
+        
+        class Response:
+            status = 200
+            
+            async def __aenter__(self):
+                return self
+            
+            async def __aexit__(self, *exc_info):
+                return False
+            
+            async def json(self):
+                return reply
+        
+        sessions = []
+        
+        def post(session, url, **kwargs):
+            sessions.append(session)
+            return Response()
+        
+        async def analyze():
+            return await llm_client.analyze_hdfs_cost_optimization({})
+        
+        with patch.object(aiohttp.ClientSession, "post", post), \
+             patch.object(llm_client, "_generate_fallback_analysis") as fallback:
+            first = asyncio.run(analyze())
+            second = asyncio.run(analyze())
+        
+        fallback.assert_not_called()
+        assert first["analysis_summary"] == second["analysis_summary"] == "ok"
+        assert sessions[0] is not sessions[1]
+        assert llm_client._session is sessions[1]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,71 @@
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from hdfs_cost_advisor.cost.calculator import CostCalculator, StorageCosts
+from hdfs_cost_advisor.endpoints import optimize
+from hdfs_cost_advisor.endpoints.optimize import _create_optimization_plan
+from hdfs_cost_advisor.utils.storage import JsonTTLCache
+
+class TestOptimizationPlan:
+    
+    @pytest.fixture
+    def calculator(self):
+        """Create calculator with default storage costs"""
+        return CostCalculator(StorageCosts())
+    
+    def test_handled_categories_deduplicated(self, calculator, sample_scan_results):
+        """Test that a file-selecting category yields one action from its strongest recommendation"""
+        llm_analysis = {"recommendations": [
+            {"category": "cold_data", "title": "Weak", "estimated_savings_gb": 1},
+            {"category": "cleanup", "title": "Cleanup", "estimated_savings_gb": 1},
+            {"category": "cold_data", "title": "Strong", "estimated_savings_gb": 5}
+        ]}
+        
+        plan = _create_optimization_plan(sample_scan_results, llm_analysis, {}, calculator)
+        
+        categories = [opt["category"] for opt in plan["optimizations"]]
+        assert categories == ["cold_data", "cleanup"]
+        assert plan["optimizations"][0]["title"] == "Strong"
+    
+    def test_generic_recommendations_all_kept(self, calculator, sample_scan_results):
+        """Test that distinct generic recommendations in one category each become an action"""
+        llm_analysis = {"recommendations": [
+            {"category": "compression", "title": "Compress logs", "estimated_savings_gb": 2},
+            {"category": "compression", "title": "Switch to ORC", "estimated_savings_gb": 3},
+            {"title": "Uncategorized", "estimated_savings_gb": 1}
+        ]}
+        
+        plan = _create_optimization_plan(sample_scan_results, llm_analysis, {}, calculator)
+        
+        assert [opt["title"] for opt in plan["optimizations"]] == ["Compress logs", "Switch to ORC", "Uncategorized"]
+        assert [opt["category"] for opt in plan["optimizations"]] == ["compression", "compression", "generic"]
+
+class TestOptimizationStorage:
+    
+    @pytest.fixture
+    def small_storage(self, monkeypatch):
+        """Optimization storage that holds two results, with an empty index"""
+        monkeypatch.setattr(optimize, "optimization_results_storage", JsonTTLCache(maxsize=2, ttl=3600))
+        monkeypatch.setattr(optimize, "optimization_index", {})
+    
+    def test_listing_follows_storage_evictions(self, small_storage):
+        """Test that listing shows exactly the results the storage still holds"""
+        for optimization_id in ("opt-a", "opt-b"):
+            optimize.store_optimization_results(optimization_id, {"scan_id": "scan", "status": "completed"})
+        
+        # Reading opt-a makes opt-b the least recently used result, so it is evicted next
+        optimize.get_optimization_results("opt-a")
+        optimize.store_optimization_results("opt-c", {"scan_id": "scan", "status": "completed"})
+        
+        listed = sorted(entry["optimization_id"] for entry in optimize.list_optimizations())
+        assert listed == ["opt-a", "opt-c"]
+        assert sorted(optimize.optimization_index) == ["opt-a", "opt-c"]
+        with pytest.raises(optimize.OptimizationNotFoundError):
+            optimize.get_optimization_results("opt-b")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
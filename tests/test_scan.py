@@ -0,0 +1,92 @@
+import pytest
+import time
+from unittest.mock import Mock
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from hdfs_cost_advisor.endpoints.scan import execute_scan_async, get_scan_results, delete_scan_results
+
+class TestExecuteScanAsync:
+    
+    @pytest.fixture
+    def listings(self):
+        """File batches listed under each existing path"""
+        now_ms = int(time.time() * 1000)
+        old_ms = now_ms - 400 * 86400 * 1000
+        return {
+            "/data/a": [
+                [{"path": "/data/a/part-0", "size": 256 << 20, "replication": 3,
+                  "access_time": old_ms, "modification_time": old_ms}],
+                [{"path": "/data/a/part-1", "size": 1024, "replication": 3,
+                  "access_time": now_ms, "modification_time": now_ms}]
+            ],
+            "/data/b": [
+                [{"path": "/data/b/file.tmp", "size": 2048, "replication": 3,
+                  "access_time": now_ms, "modification_time": old_ms}]
+            ]
+        }
+    
+    @pytest.fixture
+    def hdfs_client(self, listings):
+        """Mock HDFS client serving the listings; any other path does not exist"""
+        client = Mock()
+        client.check_path_exists.side_effect = lambda path: path in listings
+        client.scan_directory_batch.side_effect = lambda path, depth: iter(listings[path])
+        client.get_cluster_metrics.return_value = {"filesystem": {"files_total": 3}}
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_paths_feed_one_analysis(self, hdfs_client):
+        """Distinct paths are walked once each and analyzed together with the cluster metrics"""
+        result = await execute_scan_async(hdfs_client, ["/data/a", "/data/b", "/data/a", "/missing"], 3)
+        try:
+            assert result["status"] == "completed"
+            assert result["scanned_paths"] == ["/data/a", "/data/b", "/data/a", "/missing"]
+            assert result["scan_depth"] == 3
+            
+            # Repeated paths are listed once; the missing path is skipped without failing the scan
+            listed = [call.args[0] for call in hdfs_client.scan_directory_batch.call_args_list]
+            assert sorted(listed) == ["/data/a", "/data/b"]
+            assert hdfs_client.check_path_exists.call_count == 3
+            hdfs_client.get_cluster_metrics.assert_called_once()
+            
+            # Every batch from both paths reached the shared analyzer
+            assert result["total_files"] == 3
+            assert result["total_size_bytes"] == (256 << 20) + 1024 + 2048
+            assert "/data/a/part-0" in [f["path"] for f in result["cold_data"]]
+            assert [f["path"] for f in result["orphaned_files"]] == ["/data/b/file.tmp"]
+            assert result["cluster_metrics"] == {"filesystem": {"files_total": 3}}
+            
+            assert get_scan_results(result["scan_id"])["total_files"] == 3
+        finally:
+            delete_scan_results(result["scan_id"])
+    
+    @pytest.mark.asyncio
+    async def test_no_files_found(self, hdfs_client):
+        """Scanning only missing paths completes with an empty result"""
+        result = await execute_scan_async(hdfs_client, ["/missing", "/also-missing"], 2)
+        
+        assert result["status"] == "completed"
+        assert result["message"] == "No files found in specified paths"
+        assert result["total_files"] == 0
+        assert result["cold_data"] == []
+        assert result["cluster_metrics"] == {"filesystem": {"files_total": 3}}
+        hdfs_client.scan_directory_batch.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_listing_error_fails_scan(self, hdfs_client, listings):
+        """An error while listing one path fails the whole scan"""
+        def scan_directory_batch(path, depth):
+            if path == "/data/b":
+                raise ConnectionError("NameNode unreachable")
+            return iter(listings[path])
+        hdfs_client.scan_directory_batch.side_effect = scan_directory_batch
+        
+        with pytest.raises(ConnectionError, match="NameNode unreachable"):
+            await execute_scan_async(hdfs_client, ["/data/a", "/data/b"], 3)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
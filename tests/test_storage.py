@@ -0,0 +1,155 @@
+import pytest
+import sys
+import os
+from datetime import datetime
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from hdfs_cost_advisor.utils.storage import JsonTTLCache, ScanCache, ScanResultsStore, ScanIndex, format_json
+from hdfs_cost_advisor.hdfs.analyzer import to_file_records
+
+class TestJsonTTLCache:
+
+    def test_round_trip(self):
+        """Test that values are stored as bytes and read back as equal dicts"""
+        cache = JsonTTLCache(maxsize=4, ttl=60)
+        result = {"scan_id": "abc", "total_files": 2, "cold_data": [{"path": "/a", "size": 1}]}
+        cache["abc"] = result
+        
+        assert isinstance(cache._Cache__data["abc"], bytes)
+        assert cache["abc"] == result
+        assert cache.get("missing") is None
+        assert dict(cache.items()) == {"abc": result}
+    
+    def test_reads_are_independent_copies(self):
+        """Test that mutating a retrieved value does not change the stored one"""
+        cache = JsonTTLCache(maxsize=4, ttl=60)
+        cache["abc"] = {"status": "completed"}
+        cache["abc"]["status"] = "changed"
+        
+        assert cache["abc"] == {"status": "completed"}
+        assert cache.pop("abc") == {"status": "completed"}
+        assert "abc" not in cache
+    
+    def test_numpy_and_datetime_values(self):
+        """Test that NumPy values and datetimes are encoded without manual conversion"""
+        cache = JsonTTLCache(maxsize=4, ttl=60)
+        cache["abc"] = {"sizes": np.arange(3), "total": np.int64(7), "at": datetime(2024, 1, 1)}
+        
+        assert cache["abc"] == {"sizes": [0, 1, 2], "total": 7, "at": "2024-01-01T00:00:00"}
+        assert '"total": 7' in format_json({"total": np.int64(7)})
+
+class TestScanResultsStore:
+    
+    def test_large_result_does_not_flush_hot_results(self, tmp_path):
+        """Test that a result read again stays in memory while a large one is spilled"""
+        store = ScanResultsStore(max_bytes=1000, spill_dir=str(tmp_path))
+        for key in ("a", "b", "c"):
+            store.put(key, {"data": key * 100})
+        
+        # "a" overflowed probation; reading it back re-hydrates it into the main queue
+        assert "a" not in store._probation
+        assert store.get("a") == {"data": "a" * 100}
+        
+        store.put("big", {"data": "x" * 600})
+        assert "a" in store._main
+        assert store.get("big") == {"data": "x" * 600}
+        assert sorted(key for key, _ in store.items()) == ["a", "b", "big", "c"]
+    
+    def test_pop_and_expiry(self, tmp_path):
+        """Test that popped and expired results are gone, including spilled files"""
+        store = ScanResultsStore(max_bytes=100, spill_dir=str(tmp_path))
+        store.put("spilled", {"data": "x" * 200})
+        
+        assert list(tmp_path.iterdir())
+        assert store.pop("spilled") == {"data": "x" * 200}
+        assert not list(tmp_path.iterdir())
+        assert store.get("spilled") is None
+        
+        expiring = ScanResultsStore(max_bytes=1000, ttl=-1, spill_dir=str(tmp_path))
+        expiring.put("old", {"status": "completed"})
+        assert expiring.get("old") is None
+        assert expiring.items() == []
+
+class TestScanIndex:
+    
+    def test_list_retain_and_delete(self):
+        """Test that listings come from the index, newest first, and follow the store"""
+        index = ScanIndex()
+        index.put("old", {"status": "completed", "scan_started": "2024-01-01T00:00:00", "scanned_paths": ["/a"]})
+        index.put("new", {"status": "failed", "scan_started": "2024-02-01T00:00:00"})
+        
+        assert [scan["scan_id"] for scan in index.list()] == ["new", "old"]
+        assert index.list(limit=1)[0] == {
+            "scan_id": "new", "status": "failed", "scan_started": "2024-02-01T00:00:00",
+            "scan_completed": None, "total_files": 0, "total_size_gb": 0, "scanned_paths": []
+        }
+        assert index.list()[1]["scanned_paths"] == ["/a"]
+        
+        index.retain(["old"])
+        assert [scan["scan_id"] for scan in index.list()] == ["old"]
+        index.delete(["old"])
+        assert index.list() == []
+
+class TestScanCache:
+    
+    @pytest.fixture
+    def files(self):
+        """Files under /data at levels 1 to 3"""
+        return to_file_records([
+            {"path": "/data/a.txt", "size": 1},
+            {"path": "/data/logs/b.txt", "size": 2},
+            {"path": "/data/logs/2024/c.txt", "size": 3},
+            {"path": "/data/other/d.txt", "size": 4}
+        ])
+    
+    def test_exact_and_covered_scans(self, tmp_path, files):
+        """Test that a cached walk serves the same scan and shallower or nested ones"""
+        cache = ScanCache(str(tmp_path))
+        cache.put("/data/", 3, files)
+        
+        assert cache.get("/data", 3).tolist() == files.tolist()
+        assert list(cache.get("/data", 1)["path"]) == ["/data/a.txt"]
+        assert list(cache.get("/data/logs", 2)["path"]) == ["/data/logs/b.txt", "/data/logs/2024/c.txt"]
+        assert list(cache.get("/data/logs", 1)["path"]) == ["/data/logs/b.txt"]
+        assert list(cache.get("/data/logs", 2)["size"]) == [2, 3]
+    
+    def test_uncovered_scans_miss(self, tmp_path, files):
+        """Test that deeper, unlimited, unrelated or expired scans are cache misses"""
+        cache = ScanCache(str(tmp_path))
+        cache.put("/data", 2, files[:3])
+        
+        assert cache.get("/data", 3) is None
+        assert cache.get("/data", 0) is None
+        assert cache.get("/data/logs", 2) is None
+        assert cache.get("/other", 1) is None
+        assert ScanCache(str(tmp_path), max_age_seconds=-1).get("/data", 1) is None
+    
+    def test_unlimited_depth_covers_everything(self, tmp_path, files):
+        """Test that an unlimited walk is kept over a later shallower one"""
+        cache = ScanCache(str(tmp_path))
+        cache.put("/data", 0, files)
+        cache.put("/data", 1, files[:1])
+        
+        assert cache.get("/data", 0).tolist() == files.tolist()
+        assert list(cache.get("/data/logs", 0)["path"]) == ["/data/logs/b.txt", "/data/logs/2024/c.txt"]
+        
+        # A deliberate re-listing replaces the deeper walk
+        cache.put("/data", 1, files[:1], replace=True)
+        assert cache.get("/data", 0) is None
+        assert cache.get("/data", 1).tolist() == files[:1].tolist()
+    
+    def test_clusters_are_separate(self, tmp_path, files):
+        """Test that a walk of one cluster is never served for the same path on another"""
+        cache = ScanCache(str(tmp_path))
+        cache.put("/data", 3, files, cluster="http://nn-a:9870/webhdfs/v1|hadoop")
+        
+        assert cache.get("/data", 3, cluster="http://nn-a:9870/webhdfs/v1|hadoop").tolist() == files.tolist()
+        assert cache.get("/data", 3, cluster="http://nn-b:9870/webhdfs/v1|hadoop") is None
+        assert cache.get("/data", 3, cluster="http://nn-a:9870/webhdfs/v1|other") is None
+        assert cache.get("/data", 3) is None
+
+if __name__ == "__main__":
+    pytest.main([__file__])